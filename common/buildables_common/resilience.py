@@ -0,0 +1,239 @@
+"""
+Typed provider errors, retries and circuit breakers for LLM calls.
+
+Provider SDKs raise their own exception types; classify() maps them, by HTTP status
+where there is one, onto a small hierarchy that callers can act on:
+
+    RateLimitError            429; retried after the provider's Retry-After when given
+    ProviderUnavailableError  5xx, timeouts, connection failures; retried
+    AuthenticationError       401/403; not retried
+    InvalidRequestError       other 4xx, e.g. a prompt over the context window; not retried
+    CircuitOpenError          the provider failed repeatedly and is skipped for a while
+
+    summary = call_with_retries("openai", client_call, text)
+
+Transient failures are retried with exponential backoff and full jitter. Each provider
+has one circuit breaker per process: after failure_threshold consecutive transient
+failures it opens and calls fail fast with CircuitOpenError until reset_timeout has
+passed, when a single trial call decides whether it closes again. Callers that fail
+over to another provider instead of retrying only need classify().
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+from buildables_common.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ProviderError(Exception):
+    """A failed LLM provider call."""
+
+    retryable = False
+
+    def __init__(self, provider: str, message: str, status: Optional[int] = None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status = status
+
+
+class RateLimitError(ProviderError):
+    retryable = True
+
+    def __init__(self, provider: str, message: str, status: Optional[int] = 429, retry_after: Optional[float] = None):
+        super().__init__(provider, message, status)
+        self.retry_after = retry_after
+
+
+class ProviderUnavailableError(ProviderError):
+    retryable = True
+
+
+class AuthenticationError(ProviderError):
+    pass
+
+
+class InvalidRequestError(ProviderError):
+    pass
+
+
+class CircuitOpenError(ProviderError):
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(provider, f"circuit open after repeated failures, retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+def _status(error: BaseException) -> Optional[int]:
+    # openai/groq APIStatusError has status_code; google.api_core GoogleAPICallError has code
+    for name in ("status_code", "code"):
+        value = getattr(error, name, None)
+        if isinstance(value, int):
+            return value
+    # httpx.HTTPStatusError only has it on its response
+    value = getattr(getattr(error, "response", None), "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def classify(provider: str, error: BaseException) -> ProviderError:
+    """Maps an SDK or network exception onto the ProviderError hierarchy."""
+    if isinstance(error, ProviderError):
+        return error
+    message = str(error) or type(error).__name__
+    status = _status(error)
+    if status == 429 or type(error).__name__ == "ResourceExhausted":
+        return RateLimitError(provider, message, retry_after=_retry_after(error))
+    if status in (401, 403):
+        return AuthenticationError(provider, message, status)
+    if status in (408, 409) or (status is not None and status >= 500):
+        return ProviderUnavailableError(provider, message, status)
+    if status is not None and 400 <= status < 500:
+        return InvalidRequestError(provider, message, status)
+    # Timeouts and dropped connections arrive without a status
+    name = type(error).__name__
+    if isinstance(error, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connect" in name:
+        return ProviderUnavailableError(provider, message)
+    return ProviderError(provider, message, status)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for retryable provider errors.
+
+    Args:
+        max_attempts: Calls in total, including the first
+        base_delay: Upper bound of the first backoff in seconds, doubled per attempt
+        max_delay: Upper bound of any backoff in seconds
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 20.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, error: ProviderError) -> float:
+        """Seconds to wait after the given failed attempt (1-based)."""
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.base_delay * 2 ** (attempt - 1), self.max_delay))
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a provider is down.
+
+    Args:
+        failure_threshold: Consecutive transient failures that open the circuit
+        reset_timeout: Seconds the circuit stays open before a trial call
+    """
+
+    def __init__(self, provider: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        """Raises CircuitOpenError unless a call may go through."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited >= self.reset_timeout and not self._trial_running:
+                self._trial_running = True  # only one trial call while half-open
+                return
+            raise CircuitOpenError(self.provider, max(self.reset_timeout - waited, 0))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self, error: ProviderError):
+        with self._lock:
+            if not error.retryable:
+                # The request was at fault, not the provider; a trial call still counts as done
+                self._trial_running = False
+                return
+            self.failures += 1
+            # A failed trial call reopens the circuit straight away
+            if self._trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning("Circuit for %s opened after %d failures", self.provider, self.failures)
+                self.opened_at = time.monotonic()
+                self._trial_running = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(provider: str) -> CircuitBreaker:
+    """The process-wide circuit breaker of a provider."""
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def call_with_retries(
+    provider: str,
+    func: Callable[..., T],
+    *args,
+    policy: Optional[RetryPolicy] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    **kwargs,
+) -> T:
+    """
+    Calls func through the provider's circuit breaker, retrying transient failures.
+    Raises a ProviderError once the error is permanent or the attempts are used up.
+    """
+    policy = policy or RetryPolicy()
+    breaker = breaker or breaker_for(provider)
+    span = current_span()
+    attempt = 1
+    while True:
+        breaker.allow()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            error = classify(provider, e)
+            breaker.record_failure(error)
+            if not error.retryable or attempt >= policy.max_attempts:
+                if error is e:
+                    raise
+                raise error from e
+            delay = policy.delay(attempt, error)
+            span.add_event("retry", {"attempt": attempt, "error": type(error).__name__, "delay_s": round(delay, 2)})
+            span.add("retries")
+            logger.info("Retrying %s in %.1fs after %s", provider, delay, error)
+            time.sleep(delay)
+            attempt += 1
+        else:
+            breaker.record_success()
+            return result
@@ -0,0 +1,472 @@
+"""
+Lightweight tracing for LLM calls.
+
+A span times one operation and carries attributes such as the model, token counts,
+cache hits and retries. Spans opened inside another span become its children, also
+across asyncio tasks, so one request shows up as a tree of the calls it made:
+
+    with tracer.span("summarize", {"gen_ai.request.model": "gpt-5"}) as span:
+        ...
+        span.set("gen_ai.usage.input_tokens", 812)
+
+    @traced("load_corpus")
+    def load(): ...
+
+A span that outlives one call, like an article run spread over Streamlit reruns, is
+opened with start_span, made current with use_span and closed with end_span.
+
+Tracing is off unless an exporter is configured, and then costs a few microseconds per
+span. The shared tracer is configured from the environment, or from code with configure:
+
+    TRACE_EXPORTER               "jsonl", "otlp" or "none" (default: "jsonl" if TRACE_FILE is set)
+    TRACE_FILE                   JSON lines file for the "jsonl" exporter (default traces.jsonl)
+    TRACE_SAMPLE_RATE            Fraction of traces exported, 0.0-1.0 (default 1.0)
+    OTEL_EXPORTER_OTLP_ENDPOINT  Collector for the "otlp" exporter (default http://localhost:4318)
+    OTEL_SERVICE_NAME            Service name attached to every span (default unknown_service)
+
+Sampling is decided once per trace from its id, so a trace is kept or dropped as a
+whole; spans that fail are exported even from unsampled traces. Requests carrying a
+W3C traceparent header can join the caller's trace through parse_traceparent.
+
+Where the time went, per span name:
+
+    python -m buildables_common.tracing traces.jsonl
+"""
+
+import argparse
+import asyncio
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.request
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "unknown_service"  # OpenTelemetry's name for a service that did not set one
+
+
+class SpanContext(NamedTuple):
+    trace_id: str  # 32 hex digits
+    span_id: str  # 16 hex digits
+    sampled: bool
+
+
+class Span:
+    __slots__ = ("name", "context", "parent_id", "attributes", "events", "error", "start_ns", "end_ns", "_started")
+
+    def __init__(self, name: str, context: SpanContext, parent_id: Optional[str], attributes: Optional[Dict] = None):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict] = []
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self._started = time.perf_counter_ns()
+
+    @property
+    def recording(self) -> bool:
+        return True
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: Union[int, float] = 1):
+        """Adds to a numeric attribute, e.g. token counts summed over several calls."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def add_event(self, name: str, attributes: Optional[Dict] = None):
+        """Records a point in time inside the span, such as a retry."""
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": dict(attributes or {})})
+
+    def record_error(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict:
+        """The JSON lines record of a finished span."""
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+    def to_otlp(self) -> Dict:
+        """The span in the OTLP/JSON encoding accepted by OpenTelemetry collectors."""
+        span = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "events": [
+                {"name": event["name"], "timeUnixNano": str(event["time_ns"]),
+                 "attributes": _otlp_attributes(event["attributes"])}
+                for event in self.events
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is off, so call sites need no checks."""
+
+    recording = False
+    context = None
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def add(self, key: str, amount: Union[int, float] = 1):
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict] = None):
+        pass
+
+    def record_error(self, error: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar = ContextVar("current_span", default=None)
+
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class JsonlExporter:
+    """Appends one JSON line per finished span to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        atexit.register(self.shutdown)
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+
+class OtlpExporter:
+    """
+    Sends spans to an OpenTelemetry collector as OTLP/JSON over HTTP.
+    Spans are queued and posted in batches from a background thread, so a slow
+    collector never delays the traced code; spans beyond max_queue are dropped.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = "http://localhost:4318",
+        service_name: str = SERVICE_NAME,
+        batch_size: int = 256,
+        interval: float = 2.0,
+        max_queue: int = 10000,
+        timeout: float = 5.0,
+    ):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.interval = interval
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(max_queue)
+        self._worker = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._worker.start()
+        atexit.register(self.shutdown)
+
+    def export(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    span = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                    break
+                batch.append(span)
+            if batch:
+                self._post(batch)
+
+    def _post(self, spans: List[Span]):
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}],
+        }]}
+        request = urllib.request.Request(
+            self.url, data=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json"}
+        )
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError as e:
+            logger.warning("Could not export %d spans to %s: %s", len(spans), self.url, e)
+
+    def shutdown(self):
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join(self.timeout)
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to an exporter.
+
+    Args:
+        exporter: Object with an export(span) method; None turns tracing off
+        sample_rate: Fraction of traces exported; failed spans are always exported
+        service_name: Attached to every exported span
+    """
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0, service_name: str = SERVICE_NAME):
+        self.exporter = exporter
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.service_name = service_name
+        self._threshold = int(self.sample_rate * (1 << 64))
+
+    @classmethod
+    def from_env(cls, service_name: str = SERVICE_NAME) -> "Tracer":
+        """Tracer configured by the TRACE_* and OTEL_* environment variables."""
+        service_name = os.getenv("OTEL_SERVICE_NAME", service_name)
+        kind = os.getenv("TRACE_EXPORTER", "jsonl" if os.getenv("TRACE_FILE") else "none").lower()
+        if kind == "jsonl":
+            exporter = JsonlExporter(os.getenv("TRACE_FILE", "traces.jsonl"))
+        elif kind == "otlp":
+            endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")
+            exporter = OtlpExporter(endpoint, service_name)
+        else:
+            exporter = None
+        return cls(exporter, float(os.getenv("TRACE_SAMPLE_RATE", "1.0")), service_name)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def _sampled(self, trace_id: str) -> bool:
+        # Same rule as OpenTelemetry's TraceIdRatioBased sampler: compare the low 64 bits
+        return int(trace_id[16:], 16) < self._threshold
+
+    def start_span(
+        self, name: str, attributes: Optional[Dict] = None, parent: Union[Span, SpanContext, None] = None
+    ) -> Union[Span, _NoopSpan]:
+        """Starts a span without making it current; it is exported by end_span."""
+        if not self.enabled:
+            return NOOP_SPAN
+        if parent is None:
+            parent = _current_span.get()
+        parent_context = parent.context if isinstance(parent, Span) else parent
+        if parent_context is None:
+            trace_id = uuid.uuid4().hex
+            context = SpanContext(trace_id, uuid.uuid4().hex[:16], self._sampled(trace_id))
+        else:
+            context = SpanContext(parent_context.trace_id, uuid.uuid4().hex[:16], parent_context.sampled)
+        return Span(name, context, parent_context.span_id if parent_context else None, attributes)
+
+    def end_span(self, span: Union[Span, _NoopSpan]):
+        if not span.recording or span.end_ns:
+            return
+        span.end_ns = span.start_ns + (time.perf_counter_ns() - span._started)
+        if span.context.sampled or span.error:
+            self.exporter.export(span)
+
+    @contextmanager
+    def use_span(self, span: Union[Span, _NoopSpan]):
+        """Makes a started span the parent of the spans opened in the block, without ending it."""
+        if not span.recording:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name: str, attributes: Optional[Dict] = None, parent: Union[Span, SpanContext, None] = None):
+        """
+        Times the enclosed block as a span. The parent defaults to the current span;
+        pass one explicitly to continue a trace in another thread.
+        """
+        span = self.start_span(name, attributes, parent)
+        if not span.recording:
+            yield span
+            return
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except (asyncio.CancelledError, GeneratorExit):
+            span.set("cancelled", True)
+            raise
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def traced(self, name: Optional[str] = None, attributes: Optional[Dict] = None):
+        """Decorator tracing every call of a function or coroutine function."""
+        def decorator(func):
+            span_name = name or func.__qualname__
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name, attributes):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, attributes):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+tracer = Tracer.from_env()
+
+
+def configure(exporter=None, sample_rate: float = 1.0, service_name: str = SERVICE_NAME) -> Tracer:
+    """Replaces the settings of the shared tracer, e.g. to trace into a file from code."""
+    tracer.__init__(exporter, sample_rate, service_name)
+    return tracer
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """The caller's span from a W3C traceparent header ("00-<trace id>-<span id>-<flags>")."""
+    parts = (header or "").strip().lower().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1] + parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return SpanContext(parts[1], parts[2], bool(flags & 1))
+
+
+def format_traceparent(context: SpanContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+def current_span() -> Union[Span, _NoopSpan]:
+    """The innermost open span, or a no-op span outside any span."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name: Optional[str] = None, attributes: Optional[Dict] = None):
+    """Decorator tracing every call of a function with the shared tracer."""
+    return tracer.traced(name, attributes)
+
+
+# --- Reporting ---
+
+def read_spans(path: str) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def summarize_spans(spans: List[Dict]) -> List[Dict]:
+    """
+    Per span name: call count, errors, total and self time (total minus the time of
+    child spans) and summed token counts, slowest self time first.
+    """
+    children_ms: Dict[str, float] = defaultdict(float)
+    for span in spans:
+        if span["parent_id"]:
+            children_ms[span["parent_id"]] += span["duration_ms"]
+
+    rows: Dict[str, Dict] = {}
+    durations: Dict[str, List[float]] = defaultdict(list)
+    for span in spans:
+        row = rows.setdefault(span["name"], {
+            "name": span["name"], "count": 0, "errors": 0, "total_ms": 0.0, "self_ms": 0.0, "tokens": 0,
+        })
+        row["count"] += 1
+        row["errors"] += span["status"] == "error"
+        row["total_ms"] += span["duration_ms"]
+        row["self_ms"] += max(span["duration_ms"] - children_ms[span["span_id"]], 0.0)
+        attributes = span["attributes"]
+        row["tokens"] += attributes.get("gen_ai.usage.input_tokens", 0) + attributes.get("gen_ai.usage.output_tokens", 0)
+        durations[span["name"]].append(span["duration_ms"])
+
+    for name, row in rows.items():
+        ordered = sorted(durations[name])
+        row["p95_ms"] = ordered[min(int(round(0.95 * (len(ordered) - 1))), len(ordered) - 1)]
+    return sorted(rows.values(), key=lambda row: row["self_ms"], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a JSON lines trace file by span name.")
+    parser.add_argument("path", nargs="?", default=os.getenv("TRACE_FILE", "traces.jsonl"))
+    args = parser.parse_args()
+
+    rows = summarize_spans(list(read_spans(args.path)))
+    print(f"{'span':40} {'count':>7} {'errors':>7} {'total s':>9} {'self s':>9} {'p95 ms':>9} {'tokens':>9}")
+    for row in rows:
+        print(
+            f"{row['name'][:40]:40} {row['count']:>7} {row['errors']:>7} {row['total_ms'] / 1000:>9.2f} "
+            f"{row['self_ms'] / 1000:>9.2f} {row['p95_ms']:>9.1f} {row['tokens']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import io
+import pytest
+from buildables_common.chunking import Chunker, approximate_tokens
+
+# --- Sample document fixture ---
+@pytest.fixture
+def document():
+    paragraphs = []
+    for section in range(1, 6):
+        paragraphs.append(f"{section} Section Title")
+        for paragraph in range(4):
+            paragraphs.append(" ".join(
+                f"Sentence {section}.{paragraph}.{i} says something about the topic." for i in range(6)
+            ))
+    return "\n\n".join(paragraphs) + "\n"
+
+# --- Tests ---
+
+def test_chunks_are_exact_slices(document):
+    """Test every chunk's offsets point back to its text in the source."""
+    for chunk in Chunker(chunk_size=60, overlap=15).chunk_text(document):
+        assert document[chunk.start:chunk.end] == chunk.text
+
+def test_chunks_respect_token_limit(document):
+    """Test no chunk is longer than chunk_size tokens."""
+    chunks = Chunker(chunk_size=60, overlap=15).chunk_text(document)
+    assert len(chunks) > 1
+    assert all(approximate_tokens(chunk.text) <= 60 for chunk in chunks)
+
+def test_chunks_cover_the_document(document):
+    """Test no text is lost between chunks."""
+    covered = set()
+    for chunk in Chunker(chunk_size=60, overlap=0).chunk_text(document):
+        covered.update(range(chunk.start, chunk.end))
+    assert all(i in covered for i, char in enumerate(document) if not char.isspace())
+
+def test_chunks_overlap_by_whole_sentences(document):
+    """Test consecutive chunks of a section share their boundary sentence."""
+    chunks = Chunker(chunk_size=60, overlap=15).chunk_text(document)
+    first, second = chunks[0], chunks[1]
+    assert second.section == first.section
+    assert second.start < first.end
+    assert document[second.start:first.end].endswith(".")
+
+def test_headings_start_new_chunks(document):
+    """Test a heading starts a chunk and names the chunks' section."""
+    chunks = Chunker(chunk_size=200, overlap=20).chunk_text(document)
+    starts = [chunk for chunk in chunks if chunk.text.startswith("2 Section Title")]
+    assert len(starts) == 1
+    assert starts[0].section == "2 Section Title"
+
+def test_long_sentence_is_split():
+    """Test a sentence longer than chunk_size is cut at word boundaries."""
+    text = "word " * 500
+    chunks = Chunker(chunk_size=100, overlap=10).chunk_text(text)
+    assert len(chunks) == 5
+    assert all(text[chunk.start:chunk.end] == chunk.text for chunk in chunks)
+
+def test_stream_matches_text(document):
+    """Test chunking a stream in small blocks gives the same chunks as the whole text."""
+    chunker = Chunker(chunk_size=60, overlap=15)
+    streamed = list(chunker.chunk_stream(io.StringIO(document), block_size=64))
+    assert streamed == chunker.chunk_text(document)
+
+def test_chunk_texts_with_process_pool(document):
+    """Test chunking in worker processes gives the same chunks, in order."""
+    chunker = Chunker(chunk_size=60, overlap=15)
+    texts = [document, document[:500], ""]
+    assert list(chunker.chunk_texts(texts, workers=2)) == [chunker.chunk_text(text) for text in texts]
+
+def test_overlap_must_be_smaller_than_chunk_size():
+    """Test invalid settings are rejected."""
+    with pytest.raises(ValueError):
+        Chunker(chunk_size=50, overlap=50)
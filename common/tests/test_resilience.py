@@ -0,0 +1,156 @@
+import httpx
+import openai
+import pytest
+from buildables_common.resilience import (
+    AuthenticationError, CircuitBreaker, CircuitOpenError, InvalidRequestError, ProviderError,
+    ProviderUnavailableError, RateLimitError, RetryPolicy, _status, call_with_retries, classify,
+)
+
+def openai_error(cls, status, headers=None):
+    response = httpx.Response(status, headers=headers, request=httpx.Request("POST", "https://api.openai.com/v1"))
+    return cls("failed", response=response, body=None)
+
+class GoogleStyleError(Exception):
+    """Shaped like google.api_core exceptions, which carry the HTTP status as `code`."""
+
+    def __init__(self, code):
+        super().__init__(f"status {code}")
+        self.code = code
+
+class Flaky:
+    """Fails with the given errors, then returns "summary"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "summary"
+
+# --- Fixtures ---
+@pytest.fixture
+def no_wait(monkeypatch):
+    delays = []
+    monkeypatch.setattr("buildables_common.resilience.time.sleep", delays.append)
+    return delays
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker("test", failure_threshold=3, reset_timeout=30.0)
+
+# --- Tests ---
+
+def test_sdk_errors_are_classified():
+    """Test SDK exceptions map onto the typed errors by status code."""
+    rate_limited = classify("openai", openai_error(openai.RateLimitError, 429, {"retry-after": "7"}))
+    assert isinstance(rate_limited, RateLimitError) and rate_limited.retry_after == 7.0
+    assert isinstance(classify("openai", openai_error(openai.InternalServerError, 503)), ProviderUnavailableError)
+    assert isinstance(classify("openai", openai_error(openai.AuthenticationError, 401)), AuthenticationError)
+    assert isinstance(classify("openai", openai_error(openai.BadRequestError, 400)), InvalidRequestError)
+    assert isinstance(classify("gemini", GoogleStyleError(429)), RateLimitError)
+    assert isinstance(classify("gemini", GoogleStyleError(504)), ProviderUnavailableError)
+    assert isinstance(classify("gemini", TimeoutError("read timed out")), ProviderUnavailableError)
+    assert type(classify("gemini", ValueError("blocked by safety filters"))) is ProviderError
+
+@pytest.mark.parametrize("error, status", [
+    (openai_error(openai.RateLimitError, 429), 429),
+    (GoogleStyleError(503), 503),
+    (httpx.HTTPStatusError("failed", request=httpx.Request("POST", "http://localhost:11434"),
+                           response=httpx.Response(502)), 502),
+    (httpx.ConnectError("connection refused"), None),
+    (ValueError("blocked by safety filters"), None),
+])
+def test_status_is_read_from_every_sdk_shape(error, status):
+    """Test the HTTP status is found on the error, as its code, or on its httpx response."""
+    assert _status(error) == status
+
+def test_network_errors_are_classified():
+    """Test raw httpx errors, as the Ollama client raises them, map onto the typed errors."""
+    request = httpx.Request("POST", "http://localhost:11434/api/generate")
+    assert isinstance(classify("ollama", httpx.ConnectError("connection refused")), ProviderUnavailableError)
+    assert isinstance(classify("ollama", httpx.ReadTimeout("timed out")), ProviderUnavailableError)
+    assert isinstance(classify("ollama", ConnectionResetError()), ProviderUnavailableError)
+    throttled = httpx.HTTPStatusError(
+        "failed", request=request, response=httpx.Response(429, headers={"retry-after": "2"}, request=request)
+    )
+    rate_limited = classify("ollama", throttled)
+    assert isinstance(rate_limited, RateLimitError) and rate_limited.retry_after == 2.0
+    missing = httpx.HTTPStatusError("failed", request=request, response=httpx.Response(404, request=request))
+    assert isinstance(classify("ollama", missing), InvalidRequestError)
+
+def test_provider_errors_pass_through():
+    """Test an already typed error is returned unchanged."""
+    error = AuthenticationError("openai", "bad key", 401)
+    assert classify("openai", error) is error
+
+def test_transient_errors_are_retried(no_wait, breaker):
+    """Test rate limits and outages are retried until the call succeeds."""
+    call = Flaky(GoogleStyleError(429), GoogleStyleError(503))
+    assert call_with_retries("test", call, "text", breaker=breaker) == "summary"
+    assert call.calls == 3
+    assert len(no_wait) == 2
+
+def test_permanent_errors_are_not_retried(no_wait, breaker):
+    """Test an invalid request fails at once with its typed error."""
+    call = Flaky(GoogleStyleError(400))
+    with pytest.raises(InvalidRequestError) as raised:
+        call_with_retries("test", call, "text", breaker=breaker)
+    assert isinstance(raised.value.__cause__, GoogleStyleError)
+    assert call.calls == 1
+
+def test_attempts_are_bounded(no_wait, breaker):
+    """Test the last transient error is raised once the attempts are used up."""
+    call = Flaky(*[GoogleStyleError(503)] * 5)
+    with pytest.raises(ProviderUnavailableError):
+        call_with_retries("test", call, "text", policy=RetryPolicy(max_attempts=2), breaker=breaker)
+    assert call.calls == 2
+
+def test_retry_after_is_respected(no_wait, breaker):
+    """Test the provider's Retry-After header sets the backoff."""
+    call = Flaky(openai_error(openai.RateLimitError, 429, {"retry-after": "3"}))
+    call_with_retries("test", call, "text", breaker=breaker)
+    assert no_wait == [3.0]
+
+def test_circuit_opens_and_fails_fast(no_wait, breaker):
+    """Test repeated outages open the circuit, after which calls are not attempted."""
+    call = Flaky(*[GoogleStyleError(503)] * 3)
+    with pytest.raises(ProviderUnavailableError):
+        call_with_retries("test", call, "text", policy=RetryPolicy(max_attempts=3), breaker=breaker)
+    assert breaker.state == "open"
+
+    healthy = Flaky()
+    with pytest.raises(CircuitOpenError):
+        call_with_retries("test", healthy, "text", breaker=breaker)
+    assert healthy.calls == 0
+
+def test_circuit_closes_after_a_successful_trial(no_wait, breaker, monkeypatch):
+    """Test one trial call is let through after the reset timeout, and its success closes the circuit."""
+    for _ in range(3):
+        breaker.record_failure(ProviderUnavailableError("test", "down"))
+    clock = [1000.0]
+    monkeypatch.setattr("buildables_common.resilience.time.monotonic", lambda: clock[0])
+    breaker.opened_at = clock[0]
+    clock[0] += 31
+
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()  # a second caller waits for the trial
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.allow()
+
+def test_failed_trial_reopens_the_circuit(breaker, monkeypatch):
+    """Test a failing trial call opens the circuit for another reset timeout."""
+    clock = [1000.0]
+    monkeypatch.setattr("buildables_common.resilience.time.monotonic", lambda: clock[0])
+    for _ in range(3):
+        breaker.record_failure(ProviderUnavailableError("test", "down"))
+    clock[0] += 31
+    breaker.allow()
+    breaker.record_failure(ProviderUnavailableError("test", "still down"))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
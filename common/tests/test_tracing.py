@@ -0,0 +1,180 @@
+import asyncio
+import json
+import threading
+import pytest
+from buildables_common.tracing import (
+    JsonlExporter, SpanContext, Tracer, current_span, format_traceparent, parse_traceparent, read_spans, summarize_spans
+)
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span.to_dict())
+
+# --- Tracer fixture ---
+@pytest.fixture
+def exporter():
+    return ListExporter()
+
+@pytest.fixture
+def tracer(exporter):
+    return Tracer(exporter)
+
+# --- Tests ---
+
+def test_spans_nest(tracer, exporter):
+    """Test a span opened inside another becomes its child in the same trace."""
+    with tracer.span("summarize", {"gen_ai.request.model": "gpt-5"}) as outer:
+        with tracer.span("openai.chat.completions") as inner:
+            inner.set("gen_ai.usage.input_tokens", 120)
+            assert current_span() is inner
+        assert current_span() is outer
+    child, parent = exporter.spans
+    assert child["parent_id"] == parent["span_id"]
+    assert child["trace_id"] == parent["trace_id"]
+    assert parent["parent_id"] is None
+    assert child["attributes"] == {"gen_ai.usage.input_tokens": 120}
+    assert parent["duration_ms"] >= child["duration_ms"]
+
+def test_errors_are_recorded(tracer, exporter):
+    """Test an exception marks the span as failed and still propagates."""
+    with pytest.raises(ValueError):
+        with tracer.span("gemini.generate_content"):
+            raise ValueError("quota")
+    assert exporter.spans[0]["status"] == "error"
+    assert exporter.spans[0]["error"] == "ValueError: quota"
+
+def test_sampling_keeps_failed_spans(exporter):
+    """Test an unsampled trace exports nothing but its failed spans."""
+    tracer = Tracer(exporter, sample_rate=0.0)
+    with tracer.span("summarize"):
+        with tracer.span("ok"):
+            pass
+        with pytest.raises(RuntimeError):
+            with tracer.span("failed"):
+                raise RuntimeError("down")
+    assert [span["name"] for span in exporter.spans] == ["failed"]
+
+def test_disabled_tracer_is_a_no_op():
+    """Test spans without an exporter record nothing and need no checks at call sites."""
+    with Tracer().span("summarize") as span:
+        span.set("gen_ai.usage.input_tokens", 1)
+        assert not span.recording
+        assert not current_span().recording
+
+def test_async_tasks_inherit_the_current_span(tracer, exporter):
+    """Test spans in concurrently running tasks are children of the span that started them."""
+    @tracer.traced("provider_call")
+    async def call(delay):
+        await asyncio.sleep(delay)
+
+    async def turn():
+        with tracer.span("chat_turn"):
+            await asyncio.gather(call(0.01), call(0))
+
+    asyncio.run(turn())
+    root = exporter.spans[-1]
+    assert root["name"] == "chat_turn"
+    assert [span["parent_id"] for span in exporter.spans[:-1]] == [root["span_id"]] * 2
+
+def test_explicit_parent_across_threads(tracer, exporter):
+    """Test a span can continue a trace in another thread through an explicit parent."""
+    def route(parent):
+        with tracer.span("router", parent=parent):
+            pass
+
+    with tracer.span("chat_turn") as root:
+        worker = threading.Thread(target=route, args=(root.context,))
+        worker.start()
+        worker.join()
+    assert exporter.spans[0]["parent_id"] == root.context.span_id
+    assert exporter.spans[0]["trace_id"] == root.context.trace_id
+
+def test_jsonl_export_and_report(tmp_path):
+    """Test spans are written as JSON lines and the report splits self time from child time."""
+    path = str(tmp_path / "traces.jsonl")
+    exporter = JsonlExporter(path)
+    tracer = Tracer(exporter)
+    with tracer.span("summarize"):
+        with tracer.span("openai.chat.completions") as span:
+            span.set("gen_ai.usage.input_tokens", 100)
+            span.set("gen_ai.usage.output_tokens", 20)
+    exporter.shutdown()
+
+    spans = list(read_spans(path))
+    assert [span["name"] for span in spans] == ["openai.chat.completions", "summarize"]
+    rows = {row["name"]: row for row in summarize_spans(spans)}
+    assert rows["openai.chat.completions"]["tokens"] == 120
+    parent = rows["summarize"]
+    assert parent["self_ms"] == pytest.approx(parent["total_ms"] - rows["openai.chat.completions"]["total_ms"], abs=1e-3)
+
+def test_otlp_encoding(tracer, exporter):
+    """Test spans convert to the OTLP/JSON span shape."""
+    with tracer.span("summarize", {"chunked": True, "chunks": 3}) as span:
+        pass
+    otlp = span.to_otlp()
+    assert len(otlp["traceId"]) == 32 and len(otlp["spanId"]) == 16
+    assert "parentSpanId" not in otlp
+    assert {"key": "chunks", "value": {"intValue": "3"}} in otlp["attributes"]
+    assert {"key": "chunked", "value": {"boolValue": True}} in otlp["attributes"]
+    assert otlp["status"] == {"code": 1}
+    json.dumps(otlp)
+
+def test_otlp_exporter_posts_to_collector():
+    """Test the OTLP exporter sends queued spans to a collector's /v1/traces endpoint."""
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from buildables_common.tracing import OtlpExporter
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            received.append((self.path, json.loads(self.rfile.read(int(self.headers["Content-Length"])))))
+            self.send_response(200)
+            self.end_headers()
+
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    exporter = OtlpExporter(f"http://127.0.0.1:{server.server_address[1]}", service_name="test", interval=0.05)
+    with Tracer(exporter).span("summarize"):
+        pass
+    exporter.shutdown()
+    server.shutdown()
+
+    path, payload = received[0]
+    assert path == "/v1/traces"
+    resource_spans = payload["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "test"}}]
+    assert resource_spans["scopeSpans"][0]["spans"][0]["name"] == "summarize"
+
+def test_started_span_parents_spans_without_ending(tracer, exporter):
+    """Test a span made current with use_span stays open until end_span exports it."""
+    run = tracer.start_span("article_run")
+    with tracer.use_span(run):
+        with tracer.span("generate_node"):
+            pass
+    assert [span["name"] for span in exporter.spans] == ["generate_node"]
+    tracer.end_span(run)
+    tracer.end_span(run)
+    assert [span["name"] for span in exporter.spans] == ["generate_node", "article_run"]
+    assert exporter.spans[0]["parent_id"] == run.context.span_id
+
+def test_traceparent_round_trip():
+    """Test a W3C traceparent header is parsed into a span context and formatted back."""
+    header = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    context = parse_traceparent(header)
+    assert context == SpanContext("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True)
+    assert format_traceparent(context) == header
+
+@pytest.mark.parametrize("header", [
+    None, "", "garbage", "00-xyz-00f067aa0ba902b7-01",
+    "00-00000000000000000000000000000000-00f067aa0ba902b7-01",
+    "00-4bf92f3577b34da6a3ce929d0e0e4736-0000000000000000-01",
+])
+def test_invalid_traceparent_is_ignored(header):
+    """Test malformed or all-zero ids start a new trace instead of failing."""
+    assert parse_traceparent(header) is None
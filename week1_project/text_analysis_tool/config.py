@@ -23,3 +23,5 @@ class ModelCosts:
     GM_O_COST = 10.00  # Gemini output cost
     GPT_I_COST = 1.25  # GPT input cost
     GPT_O_COST = 10.00  # GPT output cost
+    GM_FLASH_I_COST = 0.10  # Gemini 2.0 Flash input cost
+    GM_FLASH_O_COST = 0.40  # Gemini 2.0 Flash output cost
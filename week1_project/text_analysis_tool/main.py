@@ -1,32 +1,95 @@
+import argparse
 import os
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 from utils.llm_helpers import Summarizer
 from utils.analysis_feature import CostAnalyzer, TextAnalyzer, ModelBenchmark
+from utils.cascade import CascadeSummarizer
+from utils.corpus import CorpusLoader
+from utils.dedup import DedupIndex
+from buildables_common.resilience import ProviderError
 
 
-def load_input_texts():
+BASE_DIR = os.path.dirname(__file__)  # directory of main.py
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+
+def load_input_texts(
+    sources: Optional[Iterable[str]] = None, manifest_path: Optional[str] = None
+) -> Iterator[Tuple[str, str]]:
     """
-    Loads all input text files from the data folder.
-    Returns a dictionary with filename -> file contents.
+    Lazily yields (name, text) of every document in the given files, directories,
+    glob patterns, JSON-lines files or compressed archives; the data folder by default.
+    With a manifest, files unchanged since the last run are skipped.
     """
-    BASE_DIR = os.path.dirname(__file__)  # directory of main.py
-    DATA_DIR = os.path.join(BASE_DIR, "data")
-
-    files = [
-        os.path.join(DATA_DIR, "academic_abstract.txt"),
-        os.path.join(DATA_DIR, "news_article.txt"),
-        os.path.join(DATA_DIR, "reddit_post.txt"),
-    ]
-
-    texts = {}
-    for file_path in files:
-        file_name = os.path.basename(file_path)  # just the filename
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                texts[file_name] = f.read()
-        except FileNotFoundError:
-            print(f"File not found: {file_name}")
+    loader = CorpusLoader(sources or [DATA_DIR], manifest_path=manifest_path)
+    for document in loader:
+        yield document.doc_id, document.text
+    print(
+        f"\nCorpus: {loader.stats.documents} documents from {loader.stats.files_read} files, "
+        f"{loader.stats.files_skipped} unchanged files skipped"
+    )
+
+
+def print_cost_estimate(model_name: str, label: str, input_text: str) -> Optional[str]:
+    """
+    Summarizes with one model and prints the cost; a failed call is reported instead of costed.
+    Returns the summary, or None when the call failed.
+    """
+    try:
+        output_text = Summarizer(model_name).summarize(input_text)
+    except ProviderError as e:
+        print(f"\nCost Estimation for {label} skipped, summarization failed: {e}")
+        return None
+    analyzer = CostAnalyzer(model_name)
+    result = analyzer.analyze_text_and_cost(input_text, output_text)
+
+    print(f"\nCost Estimation for {label}:" + "\n" + "-" * 50)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    return output_text
+
+
+def estimate_cost(model_name: str, input_text: str, output_text: str) -> float:
+    return CostAnalyzer(model_name).analyze_text_and_cost(input_text, output_text)["total_cost"]
+
 
-    return texts
+def print_cascade_summary(cascade: CascadeSummarizer, input_text: str) -> Optional[str]:
+    """
+    Summarizes with the cascade and prints which model's summary was kept and why.
+    Returns the summary, or None when the call failed or only an unverified draft is left.
+    """
+    try:
+        result = cascade.run(input_text)
+    except ProviderError as e:
+        print(f"\nCascade summarization failed: {e}")
+        return None
+    print("\nCascade Summary:" + "\n" + "-" * 50)
+    if result.quality is not None:
+        scores = ", ".join(f"{name} {score:.2f}" for name, score in result.quality.scores.items())
+        print(f"Quality check: {'passed' if result.quality.passed else 'failed ' + ', '.join(result.quality.failures)} ({scores})")
+    print(f"Served by: {result.model}" + (" (escalated)" if result.escalated else ""))
+    if not result.verified:
+        print("Premium model failed; this draft did not pass the quality check")
+    print(result.summary)
+    # An unverified draft is not reused for near-duplicates
+    return result.summary if result.verified else None
+
+
+def summarize_document(input_text: str, cascade: Optional[CascadeSummarizer]) -> Optional[Dict[str, str]]:
+    """
+    Runs the LLM steps of one analysis and returns its summaries by label,
+    or None when any of them failed, so a failed analysis is never reused.
+    """
+    if cascade is not None:
+        # Premium models are only called for documents the cheap model summarized poorly
+        summaries = {"Cascade": print_cascade_summary(cascade, input_text)}
+    else:
+        # Cost Estimation for Gemini and OpenAI
+        summaries = {
+            "Gemini": print_cost_estimate("gemini-2.5-pro", "Gemini", input_text),
+            "OpenAI": print_cost_estimate("gpt-5", "OpenAI", input_text),
+        }
+    return summaries if all(summary is not None for summary in summaries.values()) else None
 
 
 def run_benchmarks(input_text: str):
@@ -64,6 +127,9 @@ def run_benchmarks(input_text: str):
             print(f"  • Completed in {metrics['total_time_seconds']:.2f} seconds")
             print(f"  • Speed: {metrics['tokens_per_second']:.2f} tokens/second")
             
+        except ProviderError as e:
+            # Failed calls are left out of the comparison instead of timed as fast successes
+            print(f"  • {model_name} failed, not benchmarked: {e}")
         except Exception as e:
             print(f"  • Error benchmarking {model_name}: {str(e)}")
     
@@ -73,37 +139,63 @@ def run_benchmarks(input_text: str):
 
 
 if __name__ == "__main__":
-    # Load all input texts
-    texts = load_input_texts()
+    parser = argparse.ArgumentParser(description="Summarize, cost and benchmark a text corpus.")
+    parser.add_argument("sources", nargs="*", help="Files, directories, globs, .jsonl or .gz/.zst archives (default: data/)")
+    parser.add_argument("--manifest", help="Manifest file; files unchanged since the last run are skipped")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Summarize with the cheap model and escalate to the premium model only when the summary fails the quality check")
+    parser.add_argument("--cheap-model", default="gemini-2.0-flash", help="'gemini-2.0-flash' or 'ollama:<model>'")
+    parser.add_argument("--premium-model", default="gemini-2.5-pro", help="'gemini-2.5-pro' or 'gpt-5'")
+    parser.add_argument("--dedup", action="store_true", help="Reuse the summaries of a near-duplicate already analyzed instead of calling the models")
+    parser.add_argument("--dedup-threshold", type=float, default=0.8, help="Estimated Jaccard similarity of near-duplicates")
+    parser.add_argument("--dedup-index", help="SQLite file of the near-duplicate index, kept across runs (default: in memory)")
+    args = parser.parse_args()
 
-    for name, input_text in texts.items():
-        print(f"\n\n Running analysis for: {name}")
-        print("=" * 60)
+    cascade = None
+    if args.cascade:
+        cascade = CascadeSummarizer(args.cheap_model, args.premium_model, cost_estimator=estimate_cost)
+    dedup = DedupIndex(args.dedup_threshold, path=args.dedup_index) if args.dedup else None
 
-        # Cost Estimation for Gemini
-        gemini_summarizer = Summarizer("gemini-2.5-pro")
-        output_text = gemini_summarizer.summarize(input_text)
-        analyzer = CostAnalyzer("gemini-2.5-pro")
-        result = analyzer.analyze_text_and_cost(input_text, output_text)
+    # Documents are loaded one at a time
+    texts = load_input_texts(args.sources, args.manifest)
 
-        print("\nCost Estimation for Gemini:" + "\n" + "-" * 50)
-        for key, value in result.items():
-            print(f"{key}: {value}")
+    for name, input_text in texts:
+        print(f"\n\n Running analysis for: {name}")
+        print("=" * 60)
 
-        # Cost Estimation for OpenAI
-        gpt_summarizer = Summarizer("gpt-5")
-        output_text = gpt_summarizer.summarize(input_text)
-        analyzer = CostAnalyzer("gpt-5")
-        result = analyzer.analyze_text_and_cost(input_text, output_text)
+        summaries = None
+        if dedup is not None:
+            match = dedup.add(name, input_text)
+            summaries = dedup.result(match.cluster)
+            if summaries is not None:
+                dedup.stats.calls_avoided += 1
+                if match.duplicate:
+                    print(f"Near-duplicate of {match.representative} (similarity {match.similarity:.2f}), reusing its summaries")
+                else:
+                    print("Already analyzed, reusing its summaries")
+                for label, summary in summaries.items():
+                    print(f"\n{label} Summary:" + "\n" + "-" * 50)
+                    print(summary)
 
-        print("\nCost Estimation for OpenAI:" + "\n" + "-" * 50)
-        for key, value in result.items():
-            print(f"{key}: {value}")
+        reused = summaries is not None
+        if not reused:
+            summaries = summarize_document(input_text, cascade)
+            if dedup is not None and summaries is not None:
+                dedup.set_result(match.cluster, summaries)
 
         # Tokenization analysis with GPT2 tokenizer
         gpt_analyzer = TextAnalyzer("gpt2")
         analysis_result = gpt_analyzer.analyze(input_text)
         gpt_analyzer.visualize(analysis_result)
         
-        # Run performance benchmarks
-        run_benchmarks(input_text)
+        # Run performance benchmarks, unless the summaries were reused
+        if cascade is None and not reused:
+            run_benchmarks(input_text)
+
+    if cascade is not None:
+        print(cascade.stats.report())
+    if dedup is not None:
+        # Each reused result saves the summarization calls of one analysis: the cascade's
+        # draft plus its share of escalations, or two cost estimates and two benchmarks
+        print(dedup.stats.report(calls_per_document=1 + cascade.stats.escalation_rate if cascade is not None else 4))
+        dedup.close()
@@ -1,6 +1,7 @@
 import streamlit as st
 from utils.llm_helpers import Summarizer
 from utils.analysis_feature import CostAnalyzer, TextAnalyzer, ModelBenchmark
+from buildables_common.resilience import ProviderError
 
 # Add a sidebar navigation
 PAGES = {
@@ -66,7 +67,7 @@ if PAGES[selection] == "analyze":
     st.sidebar.header("Model & Settings")
     summarizer_model = st.sidebar.selectbox(
         "Summarizer Model",
-        ["gemini-2.5-pro", "gpt-5"]
+        ["gemini-2.5-pro", "gpt-5", "gemini-2.0-flash"]
     )
     tokenizer_model = st.sidebar.selectbox(
         "Tokenizer Model",
@@ -91,7 +92,12 @@ if PAGES[selection] == "analyze":
             
             st.subheader(" Summarizing...")
             summarizer = Summarizer(summarizer_model)
-            output_text = summarizer.summarize(input_text)
+            try:
+                output_text = summarizer.summarize(input_text)
+            except ProviderError as e:
+                # Nothing to cost or benchmark without a summary
+                st.error(f"Summarization failed: {e}")
+                st.stop()
             st.text_area("Summary:", value=output_text, height=150)
 
             st.subheader(" Cost Estimating...")
@@ -0,0 +1,181 @@
+"""
+Local stand-in for the OpenAI and Gemini Batch APIs, for tests and dry runs.
+
+    python tests/batch_stub.py --port 8765
+    OpenAI(base_url="http://127.0.0.1:8765/v1", api_key="test")
+    GeminiBatchProvider(base_url="http://127.0.0.1:8765/v1beta", api_key="test")
+
+Batches finish after `polls` status requests. A request whose text contains "FAIL"
+gets an error instead of a summary; every other one is summarized as "Summary of <id>".
+"""
+
+import argparse
+import email
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubBatchServer:
+    def __init__(self, port: int = 0, polls: int = 1):
+        self.polls = polls
+        self.files = {}
+        self.batches = {}
+        self.submitted = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.port = self.httpd.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _new_id(self, prefix: str) -> str:
+        with self._lock:
+            return f"{prefix}{next(self._ids)}"
+
+    # --- OpenAI ---
+
+    def _openai_file(self, content: bytes, purpose: str) -> dict:
+        file_id = self._new_id("file-")
+        self.files[file_id] = content
+        return {
+            "id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+            "filename": f"{file_id}.jsonl", "purpose": purpose, "status": "processed",
+        }
+
+    def _openai_finish(self, batch: dict):
+        output, errors = [], []
+        for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines():
+            request = json.loads(line)
+            text = request["body"]["messages"][-1]["content"]
+            if "FAIL" in text:
+                errors.append({"id": self._new_id("req-"), "custom_id": request["custom_id"], "response": {
+                    "status_code": 500, "body": {"error": {"message": "stub failure"}}}, "error": None})
+            else:
+                output.append({"id": self._new_id("req-"), "custom_id": request["custom_id"], "response": {
+                    "status_code": 200, "body": {"choices": [{"index": 0, "message": {
+                        "role": "assistant", "content": f"Summary of {request['custom_id']}"}}]}}, "error": None})
+        for key, lines in (("output_file_id", output), ("error_file_id", errors)):
+            if lines:
+                content = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+                batch[key] = self._openai_file(content, "batch_output")["id"]
+        batch["status"] = "completed"
+
+    # --- Gemini ---
+
+    def _gemini_finish(self, operation: dict):
+        responses = []
+        for request in operation.pop("_requests"):
+            text = request["request"]["contents"][0]["parts"][0]["text"]
+            key = request["metadata"]["key"]
+            if "FAIL" in text:
+                responses.append({"error": {"code": 500, "message": "stub failure"}, "metadata": {"key": key}})
+            else:
+                responses.append({"response": {"candidates": [{"content": {"parts": [{"text": f"Summary of {key}"}]}}]},
+                                  "metadata": {"key": key}})
+        operation["done"] = True
+        operation["metadata"]["state"] = "BATCH_STATE_SUCCEEDED"
+        operation["response"] = {"inlinedResponses": {"inlinedResponses": responses}}
+
+    def _poll(self, batch: dict):
+        batch["_polls"] += 1
+        if batch["_polls"] >= self.polls:
+            if "_requests" in batch:
+                self._gemini_finish(batch)
+            elif batch.get("status") == "in_progress":
+                self._openai_finish(batch)
+
+    @staticmethod
+    def _public(batch: dict) -> dict:
+        return {key: value for key, value in batch.items() if not key.startswith("_")}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body, content_type: str = "application/json"):
+                data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def do_POST(self):
+                path = self.path.split("?")[0]
+                if path == "/v1/files":
+                    message = email.message_from_bytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + self._body()
+                    )
+                    fields = {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                              for part in message.get_payload()}
+                    return self._send(200, server._openai_file(fields["file"], fields["purpose"].decode("utf-8")))
+                if path == "/v1/batches":
+                    request = json.loads(self._body())
+                    batch = {
+                        "id": server._new_id("batch_"), "object": "batch", "endpoint": request["endpoint"],
+                        "input_file_id": request["input_file_id"], "completion_window": request["completion_window"],
+                        "status": "in_progress", "created_at": int(time.time()), "metadata": request.get("metadata"),
+                        "output_file_id": None, "error_file_id": None, "_polls": 0,
+                    }
+                    server.batches[batch["id"]] = batch
+                    server.submitted += 1
+                    return self._send(200, server._public(batch))
+                if path.startswith("/v1beta/models/") and path.endswith(":batchGenerateContent"):
+                    batch = json.loads(self._body())["batch"]
+                    name = server._new_id("batches/")
+                    server.batches[name] = {
+                        "name": name, "done": False, "_polls": 0,
+                        "metadata": {"state": "BATCH_STATE_PENDING", "displayName": batch["display_name"]},
+                        "_requests": batch["input_config"]["requests"]["requests"],
+                    }
+                    server.submitted += 1
+                    return self._send(200, server._public(server.batches[name]))
+                self._send(404, {"error": {"message": f"No route {path}"}})
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/v1/batches":
+                    data = [server._public(batch) for batch in server.batches.values() if "id" in batch]
+                    return self._send(200, {"object": "list", "data": data[::-1], "has_more": False})
+                if path.startswith("/v1/batches/"):
+                    batch = server.batches[path.rsplit("/", 1)[1]]
+                    server._poll(batch)
+                    return self._send(200, server._public(batch))
+                if path.startswith("/v1/files/") and path.endswith("/content"):
+                    return self._send(200, server.files[path.split("/")[3]], "application/octet-stream")
+                if path == "/v1beta/batches":
+                    operations = [server._public(batch) for batch in server.batches.values() if "name" in batch]
+                    return self._send(200, {"operations": operations})
+                if path.startswith("/v1beta/batches/"):
+                    batch = server.batches[path[len("/v1beta/"):]]
+                    server._poll(batch)
+                    return self._send(200, server._public(batch))
+                self._send(404, {"error": {"message": f"No route {path}"}})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--polls", type=int, default=2)
+    args = parser.parse_args()
+    with StubBatchServer(args.port, args.polls) as stub:
+        print(f"Stand-in Batch API on {stub.url}")
+        threading.Event().wait()
@@ -0,0 +1,106 @@
+import pytest
+from openai import OpenAI
+from batch_stub import StubBatchServer
+from utils.batch import BatchSummarizer, GeminiBatchProvider, OpenAIBatchProvider
+
+DOCUMENTS = [
+    ("a.txt", "First document."),
+    ("b.txt", "Second document."),
+    ("c.txt", "First document."),  # same text as a.txt, summarized once
+]
+
+# --- Stand-in server fixtures ---
+@pytest.fixture
+def stub():
+    with StubBatchServer(polls=2) as server:
+        yield server
+
+@pytest.fixture(params=["openai", "gemini"])
+def provider(request, stub):
+    if request.param == "openai":
+        client = OpenAI(base_url=f"{stub.url}/v1", api_key="test", max_retries=0)
+        return OpenAIBatchProvider("gpt-5", client=client)
+    return GeminiBatchProvider("gemini-2.5-pro", api_key="test", base_url=f"{stub.url}/v1beta")
+
+class CrashAfterSubmit:
+    """Provider wrapper that loses the response of its first submit, like a process killed mid-call."""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.crashed = False
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def submit(self, requests, key):
+        batch_id = self.provider.submit(requests, key)
+        if not self.crashed:
+            self.crashed = True
+            raise ConnectionError("lost the response")
+        return batch_id
+
+# --- Tests ---
+
+def test_results_map_back_to_documents(tmp_path, stub, provider):
+    """Test every document gets the summary of its request, and duplicate texts share one request."""
+    summarizer = BatchSummarizer(provider.model, str(tmp_path / "checkpoint.db"), provider=provider)
+    assert summarizer.add(DOCUMENTS) == 2
+    summaries = summarizer.run([], poll_interval=0)
+    assert set(summaries) == {"a.txt", "b.txt", "c.txt"}
+    assert summaries["a.txt"] == summaries["c.txt"] == f"Summary of {summarizer.job_id('First document.')}"
+    assert stub.submitted == 1
+
+def test_resubmission_is_idempotent(tmp_path, stub, provider):
+    """Test re-running with the same checkpoint submits nothing that was already submitted."""
+    checkpoint = str(tmp_path / "checkpoint.db")
+    first = BatchSummarizer(provider.model, checkpoint, provider=provider)
+    first.add(DOCUMENTS)
+    first.submit()
+    first.close()
+
+    second = BatchSummarizer(provider.model, checkpoint, provider=provider)
+    second.add(DOCUMENTS)
+    assert second.submit() == []
+    assert len(second.run(DOCUMENTS, poll_interval=0)) == 3
+    assert stub.submitted == 1
+
+def test_batch_sent_before_a_crash_is_found_again(tmp_path, stub, provider):
+    """Test a batch whose submit response was lost is recovered instead of sent twice."""
+    checkpoint = str(tmp_path / "checkpoint.db")
+    crashing = BatchSummarizer(provider.model, checkpoint, provider=CrashAfterSubmit(provider))
+    crashing.add(DOCUMENTS)
+    with pytest.raises(ConnectionError):
+        crashing.submit()
+    crashing.close()
+
+    resumed = BatchSummarizer(provider.model, checkpoint, provider=provider)
+    assert len(resumed.run(DOCUMENTS, poll_interval=0)) == 3
+    assert stub.submitted == 1
+
+def test_failed_requests_are_retried_then_reported(tmp_path, stub, provider):
+    """Test a failing request is resubmitted up to max_attempts, then reported with its error."""
+    summarizer = BatchSummarizer(provider.model, str(tmp_path / "checkpoint.db"), provider=provider, max_attempts=2)
+    summaries = summarizer.run([("ok.txt", "Fine."), ("bad.txt", "Please FAIL.")], poll_interval=0)
+    assert list(summaries) == ["ok.txt"]
+    errors = {doc_id: error for doc_id, _, error in summarizer.results() if error}
+    assert "stub failure" in errors["bad.txt"]
+    assert stub.submitted == 2
+    assert summarizer.counts() == {"done": 1, "failed": 1}
+
+def test_batches_respect_provider_limits(tmp_path, stub, provider):
+    """Test pending requests are split into several batches when they exceed the request limit."""
+    provider.max_requests = 2
+    summarizer = BatchSummarizer(provider.model, str(tmp_path / "checkpoint.db"), provider=provider)
+    summarizer.add((f"{i}.txt", f"Document number {i}.") for i in range(5))
+    assert len(summarizer.submit()) == 3
+    assert len(summarizer.run([], poll_interval=0)) == 5
+
+def test_pending_jobs_are_read_in_pages(tmp_path, stub, provider):
+    """Test paging through the checkpoint submits every pending job exactly once."""
+    provider.max_requests = 3
+    summarizer = BatchSummarizer(provider.model, str(tmp_path / "checkpoint.db"), provider=provider)
+    summarizer.page_size = 2
+    summarizer.add((f"{i}.txt", f"Document number {i}.") for i in range(7))
+    assert len(summarizer.submit()) == 3
+    assert summarizer.counts() == {"submitted": 7}
+    assert len(summarizer.run([], poll_interval=0)) == 7
@@ -0,0 +1,131 @@
+import time
+import pytest
+from utils import llm_helpers
+from utils.cascade import CascadeSummarizer, QualityCheck
+from buildables_common.resilience import CircuitOpenError, ProviderUnavailableError, breaker_for
+
+SOURCE = (
+    "For years, Libya has existed in a stalemate, with two governments ruling over their respective fiefdoms. "
+    "In May the killing of a powerful militia leader in Tripoli set off clashes between rival militias, "
+    "and the fighting has left dozens dead in Tripoli and Zawiya. Analysts say the militias fight over territory, "
+    "contracts and oil, since Libya holds Africa's largest proven oil reserves. Foreign backers, from Russia and the "
+    "United Arab Emirates to Turkey, supply arms to both sides. Libyans, who have waited four years for elections, "
+    "face soaring prices and electricity shortages while the militia leaders and governments in Tripoli hold on to power."
+)
+GOOD = ("Clashes between rival militias in Tripoli and Zawiya, set off in May by the killing of a militia leader, "
+        "have broken Libya's stalemate between two governments over territory and oil, while Libyans wait for elections.")
+
+class StubSummarizer:
+    """Returns a fixed summary, or raises the given error, and counts its calls."""
+
+    def __init__(self, summary=None, error=None):
+        self.summary = summary
+        self.error = error
+        self.calls = 0
+
+    def summarize(self, text):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.summary
+
+def cascade(cheap, premium):
+    # Every call costs its model's price, so savings are easy to check
+    prices = {"cheap": 1.0, "premium": 10.0}
+    return CascadeSummarizer("cheap", "premium", cost_estimator=lambda model, i, o: prices[model],
+                             cheap=cheap, premium=premium)
+
+# --- Tests ---
+
+def test_good_summary_passes():
+    """Test a short, on-topic summary built from the source's words passes every check."""
+    result = QualityCheck()(SOURCE, GOOD)
+    assert result.passed, result.failures
+    assert set(result.scores) == {"length_ratio", "coverage", "support"}
+
+@pytest.mark.parametrize("summary, failure", [
+    ("", "empty"),
+    ("I'm sorry, but I cannot summarize this text for you right now.", "refusal"),
+    ("Libya clashes.", "too_short"),
+    (SOURCE, "too_long"),
+    ("The quarterly earnings report shows strong revenue growth as cloud subscriptions expanded across customers.", "low_coverage"),
+    (GOOD.replace("in May", "in 2019"), "unsupported_numbers"),
+])
+def test_bad_summaries_fail(summary, failure):
+    """Test each heuristic catches the kind of draft it is meant for."""
+    result = QualityCheck()(SOURCE, summary)
+    assert not result.passed
+    assert failure in result.failures
+
+def test_passing_draft_is_kept():
+    """Test the premium model is not called when the cheap draft passes."""
+    cheap, premium = StubSummarizer(GOOD), StubSummarizer("premium summary")
+    summarizer = cascade(cheap, premium)
+    result = summarizer.run(SOURCE)
+    assert (result.summary, result.model, result.escalated) == (GOOD, "cheap", False)
+    assert premium.calls == 0
+    assert summarizer.stats.cost == 1.0
+    assert summarizer.stats.premium_only_cost == 10.0
+
+def test_failing_draft_escalates():
+    """Test a draft that fails the check is replaced by the premium model's summary."""
+    cheap, premium = StubSummarizer("Libya clashes."), StubSummarizer("premium summary")
+    summarizer = cascade(cheap, premium)
+    result = summarizer.run(SOURCE)
+    assert (result.summary, result.model, result.escalated) == ("premium summary", "premium", True)
+    assert "too_short" in result.quality.failures
+    assert summarizer.stats.reasons["too_short"] == 1
+
+def test_cheap_model_error_escalates():
+    """Test a failed cheap call falls through to the premium model instead of failing the document."""
+    cheap = StubSummarizer(error=ProviderUnavailableError("ollama", "connection refused"))
+    summarizer = cascade(cheap, StubSummarizer("premium summary"))
+    result = summarizer.run(SOURCE)
+    assert result.model == "premium" and result.quality is None
+    assert summarizer.stats.reasons["cheap_model_error"] == 1
+
+def test_premium_model_error_keeps_the_unverified_draft():
+    """Test a failed premium call returns the cheap draft marked unverified instead of raising."""
+    premium = StubSummarizer(error=ProviderUnavailableError("gemini", "service unavailable"))
+    summarizer = cascade(StubSummarizer("Libya clashes."), premium)
+    result = summarizer.run(SOURCE)
+    assert (result.summary, result.model, result.escalated, result.verified) == ("Libya clashes.", "cheap", True, False)
+    assert summarizer.stats.unverified == 1
+    assert "Unverified drafts kept after a premium model error: 1" in summarizer.stats.report()
+
+def test_both_models_failing_raises():
+    """Test a document with neither a draft nor a premium summary still fails."""
+    summarizer = cascade(StubSummarizer(error=ProviderUnavailableError("ollama", "connection refused")),
+                         StubSummarizer(error=ProviderUnavailableError("gemini", "service unavailable")))
+    with pytest.raises(ProviderUnavailableError):
+        summarizer.run(SOURCE)
+
+def test_circuit_breakers_are_kept_per_model(monkeypatch):
+    """Test an open circuit for the cheap model does not block the premium model of the same provider."""
+    monkeypatch.setattr(llm_helpers.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(llm_helpers.genai, "configure", lambda **kwargs: None)
+    monkeypatch.setattr(llm_helpers.Summarizer, "_summarize_with_gemini", lambda self, text: f"{self.model_name} summary")
+    breaker = breaker_for("gemini-2.0-flash")
+    monkeypatch.setattr(breaker, "opened_at", time.monotonic())
+    with pytest.raises(CircuitOpenError):
+        llm_helpers.Summarizer("gemini-2.0-flash").summarize(SOURCE)
+    assert llm_helpers.Summarizer("gemini-2.5-pro").summarize(SOURCE) == "gemini-2.5-pro summary"
+
+def test_stats_report_escalation_rate_and_savings():
+    """Test the stats add up over documents: one escalation in four saves the premium price of three."""
+    cheap = StubSummarizer(GOOD)
+    summarizer = cascade(cheap, StubSummarizer("premium summary"))
+    for _ in range(3):
+        summarizer.run(SOURCE)
+    cheap.summary = ""
+    summarizer.run(SOURCE)
+
+    stats = summarizer.stats
+    assert (stats.documents, stats.escalations) == (4, 1)
+    assert stats.escalation_rate == 0.25
+    assert stats.cost == 4 * 1.0 + 10.0
+    assert stats.premium_only_cost == 4 * 10.0
+    assert stats.savings == 26.0
+    report = stats.report()
+    assert "Escalated to premium: 1 (25.0%)" in report
+    assert "Savings: $26.000000 (65.0%)" in report
@@ -0,0 +1,89 @@
+import gzip
+import io
+import json
+import os
+import tarfile
+import pytest
+from utils.corpus import CorpusLoader
+
+# --- Sample corpus fixture ---
+@pytest.fixture
+def corpus(tmp_path):
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "a.txt").write_text("First document.", encoding="utf-8")
+    (tmp_path / "notes" / "b.md").write_text("# Second\n\nDocument.", encoding="utf-8")
+    (tmp_path / "ignored.csv").write_text("not,a,document", encoding="utf-8")
+    lines = [json.dumps({"id": "c", "text": "Third document.", "lang": "en"}), "not json", json.dumps({"text": "Fourth."})]
+    with gzip.open(tmp_path / "dump.jsonl.gz", "wt", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return tmp_path
+
+def make_tar(path, members):
+    with tarfile.open(path, "w:gz") as archive:
+        for name, text in members.items():
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+# --- Tests ---
+
+def test_directory_is_loaded_recursively(corpus):
+    """Test text files, markdown and compressed JSON lines are found under a directory."""
+    loader = CorpusLoader([str(corpus)])
+    documents = {document.doc_id: document for document in loader}
+    assert set(documents) == {"a.txt", os.path.join("notes", "b.md"), "c", "dump.jsonl.gz:3"}
+    assert documents["c"].text == "Third document."
+    assert documents["c"].metadata == {"lang": "en"}
+    assert loader.stats.lines_skipped == 1
+
+def test_loader_is_lazy(corpus):
+    """Test documents are read one at a time."""
+    documents = iter(CorpusLoader([str(corpus)]))
+    assert next(documents).doc_id == "a.txt"
+
+def test_glob_pattern(corpus):
+    """Test glob patterns select files, including in subdirectories."""
+    documents = list(CorpusLoader([str(corpus / "**" / "*.md")]))
+    assert [document.text for document in documents] == ["# Second\n\nDocument."]
+
+def test_tar_archive(tmp_path):
+    """Test documents are streamed out of a compressed tar archive."""
+    make_tar(tmp_path / "corpus.tar.gz", {"x.txt": "Inside.", "y.jsonl": json.dumps({"id": "y1", "text": "Line."})})
+    documents = {document.doc_id: document.text for document in CorpusLoader([str(tmp_path / "corpus.tar.gz")])}
+    assert documents == {"corpus.tar.gz/x.txt": "Inside.", "y1": "Line."}
+
+def test_memory_mapped_files(corpus):
+    """Test large files are read through a memory map with the same result."""
+    expected = [(document.doc_id, document.text) for document in CorpusLoader([str(corpus)])]
+    mapped = [(document.doc_id, document.text) for document in CorpusLoader([str(corpus)], mmap_threshold=1)]
+    assert mapped == expected
+
+def test_manifest_skips_unchanged_files(corpus, tmp_path):
+    """Test a second run only reads files whose content changed."""
+    manifest = str(tmp_path / "manifest.json")
+    assert len(list(CorpusLoader([str(corpus)], manifest_path=manifest))) == 4
+
+    loader = CorpusLoader([str(corpus)], manifest_path=manifest)
+    assert list(loader) == []
+    assert loader.stats.files_skipped == 3
+
+    (corpus / "a.txt").write_text("First document, edited.", encoding="utf-8")
+    os.utime(corpus / "notes" / "b.md")  # touched, content unchanged
+    documents = list(CorpusLoader([str(corpus)], manifest_path=manifest))
+    assert [document.text for document in documents] == ["First document, edited."]
+
+def test_unfinished_file_is_not_recorded(corpus, tmp_path):
+    """Test a file whose documents were not all consumed is read again next time."""
+    manifest = str(tmp_path / "manifest.json")
+    loader = CorpusLoader([str(corpus / "dump.jsonl.gz")], manifest_path=manifest)
+    next(iter(loader))
+    loader.save_manifest()
+    assert len(list(CorpusLoader([str(corpus / "dump.jsonl.gz")], manifest_path=manifest))) == 2
+
+def test_zstd_jsonl(tmp_path):
+    """Test zstd-compressed JSON lines are decompressed on the fly."""
+    zstandard = pytest.importorskip("zstandard")
+    data = json.dumps({"id": "z", "text": "Compressed."}).encode("utf-8")
+    (tmp_path / "dump.jsonl.zst").write_bytes(zstandard.ZstdCompressor().compress(data))
+    assert [document.text for document in CorpusLoader([str(tmp_path)])] == ["Compressed."]
@@ -0,0 +1,121 @@
+import os
+import pytest
+from utils.dedup import DedupIndex, MinHasher, jaccard, optimal_bands
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+def read(name):
+    with open(os.path.join(DATA_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+# --- Sample text fixtures ---
+@pytest.fixture
+def news():
+    return read("news_article.txt")
+
+@pytest.fixture
+def repost(news):
+    """A lightly edited copy: a few words changed and a footer added."""
+    return news.replace("analysts", "experts").replace("Tripoli", "Tripoli, Libya", 2) + "\n\nShare this story!"
+
+# --- Tests ---
+
+def test_signature_estimates_jaccard(news, repost):
+    """Test the MinHash estimate is close to the exact Jaccard similarity of the shingle sets."""
+    hasher = MinHasher()
+    a, b = set(hasher.shingles(news).tolist()), set(hasher.shingles(repost).tolist())
+    exact = len(a & b) / len(a | b)
+    assert jaccard(hasher.signature(news), hasher.signature(repost)) == pytest.approx(exact, abs=0.1)
+    assert jaccard(hasher.signature(news), hasher.signature(read("reddit_post.txt"))) < 0.1
+
+def test_shingles_ignore_case_and_punctuation():
+    """Test formatting-only differences give identical signatures."""
+    hasher = MinHasher()
+    assert (hasher.signature("Hello, World!  Again.") == hasher.signature("hello world again")).all()
+
+def test_long_documents_are_hashed_in_blocks(news):
+    """Test block-wise hashing gives the same signature as hashing all shingles at once."""
+    whole = MinHasher(block_size=1 << 30).signature(news)
+    assert (MinHasher(block_size=64).signature(news) == whole).all()
+
+def test_band_choice_follows_threshold():
+    """Test a higher threshold gets fewer, longer bands."""
+    bands_high, rows_high = optimal_bands(0.9, 128)
+    bands_low, rows_low = optimal_bands(0.5, 128)
+    assert bands_high < bands_low and rows_high > rows_low
+    assert bands_high * rows_high <= 128
+
+def test_near_duplicates_share_a_cluster(news, repost):
+    """Test a repost joins the original's cluster, while an unrelated text starts its own."""
+    index = DedupIndex(threshold=0.8)
+    original = index.add("news.txt", news)
+    assert not original.duplicate
+    assert not index.add("reddit.txt", read("reddit_post.txt")).duplicate
+    match = index.add("repost.txt", repost)
+    assert match.duplicate
+    assert (match.cluster, match.representative) == (original.cluster, "news.txt")
+    assert match.similarity >= 0.8
+    assert list(index.clusters()) == [(original.cluster, "news.txt", 2)]
+
+def test_map_calls_once_per_cluster(news, repost):
+    """Test the function runs once per cluster and near-duplicates reuse its result."""
+    calls = []
+
+    def summarize(text):
+        calls.append(text)
+        return f"summary {len(calls)}"
+
+    index = DedupIndex()
+    documents = [("news.txt", news), ("reddit.txt", read("reddit_post.txt")), ("repost.txt", repost)]
+    results = {doc_id: result for doc_id, result, _ in index.map(documents, summarize)}
+    assert results == {"news.txt": "summary 1", "reddit.txt": "summary 2", "repost.txt": "summary 1"}
+    assert len(calls) == 2
+    assert index.stats.calls_avoided == 1
+    assert "LLM calls avoided: 1" in index.stats.report()
+
+def test_failed_call_is_retried_by_the_next_duplicate(news, repost):
+    """Test a result is only stored once the call succeeds."""
+    attempts = []
+
+    def flaky(text):
+        attempts.append(text)
+        if len(attempts) == 1:
+            raise RuntimeError("provider down")
+        return "summary"
+
+    index = DedupIndex()
+    with pytest.raises(RuntimeError):
+        list(index.map([("news.txt", news)], flaky))
+    assert list(index.map([("repost.txt", repost)], flaky))[0][1] == "summary"
+    assert index.stats.calls_avoided == 0
+
+def test_index_persists_results(tmp_path, news, repost):
+    """Test a second run on the same index file finds the first run's clusters and results."""
+    path = str(tmp_path / "dedup.db")
+    index = DedupIndex(path=path)
+    list(index.map([("news.txt", news)], lambda text: "summary"))
+    index.close()
+
+    index = DedupIndex(path=path)
+    _, result, match = next(index.map([("repost.txt", repost)], lambda text: pytest.fail("called again")))
+    assert result == "summary" and match.representative == "news.txt"
+    index.close()
+
+    with pytest.raises(ValueError):
+        DedupIndex(num_perm=64, path=path)
+
+def test_rerun_matches_a_document_to_its_own_cluster(tmp_path, news):
+    """Test a representative seen again by a persisted index is a hit on its result, not a near-duplicate."""
+    path = str(tmp_path / "dedup.db")
+    index = DedupIndex(path=path)
+    first = index.add("news.txt", news)
+    index.set_result(first.cluster, "summary")
+    index.close()
+
+    index = DedupIndex(path=path)
+    _, result, match = next(index.map([("news.txt", news)], lambda text: pytest.fail("called again")))
+    assert result == "summary"
+    assert (match.cluster, match.duplicate) == (first.cluster, False)
+    assert (index.stats.duplicates, index.stats.clusters, index.stats.calls_avoided) == (0, 0, 1)
+    assert list(index.clusters(min_size=1)) == [(first.cluster, "news.txt", 1)]
+    index.close()
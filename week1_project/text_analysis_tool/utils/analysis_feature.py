@@ -8,10 +8,16 @@ class CostAnalyzer:
     def __init__(self, model_name: str):
         """
         Initialize with model name and automatically set costs.
-        Supported models: 'gemini', 'gpt'
+        Supported models: 'gemini', 'gemini-2.0-flash', 'gpt', 'ollama:<model>' (local, free)
         """
         self.model_name = model_name.lower()
-        if "gemini" in self.model_name:
+        if self.model_name.startswith("ollama:"):
+            self.input_cost = 0.0
+            self.output_cost = 0.0
+        elif "gemini" in self.model_name and "flash" in self.model_name:
+            self.input_cost = ModelCosts.GM_FLASH_I_COST
+            self.output_cost = ModelCosts.GM_FLASH_O_COST
+        elif "gemini" in self.model_name:
             self.input_cost = ModelCosts.GM_I_COST
             self.output_cost = ModelCosts.GM_O_COST
         elif "gpt" in self.model_name:
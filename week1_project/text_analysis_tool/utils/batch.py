@@ -0,0 +1,399 @@
+"""
+Offline bulk summarization through the OpenAI and Gemini Batch APIs.
+
+Batch jobs cost about half as much as synchronous calls and have separate, much higher
+rate limits, at the price of finishing within 24 hours instead of seconds. That suits
+nightly backfills, where latency does not matter:
+
+    python -m utils.batch data/ --model gpt-5 --checkpoint backfill.db --output summaries.jsonl
+
+Every document becomes one request, keyed by a hash of the model and the text, so a
+repeated text is summarized once. Requests, batches and results are checkpointed in a
+SQLite file: re-running the same command after an interruption polls the batches that
+were already submitted and only submits what is still missing. A batch is recorded
+before it is sent and tagged with that record's key, so a crash right after submitting
+finds the batch again instead of sending it twice.
+
+Both providers take a base_url, so they can be pointed at a local stand-in server.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+from buildables_common.tracing import tracer
+from openai import OpenAI
+
+from utils.prompts import gemini_summary_prompt, openai_summary_messages
+
+logger = logging.getLogger(__name__)
+
+# custom_id -> (summary, error); exactly one of them is set
+BatchResults = Dict[str, Tuple[Optional[str], Optional[str]]]
+
+
+class OpenAIBatchProvider:
+    """Chat completion requests uploaded as a JSONL file and run by the OpenAI Batch API."""
+
+    max_requests = 50_000
+    max_bytes = 190 * 1024 * 1024  # the input file limit is 200 MB
+    endpoint = "/v1/chat/completions"
+
+    def __init__(self, model: str = "gpt-5", client: Optional[OpenAI] = None, completion_window: str = "24h"):
+        self.model = model
+        self.client = client or OpenAI()
+        self.completion_window = completion_window
+
+    def request(self, custom_id: str, text: str) -> Dict:
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": self.endpoint,
+            "body": {"model": self.model, "messages": openai_summary_messages(text)},
+        }
+
+    def submit(self, requests: List[Dict], key: str) -> str:
+        data = "".join(json.dumps(request) + "\n" for request in requests).encode("utf-8")
+        input_file = self.client.files.create(file=(f"{key}.jsonl", data), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.endpoint,
+            completion_window=self.completion_window,
+            metadata={"checkpoint_key": key},
+        )
+        return batch.id
+
+    def find(self, key: str) -> Optional[str]:
+        for batch in self.client.batches.list(limit=100):
+            if (batch.metadata or {}).get("checkpoint_key") == key:
+                return batch.id
+        return None
+
+    def poll(self, batch_id: str) -> Optional[BatchResults]:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status not in ("completed", "failed", "expired", "cancelled"):
+            return None
+        results: BatchResults = {}
+        # An expired or cancelled batch still has output files for the requests that finished
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    item = json.loads(line)
+                    results[item["custom_id"]] = self._parse(item)
+        return results
+
+    @staticmethod
+    def _parse(item: Dict) -> Tuple[Optional[str], Optional[str]]:
+        response = item.get("response") or {}
+        if item.get("error") or response.get("status_code") != 200:
+            return None, json.dumps(item.get("error") or response.get("body"))
+        return response["body"]["choices"][0]["message"]["content"], None
+
+
+class GeminiBatchProvider:
+    """generateContent requests sent inline to the Gemini Batch API."""
+
+    max_requests = 10_000
+    max_bytes = 19 * 1024 * 1024  # inline requests are limited to 20 MB per batch
+
+    def __init__(
+        self,
+        model: str = "gemini-2.5-pro",
+        api_key: Optional[str] = None,
+        base_url: str = "https://generativelanguage.googleapis.com/v1beta",
+        http: Optional[httpx.Client] = None,
+    ):
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.http = http or httpx.Client(timeout=60)
+        self.headers = {"x-goog-api-key": api_key or os.getenv("GEMINI_API_KEY", "")}
+
+    def request(self, custom_id: str, text: str) -> Dict:
+        return {
+            "request": {"contents": [{"role": "user", "parts": [{"text": gemini_summary_prompt(text)}]}]},
+            "metadata": {"key": custom_id},
+        }
+
+    def _call(self, method: str, path: str, **kwargs) -> Dict:
+        response = self.http.request(method, f"{self.base_url}/{path}", headers=self.headers, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def submit(self, requests: List[Dict], key: str) -> str:
+        body = {"batch": {"display_name": key, "input_config": {"requests": {"requests": requests}}}}
+        return self._call("POST", f"models/{self.model}:batchGenerateContent", json=body)["name"]
+
+    def find(self, key: str) -> Optional[str]:
+        page = self._call("GET", "batches", params={"pageSize": 100})
+        for operation in page.get("operations", []):
+            if operation.get("metadata", {}).get("displayName") == key:
+                return operation["name"]
+        return None
+
+    def poll(self, batch_id: str) -> Optional[BatchResults]:
+        operation = self._call("GET", batch_id)
+        metadata = operation.get("metadata", {})
+        state = metadata.get("state", "")
+        if not operation.get("done") and not state.endswith(("SUCCEEDED", "FAILED", "CANCELLED", "EXPIRED")):
+            return None
+        output = operation.get("response") or metadata.get("output") or {}
+        results: BatchResults = {}
+        for item in output.get("inlinedResponses", {}).get("inlinedResponses", []):
+            key = item.get("metadata", {}).get("key")
+            if key is None:
+                continue
+            if "error" in item:
+                results[key] = None, json.dumps(item["error"])
+                continue
+            try:
+                parts = item["response"]["candidates"][0]["content"]["parts"]
+                results[key] = "".join(part.get("text", "") for part in parts), None
+            except (KeyError, IndexError) as e:
+                results[key] = None, f"Unexpected response: missing {e}"
+        return results
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    custom_id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, submitted, done or failed
+    batch_key TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    summary TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch_key);
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    custom_id TEXT NOT NULL REFERENCES jobs (custom_id)
+);
+CREATE TABLE IF NOT EXISTS batches (
+    batch_key TEXT PRIMARY KEY,
+    batch_id TEXT,
+    status TEXT NOT NULL,  -- submitting, running or finished
+    requests INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class BatchSummarizer:
+    """
+    Summarizes many documents through a provider Batch API, with a SQLite checkpoint.
+
+    Args:
+        model_name: "gpt-5" or "gemini-2.5-pro", as for Summarizer
+        checkpoint_path: SQLite file of jobs, batches and results
+        provider: Batch provider; chosen by model_name when not given
+        max_attempts: Times a failed request is resubmitted before it counts as failed
+    """
+
+    page_size = 1000  # pending jobs read from the checkpoint per query
+
+    def __init__(self, model_name: str, checkpoint_path: str, provider=None, max_attempts: int = 3):
+        self.model_name = model_name
+        if provider is None:
+            if "gpt" in model_name.lower():
+                provider = OpenAIBatchProvider(model_name)
+            elif "gemini" in model_name.lower():
+                provider = GeminiBatchProvider(model_name)
+            else:
+                raise ValueError("Invalid provider. Use 'gemini-2.5-pro' or 'gpt-5'.")
+        self.provider = provider
+        self.max_attempts = max_attempts
+        self.db = sqlite3.connect(checkpoint_path)
+        self.db.executescript(SCHEMA)
+        self._recover()
+
+    def job_id(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x1f{text}".encode("utf-8")).hexdigest()[:32]
+
+    def add(self, documents: Iterable[Tuple[str, str]]) -> int:
+        """Records (doc_id, text) pairs; returns how many new requests they need."""
+        new = 0
+        with self.db:
+            for doc_id, text in documents:
+                custom_id = self.job_id(text)
+                new += self.db.execute(
+                    "INSERT OR IGNORE INTO jobs (custom_id, text) VALUES (?, ?)", (custom_id, text)
+                ).rowcount
+                self.db.execute("INSERT OR REPLACE INTO documents VALUES (?, ?)", (doc_id, custom_id))
+        return new
+
+    def _recover(self):
+        """Resolves batches that were being submitted when a previous run stopped."""
+        for key, in self.db.execute("SELECT batch_key FROM batches WHERE status = 'submitting'").fetchall():
+            batch_id = self.provider.find(key)
+            with self.db:
+                if batch_id is not None:
+                    self.db.execute("UPDATE batches SET batch_id = ?, status = 'running' WHERE batch_key = ?", (batch_id, key))
+                    logger.info("Found batch %s submitted before the interruption", batch_id)
+                else:
+                    self.db.execute("UPDATE jobs SET status = 'pending', batch_key = NULL WHERE batch_key = ?", (key,))
+                    self.db.execute("DELETE FROM batches WHERE batch_key = ?", (key,))
+
+    def _pending_jobs(self) -> Iterator[Tuple[str, str]]:
+        """
+        Pending (custom_id, text) pairs, read page_size rows at a time so the texts of a
+        large corpus are never all in memory. Pages continue after the last rowid seen,
+        so jobs marked submitted in between are neither skipped nor read twice.
+        """
+        last = 0
+        while True:
+            rows = self.db.execute(
+                "SELECT rowid, custom_id, text FROM jobs WHERE status = 'pending' AND rowid > ? ORDER BY rowid LIMIT ?",
+                (last, self.page_size),
+            ).fetchall()
+            for last, custom_id, text in rows:
+                yield custom_id, text
+            if len(rows) < self.page_size:
+                return
+
+    def _pending_groups(self) -> Iterator[List[Tuple[str, Dict]]]:
+        group: List[Tuple[str, Dict]] = []
+        size = 0
+        for custom_id, text in self._pending_jobs():
+            request = self.provider.request(custom_id, text)
+            request_bytes = len(json.dumps(request).encode("utf-8")) + 1
+            if group and (len(group) >= self.provider.max_requests or size + request_bytes > self.provider.max_bytes):
+                yield group
+                group, size = [], 0
+            group.append((custom_id, request))
+            size += request_bytes
+        if group:
+            yield group
+
+    def submit(self) -> List[str]:
+        """Packages the pending requests into as few batches as the provider limits allow."""
+        batch_ids = []
+        for group in self._pending_groups():
+            key = uuid.uuid4().hex
+            custom_ids = [(key, custom_id) for custom_id, _ in group]
+            # Record the batch first: if the process dies mid-submit, _recover finds it by key
+            with self.db:
+                self.db.execute(
+                    "INSERT INTO batches (batch_key, status, requests, created_at) VALUES (?, 'submitting', ?, ?)",
+                    (key, len(group), time.time()),
+                )
+                self.db.executemany("UPDATE jobs SET status = 'submitted', batch_key = ? WHERE custom_id = ?", custom_ids)
+            with tracer.span("batch.submit", {"gen_ai.request.model": self.model_name, "requests": len(group)}):
+                batch_id = self.provider.submit([request for _, request in group], key)
+            with self.db:
+                self.db.execute("UPDATE batches SET batch_id = ?, status = 'running' WHERE batch_key = ?", (batch_id, key))
+            logger.info("Submitted batch %s with %d requests", batch_id, len(group))
+            batch_ids.append(batch_id)
+        return batch_ids
+
+    def poll(self) -> int:
+        """Collects the results of finished batches; returns the number of batches still running."""
+        running = 0
+        for key, batch_id in self.db.execute("SELECT batch_key, batch_id FROM batches WHERE status = 'running'").fetchall():
+            with tracer.span("batch.poll", {"batch_id": batch_id}) as span:
+                results = self.provider.poll(batch_id)
+                span.set("finished", results is not None)
+            if results is None:
+                running += 1
+                continue
+            with self.db:
+                for custom_id, in self.db.execute("SELECT custom_id FROM jobs WHERE batch_key = ?", (key,)).fetchall():
+                    summary, error = results.get(custom_id, (None, "No result in the batch output"))
+                    if error is None:
+                        self.db.execute(
+                            "UPDATE jobs SET status = 'done', summary = ?, error = NULL WHERE custom_id = ?",
+                            (summary, custom_id),
+                        )
+                    else:
+                        # Failed requests go back to pending until they run out of attempts
+                        self.db.execute(
+                            "UPDATE jobs SET attempts = attempts + 1, error = ?, "
+                            "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+                            "WHERE custom_id = ?",
+                            (error, self.max_attempts, custom_id),
+                        )
+                self.db.execute("UPDATE batches SET status = 'finished' WHERE batch_key = ?", (key,))
+            span.set("errors", sum(error is not None for _, error in results.values()))
+            logger.info("Batch %s finished with %d results", batch_id, len(results))
+        return running
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def wait(self, poll_interval: float = 60.0, timeout: Optional[float] = None) -> Dict[str, int]:
+        """Submits, polls and resubmits failures until every request is done or failed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self.submit()
+            running = self.poll()
+            counts = self.counts()
+            if not running and not counts.get("pending"):
+                return counts
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Batches still running after {timeout} seconds: {counts}")
+            logger.info("Waiting for %d batches: %s", running, counts)
+            time.sleep(poll_interval)
+
+    def results(self) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """Yields (doc_id, summary, error) for every document that is done or failed."""
+        yield from self.db.execute(
+            "SELECT d.doc_id, j.summary, j.error FROM documents d JOIN jobs j USING (custom_id) "
+            "WHERE j.status IN ('done', 'failed') ORDER BY d.doc_id"
+        )
+
+    def run(self, documents: Iterable[Tuple[str, str]], poll_interval: float = 60.0) -> Dict[str, str]:
+        """Summarizes (doc_id, text) pairs and returns doc_id -> summary for the successful ones."""
+        self.add(documents)
+        self.wait(poll_interval)
+        return {doc_id: summary for doc_id, summary, error in self.results() if error is None}
+
+    def close(self):
+        self.db.close()
+
+
+def main():
+    from utils.corpus import CorpusLoader
+
+    parser = argparse.ArgumentParser(description="Summarize a corpus through a provider Batch API.")
+    parser.add_argument("sources", nargs="+", help="Files, directories, globs, .jsonl or .gz/.zst archives")
+    parser.add_argument("--model", default="gpt-5", help="'gpt-5' or 'gemini-2.5-pro'")
+    parser.add_argument("--checkpoint", required=True, help="SQLite checkpoint; re-run with the same file to resume")
+    parser.add_argument("--output", help="JSON-lines file for the summaries (default: stdout)")
+    parser.add_argument("--poll-interval", type=float, default=60.0)
+    parser.add_argument("--base-url", help="API base URL, e.g. of a local stand-in server (tests/batch_stub.py)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    provider = None
+    if args.base_url and "gpt" in args.model.lower():
+        provider = OpenAIBatchProvider(args.model, client=OpenAI(base_url=args.base_url))
+    elif args.base_url:
+        provider = GeminiBatchProvider(args.model, base_url=args.base_url)
+    summarizer = BatchSummarizer(args.model, args.checkpoint, provider=provider)
+    new = summarizer.add((document.doc_id, document.text) for document in CorpusLoader(args.sources))
+    logger.info("%d new requests; %s", new, summarizer.counts())
+    counts = summarizer.wait(args.poll_interval)
+    logger.info("Finished: %s", counts)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        for doc_id, summary, error in summarizer.results():
+            line = json.dumps({"id": doc_id, "summary": summary, "error": error})
+            print(line, file=output)
+    finally:
+        if output is not None:
+            output.close()
+        summarizer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Model cascade summarization: a cheap model first, the premium model only when needed.
+
+Most documents are summarized well enough by a fast, cheap model. The cascade drafts
+every summary with one, scores the draft with quick heuristics and sends the document
+to the premium model only when the draft fails them:
+
+    length        non-empty, not a refusal, and clearly shorter than the source
+    coverage      mentions enough of the source's most frequent content words
+    faithfulness  its content words occur in the source, and so does every number it states
+
+    cascade = CascadeSummarizer("gemini-2.0-flash", "gemini-2.5-pro")
+    summary = cascade.summarize(text)
+    print(cascade.stats.report())
+
+The checks are lexical: they catch empty, truncated, off-topic and number-inventing
+drafts, not subtle misreadings. Raise the QualityCheck thresholds to escalate more often.
+If the premium model fails on an escalated document, the cheap draft is returned with
+verified=False rather than losing the document.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from buildables_common.chunking import Chunker
+from buildables_common.resilience import ProviderError
+from buildables_common.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Words joined by an apostrophe, comma or point stay one word: "don't", "100,000", "1.25"
+_WORD = re.compile(r"[a-z0-9]+(?:[',.][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+    about above after again against all also and any are because been before being below
+    between both but can could did does doing down during each few for from further had has
+    have having her here hers herself him himself his how however into its itself just more
+    most much not now off once only other our ours ourselves out over own same she should
+    some such than that the their theirs them themselves then there these they this those
+    through too under until very was were what when where which while who whom why will
+    with would you your yours yourself yourselves text article summary
+""".split())
+
+REFUSALS = ("i'm sorry", "i am sorry", "i cannot", "i can't", "as an ai", "unable to summarize", "no text provided")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _is_number(word: str) -> bool:
+    return word[0].isdigit()
+
+
+def _stem(word: str) -> str:
+    # A crude prefix stem, so "migrants" and "migration" count as the same word
+    return word[:5]
+
+
+def _content_words(words: List[str]) -> List[str]:
+    return [word for word in words if _is_number(word) or (len(word) > 2 and word not in STOPWORDS)]
+
+
+class QualityResult(NamedTuple):
+    passed: bool
+    scores: Dict[str, float]
+    failures: List[str]  # names of the failed checks, e.g. "low_coverage"
+
+
+@dataclass(frozen=True)
+class QualityCheck:
+    """
+    Heuristic acceptance test for a draft summary.
+
+    Args:
+        min_words: Fewer summary words than this fail the length check
+        max_ratio: Summary words above this fraction of the source's fail the length check
+        top_k: Number of the source's most frequent content words the coverage check looks for
+        min_coverage: Fraction of those the summary has to mention
+        min_support: Fraction of the summary's content words that have to occur in the source
+    """
+
+    min_words: int = 8
+    max_ratio: float = 0.6
+    top_k: int = 10
+    min_coverage: float = 0.3
+    min_support: float = 0.6
+
+    def __call__(self, source: str, summary: str) -> QualityResult:
+        source_words = _words(source)
+        summary_words = _words(summary)
+        failures = []
+
+        # Length
+        scores = {"length_ratio": len(summary_words) / max(len(source_words), 1)}
+        if not summary_words:
+            return QualityResult(False, scores, ["empty"])
+        if any(phrase in summary[:200].lower() for phrase in REFUSALS):
+            failures.append("refusal")
+        if len(summary_words) < min(self.min_words, len(source_words)):
+            failures.append("too_short")
+        if len(summary_words) > max(self.max_ratio * len(source_words), 2 * self.min_words):
+            failures.append("too_long")
+
+        source_content = _content_words(source_words)
+        summary_content = _content_words(summary_words)
+        source_stems = {_stem(word) for word in source_content if not _is_number(word)}
+        summary_stems = {_stem(word) for word in summary_content if not _is_number(word)}
+        source_numbers = {word.replace(",", "") for word in source_content if _is_number(word)}
+
+        # Coverage: the source's most frequent content words are what it is about
+        keywords = [stem for stem, _ in Counter(
+            _stem(word) for word in source_content if not _is_number(word)
+        ).most_common(self.top_k)]
+        scores["coverage"] = sum(stem in summary_stems for stem in keywords) / len(keywords) if keywords else 1.0
+        if scores["coverage"] < self.min_coverage:
+            failures.append("low_coverage")
+
+        # Faithfulness: words and numbers the source does not contain are likely invented
+        supported = [
+            word.replace(",", "") in source_numbers if _is_number(word) else _stem(word) in source_stems
+            for word in summary_content
+        ]
+        scores["support"] = sum(supported) / len(supported) if supported else 1.0
+        if scores["support"] < self.min_support:
+            failures.append("unsupported_content")
+        if any(_is_number(word) and not ok for word, ok in zip(summary_content, supported)):
+            failures.append("unsupported_numbers")
+
+        return QualityResult(not failures, scores, failures)
+
+
+class CascadeResult(NamedTuple):
+    summary: str
+    model: str  # the model whose summary was kept
+    escalated: bool
+    quality: Optional[QualityResult]  # None if the cheap model failed
+    verified: bool = True  # False for a draft that failed the check, kept because the premium model failed
+
+
+@dataclass
+class CascadeStats:
+    documents: int = 0
+    escalations: int = 0
+    unverified: int = 0  # escalations answered with the failed draft because the premium model failed
+    reasons: Counter = field(default_factory=Counter)  # failed checks, or "cheap_model_error"
+    cheap_seconds: float = 0.0
+    premium_seconds: float = 0.0
+    cost: float = 0.0
+    premium_only_cost: float = 0.0  # estimate: every document sent to the premium model
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalations / self.documents if self.documents else 0.0
+
+    @property
+    def savings(self) -> float:
+        return self.premium_only_cost - self.cost
+
+    def report(self) -> str:
+        lines = [
+            "\n" + "=" * 60,
+            "CASCADE SUMMARY",
+            "=" * 60,
+            f"Documents: {self.documents}",
+            f"Escalated to premium: {self.escalations} ({self.escalation_rate:.1%})",
+        ]
+        if self.reasons:
+            lines.append("Escalation reasons: " + ", ".join(f"{name} {count}" for name, count in self.reasons.most_common()))
+        if self.unverified:
+            lines.append(f"Unverified drafts kept after a premium model error: {self.unverified}")
+        total_seconds = self.cheap_seconds + self.premium_seconds
+        lines.append(f"Time: {total_seconds:.2f}s (cheap {self.cheap_seconds:.2f}s, premium {self.premium_seconds:.2f}s)")
+        if self.escalations:
+            # The premium model's mean latency on escalated documents stands in for the rest
+            premium_only_seconds = self.premium_seconds / self.escalations * self.documents
+            lines.append(f"Premium-only time (est.): {premium_only_seconds:.2f}s")
+        if self.premium_only_cost:
+            lines.extend([
+                f"Cost: ${self.cost:.6f}",
+                f"Premium-only cost (est.): ${self.premium_only_cost:.6f}",
+                f"Savings: ${self.savings:.6f} ({self.savings / self.premium_only_cost:.1%})",
+            ])
+        lines.append("=" * 60)
+        return "\n".join(lines)
+
+
+class CascadeSummarizer:
+    """
+    Summarizes with a cheap model and escalates to a premium model when the draft fails the quality check.
+
+    Args:
+        cheap_model: Drafting model, e.g. "gemini-2.0-flash" or "ollama:llama3.2"
+        premium_model: Fallback model, e.g. "gemini-2.5-pro" or "gpt-5"
+        quality_check: Decides whether a draft is kept; QualityCheck() by default
+        chunker: Passed on to both Summarizers for long documents
+        cost_estimator: (model, input_text, output_text) -> USD, for the savings in stats;
+            without one only escalations and latency are tracked
+        cheap, premium: Prebuilt summarizers for the two models, e.g. stand-ins in tests
+    """
+
+    def __init__(
+        self,
+        cheap_model: str = "gemini-2.0-flash",
+        premium_model: str = "gemini-2.5-pro",
+        quality_check: Optional[Callable[[str, str], QualityResult]] = None,
+        chunker: Optional[Chunker] = None,
+        cost_estimator: Optional[Callable[[str, str, str], float]] = None,
+        cheap=None,
+        premium=None,
+    ):
+        if cheap is None or premium is None:
+            from utils.llm_helpers import Summarizer
+            cheap = cheap or Summarizer(cheap_model, chunker=chunker)
+            premium = premium or Summarizer(premium_model, chunker=chunker)
+        self.cheap_model = cheap_model
+        self.premium_model = premium_model
+        self.cheap = cheap
+        self.premium = premium
+        self.quality_check = quality_check or QualityCheck()
+        self.cost_estimator = cost_estimator
+        self.stats = CascadeStats()
+
+    def summarize(self, text: str) -> str:
+        return self.run(text).summary
+
+    def run(self, text: str) -> CascadeResult:
+        """
+        Summarizes one document. If the premium model fails, the cheap draft is returned
+        with verified=False; a ProviderError is raised only when there is no draft either.
+        """
+        with tracer.span("cascade", {"cheap_model": self.cheap_model, "premium_model": self.premium_model}) as span:
+            self.stats.documents += 1
+            draft, quality = None, None
+            start = time.perf_counter()
+            try:
+                draft = self.cheap.summarize(text)
+            except ProviderError as e:
+                logger.warning("Cheap model %s failed, escalating: %s", self.cheap_model, e)
+                self.stats.reasons["cheap_model_error"] += 1
+            self.stats.cheap_seconds += time.perf_counter() - start
+
+            if draft is not None:
+                quality = self.quality_check(text, draft)
+                for name, score in quality.scores.items():
+                    span.set(f"quality.{name}", round(score, 3))
+                self.stats.cost += self._cost(self.cheap_model, text, draft)
+                if quality.passed:
+                    # The draft's length stands in for the premium summary's
+                    self.stats.premium_only_cost += self._cost(self.premium_model, text, draft)
+                    span.set("escalated", False)
+                    return CascadeResult(draft, self.cheap_model, False, quality)
+                self.stats.reasons.update(quality.failures)
+
+            span.set("escalated", True)
+            span.set("escalation.reasons", ",".join(quality.failures) if quality else "cheap_model_error")
+            self.stats.escalations += 1
+            start = time.perf_counter()
+            try:
+                summary = self.premium.summarize(text)
+            except ProviderError as e:
+                if draft is None:
+                    raise
+                logger.warning("Premium model %s failed, keeping the unverified draft: %s", self.premium_model, e)
+                self.stats.unverified += 1
+                span.set("verified", False)
+                return CascadeResult(draft, self.cheap_model, True, quality, verified=False)
+            finally:
+                self.stats.premium_seconds += time.perf_counter() - start
+            cost = self._cost(self.premium_model, text, summary)
+            self.stats.cost += cost
+            self.stats.premium_only_cost += cost
+            return CascadeResult(summary, self.premium_model, True, quality)
+
+    def _cost(self, model: str, input_text: str, output_text: str) -> float:
+        return self.cost_estimator(model, input_text, output_text) if self.cost_estimator else 0.0
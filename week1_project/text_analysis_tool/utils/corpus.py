@@ -0,0 +1,266 @@
+"""
+Streaming corpus loader.
+
+Sources can be files, directories (searched recursively) and glob patterns. Supported
+formats are plain text (.txt, .md), JSON lines (.jsonl, .ndjson) with one document per
+line, and tar archives of those; any of them may be gzip (.gz) or zstd (.zst) compressed.
+
+Documents are yielded one at a time, so a multi-gigabyte dump is processed in constant
+memory. Large uncompressed files are memory-mapped instead of read into a buffer. With
+a manifest, files whose content hash is unchanged since the last run are skipped:
+
+    loader = CorpusLoader(["data/", "dumps/*.jsonl.zst"], manifest_path=".corpus_manifest.json")
+    for document in loader:
+        summarize(document.text)
+"""
+
+import glob
+import gzip
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+import tarfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TEXT_SUFFIXES = (".txt", ".md")
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+TAR_SUFFIXES = (".tar", ".tgz", ".tzst")
+COMPRESSED_SUFFIXES = (".gz", ".tgz", ".zst", ".zstd", ".tzst")
+
+
+@dataclass
+class Document:
+    doc_id: str
+    text: str
+    source: str  # file the document was read from
+    metadata: Dict = field(default_factory=dict)
+
+
+@dataclass
+class LoaderStats:
+    files_read: int = 0
+    files_skipped: int = 0  # unchanged since the manifest was saved
+    documents: int = 0
+    lines_skipped: int = 0  # malformed JSON lines or lines without text
+
+
+def _kind(name: str) -> Optional[str]:
+    """"text", "jsonl" or "tar" by file name, looking through a compression suffix."""
+    name = name.lower()
+    if name.endswith(TAR_SUFFIXES) or name.endswith((".tar.gz", ".tar.zst", ".tar.zstd")):
+        return "tar"
+    for suffix in (".gz", ".zst", ".zstd"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    if name.endswith(TEXT_SUFFIXES):
+        return "text"
+    if name.endswith(JSONL_SUFFIXES):
+        return "jsonl"
+    return None
+
+
+def _zstd_reader(raw: BinaryIO) -> BinaryIO:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Reading .zst files requires the zstandard package: pip install zstandard") from e
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+
+
+def open_binary(path: str) -> BinaryIO:
+    """Opens a file for reading, decompressing gzip or zstd on the fly."""
+    name = path.lower()
+    if name.endswith((".gz", ".tgz")):
+        return gzip.open(path, "rb")
+    if name.endswith((".zst", ".zstd", ".tzst")):
+        return _zstd_reader(open(path, "rb"))
+    return open(path, "rb")
+
+
+def file_digest(path: str, mmap_threshold: int = 64 * 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes; large files are hashed through a memory map."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= mmap_threshold:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        else:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Content hashes of the files processed so far, stored as JSON.
+    A file whose size and modification time match its entry is not hashed again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def lookup(self, path: str, stat: os.stat_result, mmap_threshold: int) -> Tuple[bool, str]:
+        """Returns (unchanged, content hash) of a file."""
+        entry = self.entries.get(path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return True, entry["sha256"]
+        digest = file_digest(path, mmap_threshold)
+        return bool(entry and entry["sha256"] == digest), digest
+
+    def record(self, path: str, stat: os.stat_result, digest: str):
+        self.entries[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+
+    def save(self):
+        # Write then rename, so an interrupted save never leaves a truncated manifest
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+class CorpusLoader:
+    """
+    Lazily yields the documents of files, directories and glob patterns.
+
+    Args:
+        sources: Paths, directories or glob patterns ("**" matches subdirectories)
+        manifest_path: JSON file of content hashes; files unchanged since the last run are skipped
+        text_field: Key of the document text in JSON lines
+        id_field: Key of the document id in JSON lines; the line number is used when it is missing
+        mmap_threshold: Uncompressed files of at least this many bytes are memory-mapped
+        encoding: Text encoding of the files
+    """
+
+    def __init__(
+        self,
+        sources: Union[str, Iterable[str]],
+        manifest_path: Optional[str] = None,
+        text_field: str = "text",
+        id_field: str = "id",
+        mmap_threshold: int = 64 * 1024 * 1024,
+        encoding: str = "utf-8",
+    ):
+        self.sources = [sources] if isinstance(sources, str) else list(sources)
+        self.manifest = Manifest(manifest_path) if manifest_path else None
+        self.text_field = text_field
+        self.id_field = id_field
+        self.mmap_threshold = mmap_threshold
+        self.encoding = encoding
+        self.stats = LoaderStats()
+
+    def paths(self) -> Iterator[Tuple[str, str]]:
+        """Yields (path, name) of every supported file, in a stable order, each file once."""
+        seen = set()
+        for source in self.sources:
+            if os.path.isdir(source):
+                found = (
+                    os.path.join(directory, file_name)
+                    for directory, _, file_names in os.walk(source)
+                    for file_name in file_names
+                )
+                root = source
+            elif glob.has_magic(source):
+                found = glob.iglob(source, recursive=True)
+                root = None
+            else:
+                if not os.path.exists(source):
+                    logger.warning("File not found: %s", source)
+                found = iter([source])
+                root = None
+            for path in sorted(found):
+                key = os.path.abspath(path)
+                if key in seen or not os.path.isfile(path) or _kind(path) is None:
+                    continue
+                seen.add(key)
+                yield path, os.path.relpath(path, root) if root else os.path.basename(path)
+
+    def __iter__(self) -> Iterator[Document]:
+        for path, name in self.paths():
+            stat = digest = None
+            if self.manifest is not None:
+                stat = os.stat(path)
+                unchanged, digest = self.manifest.lookup(os.path.abspath(path), stat, self.mmap_threshold)
+                if unchanged:
+                    # Re-record, so a file that was only touched is not hashed again next time
+                    self.manifest.record(os.path.abspath(path), stat, digest)
+                    self.stats.files_skipped += 1
+                    continue
+
+            for document in self._read(path, name):
+                self.stats.documents += 1
+                yield document
+            self.stats.files_read += 1
+            # Only a file whose documents were all consumed counts as processed
+            if self.manifest is not None:
+                self.manifest.record(os.path.abspath(path), stat, digest)
+
+        if self.manifest is not None:
+            self.manifest.save()
+
+    def save_manifest(self):
+        """Saves the manifest; only needed when iteration stops before the end."""
+        if self.manifest is not None:
+            self.manifest.save()
+
+    def _read(self, path: str, name: str) -> Iterator[Document]:
+        kind = _kind(path)
+        compressed = path.lower().endswith(COMPRESSED_SUFFIXES)
+        if kind == "tar":
+            yield from self._read_tar(path, name)
+        elif not compressed and os.path.getsize(path) >= self.mmap_threshold:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if kind == "text":
+                    yield Document(name, str(mapped, self.encoding), path)
+                else:
+                    yield from self._read_jsonl(iter(mapped.readline, b""), path, name)
+        else:
+            with open_binary(path) as f:
+                if kind == "text":
+                    yield Document(name, f.read().decode(self.encoding), path)
+                else:
+                    yield from self._read_jsonl(f, path, name)
+
+    def _read_tar(self, path: str, name: str) -> Iterator[Document]:
+        # "r|" reads the archive as a stream, member by member, without seeking
+        with open_binary(path) as raw, tarfile.open(fileobj=raw, mode="r|") as archive:
+            for member in archive:
+                kind = _kind(member.name)
+                if not member.isfile() or kind not in ("text", "jsonl"):
+                    continue
+                f = archive.extractfile(member)
+                member_name = f"{name}/{member.name}"
+                if member.name.lower().endswith((".gz", ".zst", ".zstd")):
+                    logger.warning("Skipping compressed member %s", member_name)
+                elif kind == "text":
+                    yield Document(member_name, f.read().decode(self.encoding), path)
+                else:
+                    yield from self._read_jsonl(f, path, member_name)
+
+    def _read_jsonl(self, lines: Iterable[bytes], path: str, name: str) -> Iterator[Document]:
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                text = item[self.text_field]
+                if not isinstance(text, str):
+                    raise TypeError(text)
+            except (ValueError, KeyError, TypeError):
+                self.stats.lines_skipped += 1
+                logger.warning("Skipping line %d of %s: not a JSON object with %r", line_number, name, self.text_field)
+                continue
+            doc_id = item.get(self.id_field)
+            metadata = {key: value for key, value in item.items() if key not in (self.text_field, self.id_field)}
+            yield Document(str(doc_id) if doc_id is not None else f"{name}:{line_number}", text, path, metadata)
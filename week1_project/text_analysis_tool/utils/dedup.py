@@ -0,0 +1,338 @@
+"""
+Near-duplicate detection with MinHash and locality-sensitive hashing (LSH).
+
+Feeds are full of reposts and lightly edited copies, and every copy costs the same LLM
+calls as the original. DedupIndex clusters documents whose estimated Jaccard similarity
+is above a threshold, so each cluster is sent to the model once and the result reused:
+
+    index = DedupIndex(threshold=0.8, path="dedup.db")
+    for doc_id, summary, match in index.map(documents, summarizer.summarize):
+        ...
+    print(index.stats.report())
+
+Texts are lowercased, stripped of punctuation and cut into overlapping character
+shingles, which are hashed and MinHashed with numpy, a block of shingles at a time.
+The signature is split into bands; documents sharing a band are candidates, and a
+candidate only joins a cluster if its signature agrees with the cluster's first
+document on at least `threshold` of the values.
+
+The index lives in SQLite: only one signature per cluster and its band keys are kept,
+so a path on disk holds millions of documents in bounded memory. Re-running with the
+same path finds earlier documents, and their stored results, again.
+
+    python -m utils.dedup data/ --threshold 0.8 --index dedup.db
+"""
+
+import argparse
+import json
+import logging
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"\W+")
+_POLY = np.uint64(0x100000001B3)  # FNV-1a 64-bit prime, for shingle and band hashes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    num_perm INTEGER NOT NULL,
+    shingle_size INTEGER NOT NULL,
+    seed INTEGER NOT NULL,
+    bands INTEGER NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS clusters (
+    id INTEGER PRIMARY KEY,
+    doc_id TEXT NOT NULL,  -- the first document of the cluster
+    signature BLOB NOT NULL,
+    size INTEGER NOT NULL DEFAULT 1,
+    result TEXT  -- JSON of the result computed for the cluster, if any
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    key INTEGER NOT NULL,
+    cluster INTEGER NOT NULL,
+    PRIMARY KEY (band, key, cluster)
+) WITHOUT ROWID;
+"""
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, so nearby shingle hashes spread over all 64 bits."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    (bands, rows) whose LSH S-curve best separates similarities below and above the threshold,
+    weighing the false-positive and false-negative areas equally.
+    """
+    below = np.linspace(0, threshold, 200)
+    above = np.linspace(threshold, 1, 200)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        false_positives = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+        false_negatives = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+        if false_positives + false_negatives < best_error:
+            best, best_error = (bands, rows), false_positives + false_negatives
+    return best
+
+
+class MinHasher:
+    """
+    MinHash signatures of character shingles.
+
+    Args:
+        num_perm: Signature length; the Jaccard estimate's error shrinks with 1/sqrt(num_perm)
+        shingle_size: Characters per shingle, after lowercasing and collapsing punctuation
+        seed: Seed of the hash functions; signatures are only comparable under the same seed
+        block_size: Shingles hashed at a time, which bounds memory for very long documents
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 9, seed: int = 1, block_size: int = 8192):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.block_size = block_size
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: (a * x + b) mod 2**64 with odd a, keeping the high 32 bits
+        self._a = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Distinct 64-bit hashes of the text's character shingles."""
+        data = np.frombuffer(_NON_WORD.sub(" ", text.lower()).strip().encode("utf-8"), dtype=np.uint8)
+        size = min(self.shingle_size, len(data))
+        if size == 0:
+            return np.zeros(0, dtype=np.uint64)
+        count = len(data) - size + 1
+        # Polynomial hash of every window at once, one character position per step
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(size):
+            hashes = hashes * _POLY + data[offset:offset + count]
+        return np.unique(_mix(hashes))
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self.shingles(text)
+        signature = np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        for start in range(0, len(shingles), self.block_size):
+            block = shingles[start:start + self.block_size]
+            hashed = (self._a[:, None] * block[None, :] + self._b[:, None]) >> np.uint64(32)
+            signature = np.minimum(signature, hashed.min(axis=1).astype(np.uint32))
+        return signature
+
+
+def jaccard(signature: np.ndarray, other: np.ndarray) -> float:
+    """Jaccard similarity estimated from two MinHash signatures."""
+    return float(np.mean(signature == other))
+
+
+class DedupMatch(NamedTuple):
+    cluster: int
+    representative: str  # doc_id of the cluster's first document
+    similarity: float  # estimated Jaccard similarity to the representative
+    duplicate: bool  # False for the representative itself, also when an index file sees it again
+
+
+@dataclass
+class DedupStats:
+    documents: int = 0
+    clusters: int = 0  # new clusters this run
+    duplicates: int = 0
+    calls_avoided: int = 0  # results reused instead of recomputed
+
+    def report(self, calls_per_document: Optional[float] = None) -> str:
+        """
+        Summary lines. Avoided calls are the results reused, times calls_per_document
+        when each result stands for several calls.
+        """
+        rate = self.duplicates / self.documents if self.documents else 0.0
+        avoided = self.calls_avoided * (1 if calls_per_document is None else calls_per_document)
+        return "\n".join([
+            "\n" + "=" * 60,
+            "NEAR-DUPLICATE DETECTION",
+            "=" * 60,
+            f"Documents: {self.documents}",
+            f"New clusters: {self.clusters}",
+            f"Near-duplicates: {self.duplicates} ({rate:.1%})",
+            f"LLM calls avoided: {avoided:g}",
+            "=" * 60,
+        ])
+
+
+class DedupIndex:
+    """
+    LSH index of MinHash signatures that assigns each document to a near-duplicate cluster.
+
+    Args:
+        threshold: Estimated Jaccard similarity at or above which documents share a cluster
+        num_perm: MinHash signature length
+        shingle_size: Characters per shingle
+        path: SQLite file of the index; in memory by default
+        seed: MinHash seed, fixed per index file
+        max_candidates: Clusters compared per document, against hot buckets
+        commit_every: Documents added per SQLite transaction
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 9,
+        path: Optional[str] = None,
+        seed: int = 1,
+        max_candidates: int = 50,
+        commit_every: int = 1000,
+    ):
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.commit_every = commit_every
+        self.db = sqlite3.connect(path or ":memory:")
+        self.db.execute("PRAGMA cache_size = -65536")  # 64 MB of pages, whatever the index size
+        self.db.executescript(SCHEMA)
+        stored = self.db.execute("SELECT num_perm, shingle_size, seed, bands, rows FROM settings").fetchone()
+        if stored is None:
+            bands, rows = optimal_bands(threshold, num_perm)
+            with self.db:
+                self.db.execute("INSERT INTO settings VALUES (?, ?, ?, ?, ?)", (num_perm, shingle_size, seed, bands, rows))
+        elif stored[:3] != (num_perm, shingle_size, seed):
+            raise ValueError(
+                f"Index {path} was built with num_perm={stored[0]}, shingle_size={stored[1]}, seed={stored[2]}"
+            )
+        else:
+            bands, rows = stored[3:]
+        self.bands, self.rows = bands, rows
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.stats = DedupStats()
+        self._uncommitted = 0
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit key per band, as SQLite stores integers."""
+        rows = signature[:self.bands * self.rows].reshape(self.bands, self.rows).astype(np.uint64)
+        keys = np.zeros(self.bands, dtype=np.uint64)
+        for column in rows.T:
+            keys = (keys ^ column) * _POLY
+        return keys.view(np.int64).tolist()
+
+    def add(self, doc_id: str, text: str) -> DedupMatch:
+        """
+        Assigns a document to the most similar cluster above the threshold, or starts a new one.
+        A cluster's representative added again, e.g. on a re-run over a persisted index,
+        is matched to its own cluster and not counted as a near-duplicate.
+        """
+        signature = self.hasher.signature(text)
+        keys = self.band_keys(signature)
+        self.stats.documents += 1
+
+        # One primary-key lookup per band; a row-value IN list would scan the whole table
+        lookups = " UNION ".join(["SELECT cluster FROM buckets WHERE band = ? AND key = ?"] * len(keys))
+        candidates = self.db.execute(
+            f"SELECT id, doc_id, signature FROM clusters WHERE id IN ({lookups} LIMIT ?)",
+            [value for pair in enumerate(keys) for value in pair] + [self.max_candidates],
+        ).fetchall()
+        best = None
+        for cluster, representative, stored in candidates:
+            similarity = jaccard(signature, np.frombuffer(stored, dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = DedupMatch(cluster, representative, similarity, True)
+
+        if best is not None and best.representative == doc_id:
+            best = best._replace(duplicate=False)
+        elif best is not None:
+            self.db.execute("UPDATE clusters SET size = size + 1 WHERE id = ?", (best.cluster,))
+            self.stats.duplicates += 1
+        else:
+            cluster = self.db.execute(
+                "INSERT INTO clusters (doc_id, signature) VALUES (?, ?)", (doc_id, signature.tobytes())
+            ).lastrowid
+            self.db.executemany(
+                "INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)", [(band, key, cluster) for band, key in enumerate(keys)]
+            )
+            self.stats.clusters += 1
+            best = DedupMatch(cluster, doc_id, 1.0, False)
+
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.commit()
+        return best
+
+    def result(self, cluster: int) -> Optional[Any]:
+        """The result stored for a cluster, or None."""
+        row = self.db.execute("SELECT result FROM clusters WHERE id = ?", (cluster,)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def set_result(self, cluster: int, result: Any):
+        """Stores a JSON-serializable result for every document of the cluster."""
+        self.db.execute("UPDATE clusters SET result = ? WHERE id = ?", (json.dumps(result), cluster))
+
+    def map(
+        self, documents: Iterable[Tuple[str, str]], func: Callable[[str], Any]
+    ) -> Iterator[Tuple[str, Any, DedupMatch]]:
+        """
+        Yields (doc_id, func(text), match) for every document, calling func once per cluster;
+        near-duplicates get the result computed for their cluster. A call that raises is
+        not stored, so the next document of the cluster tries again.
+        """
+        for doc_id, text in documents:
+            match = self.add(doc_id, text)
+            result = self.result(match.cluster)
+            if result is None:
+                result = func(text)
+                self.set_result(match.cluster, result)
+            else:
+                self.stats.calls_avoided += 1
+            yield doc_id, result, match
+        self.commit()
+
+    def clusters(self, min_size: int = 2) -> Iterator[Tuple[int, str, int]]:
+        """(cluster, representative doc_id, size) of the clusters with at least min_size documents."""
+        self.commit()
+        yield from self.db.execute(
+            "SELECT id, doc_id, size FROM clusters WHERE size >= ? ORDER BY size DESC", (min_size,)
+        )
+
+    def commit(self):
+        self.db.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+
+def main():
+    from utils.corpus import CorpusLoader
+
+    parser = argparse.ArgumentParser(description="Find near-duplicate documents in a corpus.")
+    parser.add_argument("sources", nargs="+", help="Files, directories, globs, .jsonl or .gz/.zst archives")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Estimated Jaccard similarity of near-duplicates")
+    parser.add_argument("--index", help="SQLite file of the index; re-run with the same file to add to it")
+    parser.add_argument("--num-perm", type=int, default=128)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    index = DedupIndex(args.threshold, args.num_perm, path=args.index)
+    try:
+        for document in CorpusLoader(args.sources):
+            match = index.add(document.doc_id, document.text)
+            if match.duplicate:
+                # Each near-duplicate could reuse its cluster's summary
+                index.stats.calls_avoided += 1
+                print(f"{document.doc_id}\tnear-duplicate of {match.representative} ({match.similarity:.2f})")
+        print(index.stats.report())
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,41 @@
+import itertools
 import os
 import time
+from typing import Optional
 import google.generativeai as genai
-from google.api_core import exceptions
-from openai import OpenAI, OpenAIError
+import httpx
+from openai import OpenAI
 from dotenv import load_dotenv
+from utils.prompts import gemini_summary_prompt, openai_summary_messages
+from buildables_common.chunking import Chunker
+from buildables_common.resilience import RetryPolicy, breaker_for, call_with_retries
+from buildables_common.tracing import tracer
 
 load_dotenv()
 
 class Summarizer:
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, chunker: Optional[Chunker] = None, retry_policy: Optional[RetryPolicy] = None):
         """
         Initialize summarizer with a provider.
-        Supported providers: "gemini-2.5-pro", "gpt-5"
+        Supported providers: "gemini-2.5-pro", "gpt-5", and for cheap drafts
+        "gemini-2.0-flash" or a local Ollama model as "ollama:<model>", e.g. "ollama:llama3.2"
+
+        With a chunker, texts longer than chunker.chunk_size tokens are summarized
+        chunk by chunk, and the chunk summaries are then summarized together.
+
+        Failed calls raise a buildables_common.resilience.ProviderError instead of returning text.
+        Rate limits and outages are retried per retry_policy, and a provider that keeps
+        failing is skipped by its circuit breaker until it recovers. Breakers are kept
+        per model, so a cheap and a premium model of one provider fail independently.
         """
         self.model_name = model_name
-        if "gpt" in model_name.lower():
-            self.openai_client = OpenAI()  # initialize OpenAI client only if needed
+        self.chunker = chunker
+        self.retry_policy = retry_policy or RetryPolicy()
+        if model_name.startswith("ollama:"):
+            self.ollama_client = httpx.Client(base_url=os.getenv("OLLAMA_HOST", "http://localhost:11434"), timeout=120)
+        elif "gpt" in model_name.lower():
+            # Retries are done by the retry policy, not stacked on the SDK's own
+            self.openai_client = OpenAI(max_retries=0)  # initialize OpenAI client only if needed
         elif "gemini" in model_name.lower():
             genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
@@ -24,40 +44,72 @@ class Summarizer:
         Generates a concise summary of the provided text
         using the selected LLM provider.
         """
-        time.sleep(1)  # simple rate limiting
+        with tracer.span("summarize", {"gen_ai.request.model": self.model_name, "text.chars": len(text)}) as span:
+            if self.chunker is not None and self.chunker.count_tokens(text) > self.chunker.chunk_size:
+                span.set("chunked", True)
+                return self._summarize_chunks(text)
+            return self._summarize_text(text)
+
+    def _summarize_text(self, text: str) -> str:
+        with tracer.span("rate_limit.wait"):
+            time.sleep(1)  # simple rate limiting
 
-        if self.model_name == "gemini-2.5-pro":
-            return self._summarize_with_gemini(text)
+        breaker = breaker_for(self.model_name)
+        if self.model_name.startswith("ollama:"):
+            return call_with_retries("ollama", self._summarize_with_ollama, text, policy=self.retry_policy, breaker=breaker)
+        elif self.model_name in ("gemini-2.5-pro", "gemini-2.0-flash"):
+            return call_with_retries("gemini", self._summarize_with_gemini, text, policy=self.retry_policy, breaker=breaker)
         elif self.model_name == "gpt-5":
-            return self._summarize_with_openai(text)
+            return call_with_retries("openai", self._summarize_with_openai, text, policy=self.retry_policy, breaker=breaker)
         else:
-            raise ValueError("Invalid provider. Use 'gemini-2.5-pro' or 'gpt-5'.")
+            raise ValueError("Invalid provider. Use 'gemini-2.5-pro', 'gemini-2.0-flash', 'gpt-5' or 'ollama:<model>'.")
+
+    def _summarize_chunks(self, text: str) -> str:
+        """Map-reduce: summarize each chunk, then the chunk summaries, until they fit in one chunk."""
+        tokens = self.chunker.count_tokens(text)
+        for round_number in itertools.count(1):
+            with tracer.span("summarize.map", {"round": round_number, "input_tokens": tokens}) as span:
+                chunks = self.chunker.chunk_text(text)
+                span.set("chunks", len(chunks))
+                combined = "\n\n".join(self._summarize_text(chunk.text) for chunk in chunks)
+            combined_tokens = self.chunker.count_tokens(combined)
+            # Stop when the summaries fit, or when another round would not shrink them
+            if combined_tokens <= self.chunker.chunk_size or combined_tokens >= tokens:
+                with tracer.span("summarize.reduce", {"input_tokens": combined_tokens}):
+                    return self._summarize_text(combined)
+            text, tokens = combined, combined_tokens
 
     def _summarize_with_gemini(self, text: str) -> str:
-        try:
+        with tracer.span("gemini.generate_content", {"gen_ai.system": "gemini", "gen_ai.request.model": self.model_name}) as span:
             model = genai.GenerativeModel(self.model_name)
-            prompt = f"Summarize the following text concisely:\n\n{text}"
+            prompt = gemini_summary_prompt(text)
             response = model.generate_content(prompt)
+            usage = response.usage_metadata
+            span.set("gen_ai.usage.input_tokens", usage.prompt_token_count)
+            span.set("gen_ai.usage.output_tokens", usage.candidates_token_count)
             return response.text
-        except exceptions.ResourceExhausted:
-            return "Error: API rate limit exceeded. Please try again later."
-        except exceptions.GoogleAPIError as e:
-            return f"Error: Google API error occurred. Details: {e}"
-        except Exception as e:
-            return f"Error: An unexpected error occurred. Details: {e}"
 
     def _summarize_with_openai(self, text: str) -> str:
-        try:
-            prompt_messages = [
-                {"role": "system", "content": "You are a helpful assistant that provides concise summaries."},
-                {"role": "user", "content": f"Summarize the following text:\n\n{text}"}
-            ]
+        with tracer.span("openai.chat.completions", {"gen_ai.system": "openai", "gen_ai.request.model": self.model_name}) as span:
+            prompt_messages = openai_summary_messages(text)
             completion = self.openai_client.chat.completions.create(
                 model=self.model_name,
                 messages=prompt_messages
             )
+            if completion.usage is not None:
+                span.set("gen_ai.usage.input_tokens", completion.usage.prompt_tokens)
+                span.set("gen_ai.usage.output_tokens", completion.usage.completion_tokens)
             return completion.choices[0].message.content
-        except OpenAIError as e:
-            return f"Error: OpenAI API error. Details: {e}"
-        except Exception as e:
-            return f"Error: An unexpected error occurred with OpenAI. Details: {e}"
+
+    def _summarize_with_ollama(self, text: str) -> str:
+        model = self.model_name[len("ollama:"):]
+        with tracer.span("ollama.generate", {"gen_ai.system": "ollama", "gen_ai.request.model": model}) as span:
+            response = self.ollama_client.post(
+                "/api/generate",
+                json={"model": model, "prompt": gemini_summary_prompt(text), "stream": False}
+            )
+            response.raise_for_status()
+            result = response.json()
+            span.set("gen_ai.usage.input_tokens", result.get("prompt_eval_count", 0))
+            span.set("gen_ai.usage.output_tokens", result.get("eval_count", 0))
+            return result["response"]
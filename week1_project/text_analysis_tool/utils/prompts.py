@@ -0,0 +1,16 @@
+"""Summarization prompts, shared by the synchronous Summarizer and batch submission."""
+
+from typing import Dict, List
+
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that provides concise summaries."
+
+
+def gemini_summary_prompt(text: str) -> str:
+    return f"Summarize the following text concisely:\n\n{text}"
+
+
+def openai_summary_messages(text: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Summarize the following text:\n\n{text}"}
+    ]
@@ -1,4 +1,5 @@
 from langchain_core.messages import HumanMessage
+from utils.persona_registry import parse_persona_file
 import os
 PROMPTS_BASE_DIR = os.path.join(os.path.dirname(__file__), "prompts")
 
@@ -7,7 +8,8 @@ def load_system_prompt_content(persona_file_name: str) -> str:
     file_path = os.path.join(PROMPTS_BASE_DIR, persona_file_name)
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read().strip()
+            # Strips the optional metadata header; web_app uses PersonaRegistry instead
+            return parse_persona_file(persona_file_name, f.read(), 0.0).prompt
     except Exception as e:
         print(f"Error loading prompt '{persona_file_name}' from {file_path}: {e}. Using a default helpful assistant message.")
         return "You are a helpful assistant."
@@ -31,12 +33,9 @@ def get_ai_response_for_chat(
         str(msg.content) for msg in temp_chat_history
     )
 
-    try:
-        # Use the ChatModel instance to get the response
-        response = model_instance.openai_chat_models(formatted_prompt) # Or gemini_chat_models
-        return response
-    except Exception as e:
-        return f"An error occurred during AI generation: {e}"
+    # Use the ChatModel instance to get the response. A failed call raises a
+    # buildables_common.resilience.ProviderError rather than being returned as the AI's reply
+    return model_instance.openai_chat_models(formatted_prompt) # Or gemini_chat_models
 
 # If you still want a CLI, you could put a small main function here:
 if __name__ == "__main__":
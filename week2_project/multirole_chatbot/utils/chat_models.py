@@ -1,54 +1,132 @@
 import openai
 import google.generativeai as genai
+from buildables_common.resilience import AuthenticationError, call_with_retries, classify
+from buildables_common.tracing import current_span, tracer
 
 class ChatModel:
     """A class to encapsulate chat model interactions with different APIs.
     """
 
-    def __init__(self, openai_api: str | None = None, gemini_api: str | None = None) -> None:
+    def __init__(
+        self,
+        openai_api: str | None = None,
+        gemini_api: str | None = None,
+        openai_model: str = "gpt-4",
+        gemini_model: str = "gemini-2.0-flash",
+    ) -> None:
         """
-        Initialize the chatmodel class with api keys
+        Initialize the chatmodel class with api keys and model names
         """
         self.openai_api = openai_api
         self.gemini_api = gemini_api
+        self.openai_model = openai_model
+        self.gemini_model = gemini_model
+        self._openai_client = None
+        self._async_openai_client = None
 
         if self.openai_api is None:
             print("Warning: OpenAI API key was not provided.")
         if self.gemini_api is None:
             print("Warning: Gemini API key was not provided.")
-    
+        else:
+            genai.configure(api_key=self.gemini_api)
+
+    def _openai_span(self, prompt: str):
+        return tracer.span("openai.chat", {"gen_ai.system": "openai", "gen_ai.request.model": self.openai_model,
+                                           "prompt.chars": len(prompt)})
+
+    def _gemini_span(self, prompt: str):
+        return tracer.span("gemini.chat", {"gen_ai.system": "gemini", "gen_ai.request.model": self.gemini_model,
+                                           "prompt.chars": len(prompt)})
+
+    @staticmethod
+    def _record_openai_usage(response) -> None:
+        if response.usage is not None:
+            span = current_span()
+            span.set("gen_ai.usage.input_tokens", response.usage.prompt_tokens)
+            span.set("gen_ai.usage.output_tokens", response.usage.completion_tokens)
+
+    @staticmethod
+    def _record_gemini_usage(response) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            span = current_span()
+            span.set("gen_ai.usage.input_tokens", usage.prompt_token_count)
+            span.set("gen_ai.usage.output_tokens", usage.candidates_token_count)
+
+    def _openai_messages(self, prompt: str) -> list[dict]:
+        return [
+            {"role": "system", "content": "You are a helpful and concise assistant."},
+            {"role": "user", "content": prompt}
+        ]
+
     def openai_chat_models(self, prompt: str) -> str:
-        """Sends a prompt to the OpenAI chat model (GPT-4) and returns the response."""
+        """Sends a prompt to the OpenAI chat model (GPT-4) and returns the response.
+        Raises a buildables_common.resilience.ProviderError if the call fails after retries."""
         if self.openai_api is None:
-            return "Error: OpenAI API key was not provided."
-        try:
-            client = openai.OpenAI(api_key=self.openai_api)
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a helpful and concise assistant."},
-                    {"role": "user", "content": prompt}
-                ]
+            raise AuthenticationError("openai", "OpenAI API key was not provided.")
+        return call_with_retries("openai", self._openai_chat, prompt)
+
+    def _openai_chat(self, prompt: str) -> str:
+        with self._openai_span(prompt):
+            if self._openai_client is None:
+                # Retries are done by call_with_retries, not stacked on the SDK's own
+                self._openai_client = openai.OpenAI(api_key=self.openai_api, max_retries=0)
+            response = self._openai_client.chat.completions.create(
+                model=self.openai_model,
+                messages=self._openai_messages(prompt)
             )
+            self._record_openai_usage(response)
             # Corrected: Check if content is None before calling .strip()
             content = response.choices[0].message.content
             return content.strip() if content is not None else ""
-            
-        except Exception as e:
-            return f"An error occurred with the OpenAI API: {e}"
-    
+
     def gemini_chat_models(self, prompt: str) -> str:
-        """sends a prompt to the Gemini chat model and returns the response."""
-        
+        """sends a prompt to the Gemini chat model and returns the response.
+        Raises a buildables_common.resilience.ProviderError if the call fails after retries."""
+
         if self.gemini_api is None:
-            return "Error: Gemini API key was not provided."
-        try:
-            genai.configure(api_key=self.gemini_api)
-            model = genai.GenerativeModel("gemini-2.0-flash")
+            raise AuthenticationError("gemini", "Gemini API key was not provided.")
+        return call_with_retries("gemini", self._gemini_chat, prompt)
+
+    def _gemini_chat(self, prompt: str) -> str:
+        with self._gemini_span(prompt):
+            model = genai.GenerativeModel(self.gemini_model)
             response = model.generate_content(prompt)
+            self._record_gemini_usage(response)
             # Corrected: Check if response.text is None before calling .strip()
             content = response.text
             return content.strip() if content is not None else ""
-            
-        except Exception as e:
-            return f"An error occurred with the Gemini API: {e}"
+
+    async def aopenai_chat(self, prompt: str) -> str:
+        """Async OpenAI call that raises a ProviderError on failure, so callers can fail over or cancel it."""
+        if self.openai_api is None:
+            raise AuthenticationError("openai", "OpenAI API key was not provided.")
+        if self._async_openai_client is None:
+            # The router fails over instead of retrying, so the SDK does not retry either
+            self._async_openai_client = openai.AsyncOpenAI(api_key=self.openai_api, max_retries=0)
+        with self._openai_span(prompt):
+            try:
+                response = await self._async_openai_client.chat.completions.create(
+                    model=self.openai_model,
+                    messages=self._openai_messages(prompt)
+                )
+            except Exception as e:
+                raise classify("openai", e) from e
+            self._record_openai_usage(response)
+        content = response.choices[0].message.content
+        return content.strip() if content is not None else ""
+
+    async def agemini_chat(self, prompt: str) -> str:
+        """Async Gemini call that raises a ProviderError on failure, so callers can fail over or cancel it."""
+        if self.gemini_api is None:
+            raise AuthenticationError("gemini", "Gemini API key was not provided.")
+        model = genai.GenerativeModel(self.gemini_model)
+        with self._gemini_span(prompt):
+            try:
+                response = await model.generate_content_async(prompt)
+            except Exception as e:
+                raise classify("gemini", e) from e
+            self._record_gemini_usage(response)
+        content = response.text
+        return content.strip() if content is not None else ""
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from buildables_common.resilience import ProviderUnavailableError
+from buildables_common.tracing import current_span, tracer
+
+from utils.chat_models import ChatModel
+
+# Approximate USD per 1M input tokens, used by the "cost" policy
+PROVIDER_COSTS = {
+    "OpenAI": 30.00,  # gpt-4
+    "Gemini": 0.10,   # gemini-2.0-flash
+}
+
+
+class ProviderStats:
+    """Rolling latency and failure statistics for one provider."""
+
+    def __init__(self, window: int = 50) -> None:
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.failures = 0
+        self.down_until = 0.0
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.failures = 0
+
+    def record_failure(self, cooldown: float, retry_after: float | None = None) -> None:
+        """
+        Counts a failure and keeps the provider out of rotation for the cooldown period,
+        or for as long as a rate-limiting provider asked if that is longer.
+        """
+        self.failures += 1
+        self.down_until = time.monotonic() + max(cooldown * self.failures, retry_after or 0.0)
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def percentile(self, q: float) -> float | None:
+        """Returns the q-th percentile (0-100) of the recorded latencies, or None without samples."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+
+@dataclass
+class RoutedResponse:
+    text: str
+    provider: str
+    latency: float
+    hedged: bool = False
+
+
+class ModelRouter:
+    """
+    Routes each chat request to a provider chosen by a latency or cost policy.
+    Fails over to the next provider on errors and, optionally, sends a hedged
+    duplicate request when the first provider exceeds its p95 latency, keeping
+    whichever answer arrives first and cancelling the other.
+    """
+
+    def __init__(
+        self,
+        model: ChatModel,
+        policy: str = "latency",
+        hedge: bool = True,
+        default_deadline: float = 8.0,
+        min_hedge_delay: float = 1.0,
+        cooldown: float = 15.0,
+    ) -> None:
+        """
+        Args:
+            model: ChatModel holding the provider clients
+            policy: "latency" (fastest rolling median first) or "cost" (cheapest first)
+            hedge: Send a duplicate request to the next provider after the p95 deadline
+            default_deadline: Hedge deadline in seconds until a provider has enough samples
+            min_hedge_delay: Lower bound on the hedge deadline in seconds
+            cooldown: Seconds a failing provider is skipped, multiplied by its consecutive failures
+        """
+        if policy not in ("latency", "cost"):
+            raise ValueError("Invalid policy. Use 'latency' or 'cost'.")
+        self.policy = policy
+        self.hedge = hedge
+        self.default_deadline = default_deadline
+        self.min_hedge_delay = min_hedge_delay
+        self.cooldown = cooldown
+
+        self.providers = {}
+        if model.openai_api is not None:
+            self.providers["OpenAI"] = model.aopenai_chat
+        if model.gemini_api is not None:
+            self.providers["Gemini"] = model.agemini_chat
+        self.stats = {name: ProviderStats() for name in self.providers}
+
+        # The async provider clients are bound to one event loop, so all requests run on
+        # a single background loop instead of a fresh asyncio.run() per Streamlit rerun
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="model-router-loop", daemon=True).start()
+
+    def rank(self, preferred: str | None = None) -> list[str]:
+        """
+        Orders providers for a request. Healthy providers come before ones in
+        cooldown; the preferred provider leads if it is healthy.
+        """
+        def policy_key(name: str) -> float:
+            if self.policy == "cost":
+                return PROVIDER_COSTS.get(name, float("inf"))
+            # Providers without samples sort first so they get measured
+            return self.stats[name].percentile(50) or 0.0
+
+        order = sorted(self.providers, key=lambda name: (not self.stats[name].available, policy_key(name)))
+        if preferred in order and self.stats[preferred].available:
+            order.remove(preferred)
+            order.insert(0, preferred)
+        return order
+
+    def hedge_delay(self, provider: str) -> float:
+        """Seconds to wait on a provider before hedging: its rolling p95 latency."""
+        stats = self.stats[provider]
+        p95 = stats.percentile(95) if len(stats.latencies) >= 5 else None
+        return max(p95 if p95 is not None else self.default_deadline, self.min_hedge_delay)
+
+    async def _call(self, provider: str, prompt: str) -> tuple[str, float]:
+        start = time.monotonic()
+        text = await self.providers[provider](prompt)
+        return text, time.monotonic() - start
+
+    async def acomplete(self, prompt: str, preferred: str | None = None) -> RoutedResponse:
+        """Gets a response from the best available provider, with failover and hedging."""
+        with tracer.span("router.complete", {"policy": self.policy, "preferred": preferred or ""}) as span:
+            routed = await self._route(prompt, preferred)
+            span.set("provider", routed.provider)
+            span.set("hedged", routed.hedged)
+            return routed
+
+    async def _route(self, prompt: str, preferred: str | None) -> RoutedResponse:
+        queue = self.rank(preferred)
+        if not queue:
+            raise RuntimeError("No chat provider is configured. Please set an API key.")
+
+        start = time.monotonic()
+        pending: dict[asyncio.Task, str] = {}
+        started: dict[str, float] = {}
+        errors: dict[str, Exception] = {}
+        hedged = False
+
+        def launch() -> str:
+            provider = queue.pop(0)
+            started[provider] = time.monotonic()
+            pending[asyncio.create_task(self._call(provider, prompt))] = provider
+            return provider
+
+        primary = launch()
+        while pending:
+            timeout = None
+            if self.hedge and not hedged and queue and len(pending) == 1:
+                timeout = max(self.hedge_delay(primary) - (time.monotonic() - started[primary]), 0)
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                # Primary is slower than its usual p95: race a duplicate request against it
+                current_span().add_event("hedge", {"slow_provider": primary, "hedge_provider": launch()})
+                hedged = True
+                continue
+
+            for task in done:
+                provider = pending.pop(task)
+                try:
+                    text, latency = task.result()
+                except Exception as e:
+                    self.stats[provider].record_failure(self.cooldown, getattr(e, "retry_after", None))
+                    errors[provider] = e
+                    current_span().add_event("failover", {"provider": provider, "error": type(e).__name__,
+                                                          "message": str(e)})
+                    continue
+
+                self.stats[provider].record_success(latency)
+                for loser in pending:
+                    loser.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                return RoutedResponse(text, provider, time.monotonic() - start, hedged)
+
+            if not pending and queue:
+                primary = launch()
+
+        details = "; ".join(str(error) for error in errors.values())
+        raise ProviderUnavailableError("router", f"All chat providers failed. {details}")
+
+    def complete(self, prompt: str, preferred: str | None = None) -> RoutedResponse:
+        """Synchronous wrapper around acomplete for Streamlit scripts."""
+        return asyncio.run_coroutine_threadsafe(self.acomplete(prompt, preferred), self._loop).result()
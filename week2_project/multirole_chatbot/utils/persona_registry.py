@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+DEFAULT_PROMPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "prompts")
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional, fall back to a character estimate
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    """Counts tokens with tiktoken when available, otherwise estimates ~4 characters per token."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def display_name(file_name: str) -> str:
+    """Turns 'technical_expert.txt' into 'Technical Expert'."""
+    return os.path.splitext(file_name)[0].replace("_", " ").title()
+
+
+@dataclass(frozen=True)
+class Persona:
+    """A persona prompt loaded from prompts/*.txt, with its precomputed metadata."""
+    name: str
+    file_name: str
+    prompt: str
+    token_count: int
+    mtime: float
+    preferred_model: str | None = None
+    max_history: int | None = None
+
+
+def parse_persona_file(file_name: str, raw: str, mtime: float) -> Persona:
+    """
+    Builds a Persona from the raw file content.
+    An optional header between '---' lines sets metadata, e.g.:
+
+        ---
+        preferred_model: Gemini
+        max_history: 20
+        ---
+    """
+    metadata = {}
+    content = raw.lstrip()
+    if content.startswith("---"):
+        header, sep, rest = content[3:].partition("\n---")
+        if sep:
+            for line in header.splitlines():
+                key, colon, value = line.partition(":")
+                if colon:
+                    metadata[key.strip().lower()] = value.strip()
+            content = rest
+    prompt = content.strip() or DEFAULT_SYSTEM_PROMPT
+
+    max_history = metadata.get("max_history")
+    return Persona(
+        name=display_name(file_name),
+        file_name=file_name,
+        prompt=prompt,
+        token_count=count_tokens(prompt),
+        mtime=mtime,
+        preferred_model=metadata.get("preferred_model") or None,
+        max_history=int(max_history) if max_history and max_history.isdigit() else None,
+    )
+
+
+class PersonaRegistry:
+    """
+    In-memory registry of persona prompts.
+    Files are read once; a background thread polls their modification times and
+    reloads only the files that changed, so lookups never touch the filesystem.
+    """
+
+    def __init__(self, prompts_dir: str = DEFAULT_PROMPTS_DIR, poll_interval: float = 2.0, watch: bool = True) -> None:
+        """
+        Initialize the registry and load every persona file.
+
+        Args:
+            prompts_dir: Directory containing the persona .txt files
+            poll_interval: Seconds between modification-time checks of the watcher thread
+            watch: Start the background watcher thread
+        """
+        self.prompts_dir = prompts_dir
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._personas: dict[str, Persona] = {}
+        self.refresh()
+
+        if watch:
+            threading.Thread(target=self._watch, name="persona-registry-watcher", daemon=True).start()
+
+    def refresh(self) -> bool:
+        """Rescans the prompts directory and reloads new or modified files. Returns True if anything changed."""
+        with self._lock:
+            try:
+                entries = {
+                    entry.name: entry.stat().st_mtime
+                    for entry in os.scandir(self.prompts_dir)
+                    if entry.is_file() and entry.name.endswith(".txt")
+                }
+            except FileNotFoundError:
+                entries = {}
+
+            current = self._personas
+            by_file = {p.file_name: p for p in current.values()}
+            updated = {}
+            for file_name, mtime in sorted(entries.items()):
+                persona = by_file.get(file_name)
+                if persona is None or persona.mtime != mtime:
+                    try:
+                        with open(os.path.join(self.prompts_dir, file_name), "r", encoding="utf-8") as f:
+                            persona = parse_persona_file(file_name, f.read(), mtime)
+                    except OSError as e:
+                        print(f"Error loading prompt '{file_name}': {e}")
+                        continue
+                updated[persona.name] = persona
+
+            if updated.keys() == current.keys() and all(updated[k] is current[k] for k in updated):
+                return False
+            self._personas = updated
+            return True
+
+    def _watch(self) -> None:
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Persona registry refresh failed: {e}")
+
+    def names(self) -> list[str]:
+        """Display names of all loaded personas."""
+        return list(self._personas)
+
+    def get(self, name: str) -> Persona | None:
+        """Returns the persona with the given display name, or None."""
+        return self._personas.get(name)
@@ -1,28 +1,34 @@
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from chat_core import load_system_prompt_content
 from utils.chat_models import ChatModel
+from utils.model_router import ModelRouter
+from utils.persona_registry import DEFAULT_SYSTEM_PROMPT, PersonaRegistry
+from buildables_common.tracing import tracer
 import streamlit as st
 import config
 import os
-# --- Configuration & Path Setup ---
-# PROMPTS_BASE_DIR for loading persona files
-_PROMPTS_ABS_DIR = os.path.join(os.path.dirname(__file__), "prompts")
-
-# Ensure the prompts directory exists for user feedback
-if not os.path.exists(_PROMPTS_ABS_DIR):
-    os.makedirs(_PROMPTS_ABS_DIR)
-    st.warning(f"Created missing prompts directory: {_PROMPTS_ABS_DIR}")
 
 # --- Helper Functions ---
+@st.cache_resource
+def get_persona_registry() -> PersonaRegistry:
+    """
+    Loads the persona prompts once per server process. The registry watches the
+    prompts directory itself, so reruns never touch the filesystem.
+    """
+    return PersonaRegistry()
+
+@st.cache_resource
+def get_model_router(_model: ChatModel) -> ModelRouter:
+    """
+    Creates one router per server process, so the rolling latency statistics
+    that drive routing come from every session's traffic.
+    """
+    return ModelRouter(_model)
+
 def get_available_personas() -> list[str]:
     """
-    Scans the PROMPTS_BASE_DIR for .txt files and returns their base names (display format).
+    Returns the display names of the personas held in the registry.
     """
-    if not os.path.exists(_PROMPTS_ABS_DIR):
-        return []
-    
-    persona_files = [f for f in os.listdir(_PROMPTS_ABS_DIR) if f.endswith(".txt")]
-    return [os.path.splitext(f)[0].replace('_', ' ').title() for f in persona_files]
+    return get_persona_registry().names()
 
 def export_chat_history_as_text():
     """Formats the chat history into a downloadable text string."""
@@ -48,7 +54,7 @@ if "chat_history" not in st.session_state:
 if "system_prompt_content" not in st.session_state:
     st.session_state.system_prompt_content = "" # Will be set by selector
 if "selected_llm" not in st.session_state:
-    st.session_state.selected_llm = "OpenAI" # Default LLM
+    st.session_state.selected_llm = "Auto" # Default: let the router pick the fastest provider
 
 # Initialize ChatModel only once and store in session state
 if "model" not in st.session_state:
@@ -70,11 +76,13 @@ if "model" not in st.session_state:
 st.sidebar.header("Chat Settings")
 
 # 1. LLM Selector
+llm_options = ["Auto", "OpenAI", "Gemini"]
 selected_llm_option = st.sidebar.selectbox(
     "Choose AI Model:",
-    options=["OpenAI", "Gemini"],
-    index=0 if st.session_state.selected_llm == "OpenAI" else 1, # Set initial index based on session state
-    key="llm_selector"
+    options=llm_options,
+    index=llm_options.index(st.session_state.selected_llm), # Set initial index based on session state
+    key="llm_selector",
+    help="Auto routes each message to the fastest healthy provider. A specific model is tried first and other providers are used on failure."
 )
 # Update session state if LLM selection changes
 if selected_llm_option != st.session_state.selected_llm:
@@ -100,11 +108,14 @@ else:
         key="persona_selector"
     )
 
-# Convert display name back to file name format
-selected_persona_file_name = selected_persona_display_name.lower().replace(' ', '_') + ".txt" if selected_persona_display_name != "Default Assistant" else ""
-
-# Load the system prompt based on selection
-new_system_prompt_content = load_system_prompt_content(selected_persona_file_name) if selected_persona_file_name else "You are a helpful assistant."
+# Look up the precompiled persona; no file is read here
+selected_persona = get_persona_registry().get(selected_persona_display_name)
+new_system_prompt_content = selected_persona.prompt if selected_persona else DEFAULT_SYSTEM_PROMPT
+if selected_persona:
+    persona_details = f"Persona prompt: {selected_persona.token_count} tokens"
+    if selected_persona.preferred_model:
+        persona_details += f" · Recommended model: {selected_persona.preferred_model}"
+    st.sidebar.caption(persona_details)
 
 # Reset chat history if persona changes
 if st.session_state.system_prompt_content != new_system_prompt_content:
@@ -158,28 +169,27 @@ if user_query := st.chat_input("Type your message here...", key="chat_input"):
     with st.spinner(f"Thinking with {st.session_state.selected_llm} as {selected_persona_display_name}..."):
         try:
             # Prepare prompt for the model (including the current system message)
+            # and keep only as many past messages as the persona allows
+            history = st.session_state.chat_history
+            if selected_persona and selected_persona.max_history:
+                history = history[:1] + history[1:][-selected_persona.max_history:]
             # Ensure all contents are strings for the model
             formatted_prompt = " ".join(
-                str(msg.content) for msg in st.session_state.chat_history
+                str(msg.content) for msg in history
             )
             
-            # --- CONDITIONAL MODEL CALLING ---
-            if st.session_state.selected_llm == "OpenAI":
-                if st.session_state.model.openai_api is None:
-                    ai_response_text = "Error: OpenAI API key is not set. Please check your config.py or environment variables."
-                else:
-                    ai_response_text = st.session_state.model.openai_chat_models(formatted_prompt)
-            elif st.session_state.selected_llm == "Gemini":
-                if st.session_state.model.gemini_api is None:
-                    ai_response_text = "Error: Gemini API key is not set. Please check your config.py or environment variables."
-                else:
-                    ai_response_text = st.session_state.model.gemini_chat_models(formatted_prompt)
-            else:
-                ai_response_text = "Error: Unknown LLM selected."
+            # --- ROUTED MODEL CALLING ---
+            # The router fails over between providers and hedges slow requests
+            preferred_llm = None if st.session_state.selected_llm == "Auto" else st.session_state.selected_llm
+            # One trace per chat turn; the router and provider calls are its child spans
+            with tracer.span("chat_turn", {"persona": selected_persona_display_name, "history.messages": len(history)}):
+                routed = get_model_router(st.session_state.model).complete(formatted_prompt, preferred=preferred_llm)
+            ai_response_text = routed.text
             
             st.session_state.chat_history.append(AIMessage(content=ai_response_text))
             with st.chat_message("assistant"):
                 st.write(ai_response_text)
+                st.caption(f"{routed.provider} · {routed.latency:.1f}s" + (" · hedged" if routed.hedged else ""))
         except Exception as e:
             st.error(f"Error from AI model: {e}")
             # Optionally remove the last message if needed
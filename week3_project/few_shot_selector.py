@@ -0,0 +1,160 @@
+"""
+Similarity-based few-shot example selection.
+
+Instead of the same hand-written examples in every prompt, the selector picks the
+solved examples most similar to each question. The pool is vectorized once (TF-IDF,
+or an embedding function), so selecting for a query is a single sparse/dense matrix
+product followed by a top-k. Examples are added in order of similarity until k are
+chosen or the token budget is used up.
+
+    selector = FewShotSelector.from_dataset(load_dataset("math-problems.json"), k=3, token_budget=200)
+    prompt = selector.prompt("A train travels 60 km in 1 hour. How far will it go in 4 hours?")
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from prompt_eval import ROLES, Dataset, Item
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional, fall back to a character estimate
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    """Counts tokens with tiktoken when available, otherwise estimates ~4 characters per token."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def ranked(scores: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the n highest scores, best first, without sorting the whole array."""
+    if n >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, n - 1)[:n]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def format_example(question: str, answer: str) -> str:
+    return f"Q: {question}\nA: {answer}\n\n"
+
+
+@dataclass(frozen=True)
+class Example:
+    question: str
+    answer: str
+    tokens: int
+
+
+class FewShotSelector:
+    """
+    Picks the top-k most similar solved examples for a query under a token budget.
+
+    Args:
+        examples: Pool of (question, answer) pairs
+        k: Maximum number of examples per prompt
+        token_budget: Maximum tokens spent on examples per prompt
+        embed: Optional function mapping a list of texts to vectors; TF-IDF is used without it
+        min_similarity: Examples less similar than this are never used, so unrelated questions get none
+    """
+
+    def __init__(
+        self,
+        examples: list[tuple[str, str]],
+        k: int = 3,
+        token_budget: int = 300,
+        embed: Callable[[list[str]], np.ndarray] | None = None,
+        min_similarity: float = 0.05,
+    ) -> None:
+        self.k = k
+        self.token_budget = token_budget
+        self.min_similarity = min_similarity
+        self.embed = embed
+        self.examples = [Example(q, a, count_tokens(format_example(q, a))) for q, a in examples]
+        questions = [e.question for e in self.examples]
+
+        # Vectors are L2-normalized, so a dot product is the cosine similarity
+        if embed is None:
+            self._vectorizer = TfidfVectorizer(sublinear_tf=True, ngram_range=(1, 2), stop_words="english")
+            self._matrix = self._vectorizer.fit_transform(questions) if questions else None
+        else:
+            self._vectorizer = None
+            self._matrix = self._normalize(np.asarray(embed(questions), dtype=np.float32)) if questions else None
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    @classmethod
+    def from_dataset(cls, dataset: Dataset, **kwargs) -> "FewShotSelector":
+        """Uses the dataset's items that have a reference answer as the example pool."""
+        return cls([(item.question, item.reference) for item in dataset.items if item.reference], **kwargs)
+
+    def similarities(self, queries: list[str]) -> np.ndarray:
+        """Cosine similarity of every query to every example, shape (queries, examples)."""
+        if self._matrix is None:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        if self._vectorizer is not None:
+            return (self._vectorizer.transform(queries) @ self._matrix.T).toarray()
+        return self._normalize(np.asarray(self.embed(queries), dtype=np.float32)) @ self._matrix.T
+
+    def _pick(self, query: str, scores: np.ndarray, k: int, token_budget: int) -> list[Example]:
+        chosen: dict[int, Example] = {}
+        used = 0
+        # The k * 4 best candidates usually fill the prompt; rank the whole pool only if the budget skipped them
+        for limit in (k * 4, len(scores)):
+            for i in ranked(scores, limit):
+                example = self.examples[i]
+                if scores[i] < self.min_similarity or len(chosen) == k:
+                    break
+                # Never show the model the question it is being asked
+                if i in chosen or example.question == query or used + example.tokens > token_budget:
+                    continue
+                chosen[i] = example
+                used += example.tokens
+            if len(chosen) == k or limit >= len(scores):
+                break
+        # Most similar example last, right before the question
+        return list(chosen.values())[::-1]
+
+    def select_batch(self, queries: list[str], k: int | None = None, token_budget: int | None = None) -> list[list[Example]]:
+        """Selects examples for many queries with one similarity matrix product."""
+        scores = self.similarities(queries)
+        return [
+            self._pick(query, row, k or self.k, self.token_budget if token_budget is None else token_budget)
+            for query, row in zip(queries, scores)
+        ]
+
+    def select(self, query: str, k: int | None = None, token_budget: int | None = None) -> list[Example]:
+        return self.select_batch([query], k, token_budget)[0]
+
+    def prompt(self, query: str, role: str = "") -> str:
+        """Few-shot prompt in the notebook's 'Q: ... A: ...' format with the selected examples."""
+        shots = "".join(format_example(e.question, e.answer) for e in self.select(query))
+        header = f"{role}\n\n" if role else ""
+        return f"{header}{shots}Q: {query}\nA:"
+
+
+def dynamic_few_shot(k: int = 3, token_budget: int = 300, **kwargs) -> Callable[[Item, Dataset], str]:
+    """
+    Prompt strategy for PromptEvaluator that selects examples from the dataset being
+    evaluated. The selector of each dataset is built once, on its first item.
+    """
+    selectors: dict[int, FewShotSelector] = {}
+
+    def build(item: Item, dataset: Dataset) -> str:
+        selector = selectors.get(id(dataset))
+        if selector is None:
+            selector = selectors[id(dataset)] = FewShotSelector.from_dataset(
+                dataset, k=k, token_budget=token_budget, **kwargs
+            )
+        return selector.prompt(item.question, ROLES.get(dataset.name, ROLES["reasoning"]))
+
+    return build
@@ -0,0 +1,375 @@
+"""
+Evaluation engine for comparing prompting strategies over whole datasets.
+
+Every (dataset item x strategy x model) cell is run concurrently, with a request rate
+and concurrency limit per model. Responses are cached on disk by model and prompt, so
+re-running an evaluation only calls the model for new cells. Each response is scored
+against the item's reference answer, and summarize() aggregates accuracy, latency and
+token usage per strategy.
+
+In a notebook (Colab and Jupyter already run an event loop, so use await):
+
+    datasets = [load_dataset("logic-puzzles.json"), load_dataset("math-problems.json")]
+    evaluator = PromptEvaluator({"gemini-2.0-flash": gemini_model("gemini-2.0-flash")})
+    results = await evaluator.run(datasets)
+    summarize(results)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable
+
+import pandas as pd
+
+QUESTION_KEYS = ("question", "puzzle", "problem", "task", "prompt", "input")
+ANSWER_KEYS = ("answer", "solution", "expected_answer", "correct_answer", "target", "output")
+
+# Hand-written examples from the original few-shot prompts, keyed by dataset name
+FEW_SHOT_EXAMPLES = {
+    "logic": [
+        ("Who is the youngest if A is older than B, and B is older than C?", "C is the youngest."),
+        ("Who is the youngest if David is older than Emily, and Emily is older than Frank?", "Frank is the youngest."),
+        ("Who is the youngest if Jane is older than Mike, and Mike is older than Chris?", "Chris is the youngest."),
+    ],
+    "math": [
+        ("A car travels 50 km in 1 hour. How far will it go in 3 hours?", "150 km."),
+        ("A runner's average speed is 10 km per hour. How far will they run in 2 hours?", "20 km."),
+        ("A cyclist travels at a constant speed of 25 km/h. How far will they travel in 4 hours?", "100 km."),
+    ],
+}
+
+ROLES = {
+    "logic": "You are expert in solving logic puzzles, your task is to solve the following puzzles.",
+    "math": "You are expert mathematician, your task is to solve the following questions.",
+    "reasoning": "You are expert in reasoning, your task is to answer the following questions.",
+}
+
+_NUMBER = re.compile(r"-?\d+(?:,\d{3})*(?:\.\d+)?")
+_ANSWER_LINE = re.compile(r"(?:final answer|answer)\s*[:\-]\s*(.+)", re.IGNORECASE)
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class Item:
+    id: str
+    question: str
+    reference: str | None
+
+
+@dataclass
+class Dataset:
+    name: str
+    items: list[Item]
+
+
+def _first(record: dict, keys: tuple[str, ...]) -> str | None:
+    for key in keys:
+        if record.get(key) not in (None, ""):
+            value = record[key]
+            return value if isinstance(value, str) else json.dumps(value)
+    return None
+
+
+def load_dataset(path: str, name: str | None = None) -> Dataset:
+    """
+    Loads a JSON list of problems. The question and reference answer fields are found
+    by name ('puzzle', 'problem', 'question', ... and 'answer', 'solution', ...).
+
+    Args:
+        path: JSON file with a list of objects
+        name: Dataset name; defaults to the file name's first word, e.g. 'logic' for logic-puzzles.json
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    name = name or re.split(r"[-_.]", os.path.basename(path))[0]
+    items = []
+    for i, record in enumerate(records):
+        question = _first(record, QUESTION_KEYS)
+        if question is None:
+            continue
+        items.append(Item(id=str(record.get("id", i)), question=question, reference=_first(record, ANSWER_KEYS)))
+    return Dataset(name, items)
+
+
+# Prompting strategies: (item, dataset) -> prompt
+
+def zero_shot(item: Item, dataset: Dataset) -> str:
+    return item.question
+
+
+def few_shot(item: Item, dataset: Dataset, k: int = 3) -> str:
+    """Uses the hand-written examples for the task, or else the first k other solved items of the dataset."""
+    examples = FEW_SHOT_EXAMPLES.get(dataset.name) or [
+        (other.question, other.reference) for other in dataset.items if other.id != item.id and other.reference
+    ][:k]
+    role = ROLES.get(dataset.name, ROLES["reasoning"])
+    shots = "".join(f"Q: {q}\nA: {a}\n\n" for q, a in examples)
+    return f"{role}\n\n{shots}Q: {item.question}\nA:"
+
+
+def chain_of_thought(item: Item, dataset: Dataset) -> str:
+    return f"{item.question} Let's think step by step."
+
+
+STRATEGIES: dict[str, Callable[[Item, Dataset], str]] = {
+    "zero_shot": zero_shot,
+    "few_shot": few_shot,
+    "cot": chain_of_thought,
+}
+
+
+# Scoring
+
+def _numbers(text: str) -> list[float]:
+    return [float(n.replace(",", "")) for n in _NUMBER.findall(text)]
+
+
+def final_answer(response: str) -> str:
+    """The 'Answer: ...' line of a response if it has one, otherwise its last non-empty line."""
+    matches = _ANSWER_LINE.findall(response)
+    if matches:
+        return matches[-1].strip()
+    lines = [line.strip() for line in response.strip().splitlines() if line.strip()]
+    return lines[-1] if lines else ""
+
+
+def token_f1(prediction: str, reference: str) -> float:
+    pred, ref = _WORD.findall(prediction.lower()), _WORD.findall(reference.lower())
+    if not pred or not ref:
+        return 0.0
+    ref_counts: dict[str, int] = {}
+    for word in ref:
+        ref_counts[word] = ref_counts.get(word, 0) + 1
+    common = 0
+    for word in pred:
+        if ref_counts.get(word, 0) > 0:
+            ref_counts[word] -= 1
+            common += 1
+    if not common:
+        return 0.0
+    precision, recall = common / len(pred), common / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def score_answer(response: str, reference: str | None, f1_threshold: float = 0.6) -> bool | None:
+    """
+    Checks a response against the reference answer, or returns None without one.
+    Numeric references must appear among the numbers of the final answer (or be the
+    last number of a response without any); short text references must appear in the
+    response; long ones need a token F1 of at least f1_threshold against it.
+    """
+    if not reference:
+        return None
+    answer = final_answer(response)
+    expected = _numbers(reference)
+    if expected:
+        target = expected[-1]
+        got = _numbers(answer) or _numbers(response)[-1:]
+        return any(abs(value - target) <= 1e-6 * max(1.0, abs(target)) for value in got)
+
+    normalized = " ".join(_WORD.findall(reference.lower()))
+    if len(normalized.split()) <= 5:
+        return normalized in " ".join(_WORD.findall(answer.lower())) or normalized in " ".join(
+            _WORD.findall(response.lower())
+        )
+    return token_f1(answer, reference) >= f1_threshold or token_f1(response, reference) >= f1_threshold
+
+
+# Models: async prompt -> ModelResponse
+
+@dataclass
+class ModelResponse:
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+ModelFn = Callable[[str], Awaitable[ModelResponse]]
+
+
+def gemini_model(model_name: str = "gemini-2.0-flash") -> ModelFn:
+    """Async Gemini call with token usage; genai.configure(api_key=...) must have been called."""
+    import google.generativeai as genai
+
+    model = genai.GenerativeModel(model_name)
+
+    async def generate(prompt: str) -> ModelResponse:
+        response = await model.generate_content_async(prompt)
+        usage = getattr(response, "usage_metadata", None)
+        return ModelResponse(
+            text=response.text,
+            input_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+        )
+
+    return generate
+
+
+class RateLimiter:
+    """Spaces request starts evenly so at most `per_minute` begin in any minute."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ResponseCache:
+    """Responses keyed by sha256 of model and prompt, appended to a JSON-lines file."""
+
+    def __init__(self, path: str | None = "prompt_eval_cache.jsonl") -> None:
+        self.path = path
+        self._entries: dict[str, dict] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+
+    @staticmethod
+    def key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\x1f{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str) -> dict | None:
+        return self._entries.get(self.key(model, prompt))
+
+    def put(self, model: str, prompt: str, response: ModelResponse, latency: float) -> None:
+        entry = {"key": self.key(model, prompt), "model": model, "latency": latency, **asdict(response)}
+        self._entries[entry["key"]] = entry
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+@dataclass
+class CellResult:
+    dataset: str
+    item_id: str
+    strategy: str
+    model: str
+    prompt: str
+    response: str = ""
+    reference: str | None = None
+    correct: bool | None = None
+    latency: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached: bool = False
+    error: str | None = None
+
+
+@dataclass
+class PromptEvaluator:
+    """
+    Runs every (item x strategy x model) cell of an evaluation concurrently.
+
+    Args:
+        models: Model name -> async model function, e.g. gemini_model("gemini-2.0-flash")
+        strategies: Strategy name -> prompt builder; defaults to zero-shot, few-shot and CoT
+        requests_per_minute: Request rate limit per model
+        max_concurrency: In-flight requests per model
+        max_retries: Retries of a failed call, with exponential backoff
+        cache: Response cache; pass ResponseCache(None) to keep it in memory only
+    """
+
+    models: dict[str, ModelFn]
+    strategies: dict[str, Callable[[Item, Dataset], str]] = field(default_factory=lambda: dict(STRATEGIES))
+    requests_per_minute: float = 60
+    max_concurrency: int = 8
+    max_retries: int = 3
+    cache: ResponseCache = field(default_factory=ResponseCache)
+    _inflight: dict[str, asyncio.Task] = field(default_factory=dict, init=False, repr=False)
+
+    async def _call(self, model: str, prompt: str, limiter: RateLimiter, slots: asyncio.Semaphore):
+        cached = self.cache.get(model, prompt)
+        if cached is not None:
+            return ModelResponse(cached["text"], cached["input_tokens"], cached["output_tokens"]), cached["latency"], True
+
+        # Cells with the same model and prompt (e.g. duplicate items) share one request
+        key = self.cache.key(model, prompt)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(model, prompt, limiter, slots))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _request(self, model: str, prompt: str, limiter: RateLimiter, slots: asyncio.Semaphore):
+        async with slots:
+            for attempt in range(self.max_retries + 1):
+                await limiter.wait()
+                start = time.monotonic()
+                try:
+                    response = await self.models[model](prompt)
+                except Exception:
+                    if attempt == self.max_retries:
+                        raise
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                latency = time.monotonic() - start
+                self.cache.put(model, prompt, response, latency)
+                return response, latency, False
+
+    async def _cell(self, cell: CellResult, limiter: RateLimiter, slots: asyncio.Semaphore) -> CellResult:
+        try:
+            response, cell.latency, cell.cached = await self._call(cell.model, cell.prompt, limiter, slots)
+        except Exception as e:
+            cell.error = f"{type(e).__name__}: {e}"
+            return cell
+        cell.response = response.text
+        cell.input_tokens = response.input_tokens
+        cell.output_tokens = response.output_tokens
+        cell.correct = score_answer(response.text, cell.reference)
+        return cell
+
+    async def run(self, datasets: list[Dataset], limit: int | None = None) -> pd.DataFrame:
+        """
+        Evaluates the datasets and returns one row per cell.
+
+        Args:
+            datasets: Datasets to evaluate
+            limit: Only use the first `limit` items of each dataset
+        """
+        limiters = {model: RateLimiter(self.requests_per_minute) for model in self.models}
+        slots = {model: asyncio.Semaphore(self.max_concurrency) for model in self.models}
+        cells = [
+            CellResult(dataset.name, item.id, strategy, model, build(item, dataset), reference=item.reference)
+            for dataset in datasets
+            for item in dataset.items[:limit]
+            for strategy, build in self.strategies.items()
+            for model in self.models
+        ]
+        results = await asyncio.gather(*(self._cell(c, limiters[c.model], slots[c.model]) for c in cells))
+        return pd.DataFrame([asdict(r) for r in results])
+
+
+def summarize(results: pd.DataFrame, by: tuple[str, ...] = ("strategy",)) -> pd.DataFrame:
+    """Accuracy, latency and token usage per group (by default per strategy)."""
+    scored = results.assign(correct=results["correct"].astype("float"))
+    summary = scored.groupby(list(by)).agg(
+        cells=("prompt", "size"),
+        accuracy=("correct", "mean"),
+        errors=("error", "count"),
+        latency_p50=("latency", "median"),
+        latency_p95=("latency", lambda s: s.quantile(0.95)),
+        input_tokens=("input_tokens", "mean"),
+        output_tokens=("output_tokens", "mean"),
+        cache_hits=("cached", "sum"),
+    )
+    return summary.round(3).sort_values("accuracy", ascending=False)
@@ -1,9 +1,9 @@
 import google.generativeai as genai
-from google.api_core import exceptions
 from groq import Groq
 from dotenv import load_dotenv
 import os
 import time
+from buildables_common.resilience import ProviderError, call_with_retries
 
 load_dotenv()
 
@@ -40,10 +40,14 @@ class Summarizer:
         """
         Initialize summarizer with a provider.
         Supported providers: "gemini" (uses gemini-2.0-flash), "groq" (uses deepseek-r1-distill-llama-70b)
+
+        Failed calls raise a buildables_common.resilience.ProviderError instead of returning error text;
+        rate limits and outages are retried with backoff first.
         """
         self.model_name = model_name
         if "groq" in model_name.lower():
-            self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+            # Retries are done by call_with_retries, not stacked on the SDK's own
+            self.client = Groq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
             self.model_name = "deepseek-r1-distill-llama-70b"
         elif "gemini" in model_name.lower():
             genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
@@ -59,43 +63,33 @@ class Summarizer:
         time.sleep(1)  # simple rate limiting
 
         if self.model_name == "gemini-2.0-flash":
-            return self.summarize_with_gemini(article)
+            return call_with_retries("gemini", self.summarize_with_gemini, article)
         elif self.model_name == "deepseek-r1-distill-llama-70b":
-            return self.summarize_with_groq(article)
+            return call_with_retries("groq", self.summarize_with_groq, article)
         else:
             raise ValueError("Invalid provider. Use 'gemini-2.0-flash' or 'deepseek-r1-distill-llama-70b'.")
     
     def summarize_with_gemini(self, article: str) -> str:
-        try:
-            model = genai.GenerativeModel(self.model_name)
-            prompt = f"Summarize the following text concisely in 3-4 sentences:\n\n{article}"
-            response = model.generate_content(prompt)
-            return response.text
-        except exceptions.ResourceExhausted:
-            return "Error: API rate limit exceeded. Please try again later."
-        except exceptions.GoogleAPIError as e:
-            return f"Error: Google API error occurred. Details: {e}"
-        except Exception as e:
-            return f"Error: An unexpected error occurred. Details: {e}"
+        model = genai.GenerativeModel(self.model_name)
+        prompt = f"Summarize the following text concisely in 3-4 sentences:\n\n{article}"
+        response = model.generate_content(prompt)
+        return response.text
     
     def summarize_with_groq(self, article: str) -> str:
-        try:
-            prompt_messages = [
-                {"role": "system", "content": "You are a helpful assistant that provides concise summaries."},
-                {"role": "user", "content": f"Summarize the following text in 3-4 sentences:\n\n{article}"}
-            ]
-            completion = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=prompt_messages,
-                temperature=0.6,
-                max_completion_tokens=4096,
-                top_p=0.95,
-                stream=False,
-                stop=None
-            )
-            return completion.choices[0].message.content
-        except Exception as e:
-            return f"Error: Groq API error. Details: {e}"
+        prompt_messages = [
+            {"role": "system", "content": "You are a helpful assistant that provides concise summaries."},
+            {"role": "user", "content": f"Summarize the following text in 3-4 sentences:\n\n{article}"}
+        ]
+        completion = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=prompt_messages,
+            temperature=0.6,
+            max_completion_tokens=4096,
+            top_p=0.95,
+            stream=False,
+            stop=None
+        )
+        return completion.choices[0].message.content
     
     def ask_question(self, question: str, article: str) -> str:
         """
@@ -104,47 +98,41 @@ class Summarizer:
         time.sleep(1)  # simple rate limiting
 
         if self.model_name == "gemini-2.0-flash":
-            return self.ask_with_gemini(question, article)
+            return call_with_retries("gemini", self.ask_with_gemini, question, article)
         elif self.model_name == "deepseek-r1-distill-llama-70b":
-            return self.ask_with_groq(question, article)
+            return call_with_retries("groq", self.ask_with_groq, question, article)
         else:
             raise ValueError("Invalid provider. Use 'gemini-2.0-flash' or 'deepseek-r1-distill-llama-70b'.")
     
     def ask_with_gemini(self, question: str, article: str) -> str:
-        try:
-            model = genai.GenerativeModel(self.model_name)
-            prompt = f"Based on the article below, {question}? Article: {article}"
-            response = model.generate_content(prompt)
-            return response.text
-        except exceptions.ResourceExhausted:
-            return "Error: API rate limit exceeded. Please try again later."
-        except exceptions.GoogleAPIError as e:
-            return f"Error: Google API error occurred. Details: {e}"
-        except Exception as e:
-            return f"Error: An unexpected error occurred. Details: {e}"
+        model = genai.GenerativeModel(self.model_name)
+        prompt = f"Based on the article below, {question}? Article: {article}"
+        response = model.generate_content(prompt)
+        return response.text
     
     def ask_with_groq(self, question: str, article: str) -> str:
-        try:
-            prompt_messages = [
-                {"role": "system", "content": "You are a helpful assistant that answers questions based on the provided article."},
-                {"role": "user", "content": f"Based on the article below, {question}? Article: {article}"}
-            ]
-            completion = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=prompt_messages,
-                temperature=1.0,
-                max_completion_tokens=4096,
-                top_p=0.95,
-                stream=False,
-                stop=None
-            )
-            return completion.choices[0].message.content
-        except Exception as e:
-            return f"Error: Groq API error. Details: {e}"
+        prompt_messages = [
+            {"role": "system", "content": "You are a helpful assistant that answers questions based on the provided article."},
+            {"role": "user", "content": f"Based on the article below, {question}? Article: {article}"}
+        ]
+        completion = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=prompt_messages,
+            temperature=1.0,
+            max_completion_tokens=4096,
+            top_p=0.95,
+            stream=False,
+            stop=None
+        )
+        return completion.choices[0].message.content
 
 def main():
     summarizer = Summarizer("groq")  # Choose your model: 'gemini-2.0-flash' or 'deepseek-r1-distill-llama-70b'
-    summary = summarizer.summarize(article)
+    try:
+        summary = summarizer.summarize(article)
+    except ProviderError as e:
+        print(f"Summarization failed: {e}")
+        return
     word_count = len(article.split())
     word_count_summary = len(summary.split())
     print(f"Original article length: {word_count} words")
@@ -158,7 +146,12 @@ def main():
         if question.lower() == 'quit':
             break
         if question:
-            answer = summarizer.ask_question(question, article)
+            try:
+                answer = summarizer.ask_question(question, article)
+            except ProviderError as e:
+                # A failed call is not an answer, so it does not use up a question
+                print(f"Could not answer the question: {e}\n")
+                continue
             print(f"Question: {question}")
             print(f"Answer: {answer}\n")
             question_count += 1
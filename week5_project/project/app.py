@@ -5,7 +5,7 @@ This is the primary entry point for the web interface.
 
 import streamlit as st
 import time
-from workflow_backend import workflow_manager
+from workflow_backend import WorkflowManager
 
 # Configure Streamlit page
 st.set_page_config(
@@ -14,6 +14,11 @@ st.set_page_config(
     layout="wide"
 )
 
+# One workflow per browser session, so sessions never share drafts or token counts
+if "workflow_manager" not in st.session_state:
+    st.session_state.workflow_manager = WorkflowManager()
+workflow_manager = st.session_state.workflow_manager
+
 def display_workflow_progress(current_step: str):
     """Display the current workflow progress"""
     steps = ["research", "generate", "fact_check", "HUMAN_REVIEW", "reflect"]
@@ -47,6 +52,7 @@ with st.sidebar:
     st.write(f"**Messages in state:** {status['message_count']}")
     st.write(f"**Current step:** {status['current_step'] or 'Not started'}")
     st.write(f"**Complete:** {status['is_complete']}")
+    st.write(f"**Tokens used:** {status['tokens_used']:,}")
     
     st.markdown("---")
     st.subheader("About")
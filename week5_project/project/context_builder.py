@@ -0,0 +1,196 @@
+"""
+Token-budgeted context assembly for the generation and reflection chains.
+Instead of replaying the whole workflow state every round, each chain gets the
+topic, condensed research, the latest draft and the latest feedback, trimmed to a
+token budget. Stable parts come first so the provider's prompt cache can reuse
+them across rounds, and the token usage of every round is logged.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from buildables_common.tracing import current_span
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from fact_checker import find_research
+
+logger = logging.getLogger(__name__)
+
+FACT_CHECK_NAME = "fact_check"
+REFLECTION_NAME = "reflection"
+
+GENERATION_BUDGET = 6000  # tokens of context sent to generation_chain
+REFLECTION_BUDGET = 4000  # tokens of context sent to reflection_chain
+CHARS_PER_TOKEN = 4       # rough English average, avoids a tokenizer round trip
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, preferring a line boundary."""
+    limit = max(max_tokens, 0) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[: cut if cut > limit // 2 else limit].rstrip() + " ..."
+
+
+def latest_draft(state: Sequence[BaseMessage]) -> Optional[str]:
+    for msg in reversed(state):
+        if isinstance(msg, AIMessage):
+            return msg.content
+    return None
+
+
+def messages_since_draft(state: Sequence[BaseMessage]) -> List[BaseMessage]:
+    for i in range(len(state) - 1, -1, -1):
+        if isinstance(state[i], AIMessage):
+            return list(state[i + 1:])
+    return []
+
+
+def condense_research(research: str, max_tokens: int) -> str:
+    """
+    Shrink the research notes to max_tokens by trimming every source evenly,
+    so each source keeps its title and the start of its content.
+    """
+    if estimate_tokens(research) <= max_tokens:
+        return research
+    header, _, body = research.partition("\n")
+    sources = [line for line in body.split("\n") if line.strip()]
+    if not sources:
+        return truncate_to_tokens(research, max_tokens)
+    per_source = max((max_tokens - estimate_tokens(header)) // len(sources), 8)
+    return "\n".join([header] + [truncate_to_tokens(s, per_source) for s in sources])
+
+
+def _topic(state: Sequence[BaseMessage]) -> Optional[BaseMessage]:
+    return next((m for m in state if isinstance(m, HumanMessage)), None)
+
+
+def _feedback(state: Sequence[BaseMessage], max_tokens: int) -> str:
+    """Human feedback, reflection critique and fact-check corrections on the latest draft."""
+    parts = []
+    for msg in messages_since_draft(state):
+        if not isinstance(msg, HumanMessage):
+            continue
+        if msg.name == FACT_CHECK_NAME:
+            # Only the corrections are actionable for the writer
+            if "Corrections needed:" in msg.content:
+                corrections = msg.content.split("Corrections needed:", 1)[1].split("\n\n", 1)[0]
+                parts.append("Fact-check corrections:" + corrections)
+        elif msg.name == REFLECTION_NAME:
+            parts.append("Reviewer critique:\n" + msg.content)
+        else:
+            parts.append("Human feedback:\n" + msg.content)
+    return truncate_to_tokens("\n\n".join(parts), max_tokens)
+
+
+def build_generation_context(state: Sequence[BaseMessage], budget: int = GENERATION_BUDGET) -> List[BaseMessage]:
+    """
+    Messages for generation_chain: topic, condensed research, latest draft, feedback.
+    Research is condensed to a fixed half of the budget, so the topic and research
+    prefix is identical every round and stays in the prompt cache. The draft is always
+    kept whole and feedback gets the rest, at least an eighth of the budget.
+    """
+    topic = _topic(state)
+    draft = latest_draft(state)
+    messages: List[BaseMessage] = [topic] if topic is not None else []
+
+    research = find_research(state)
+    if research:
+        messages.append(SystemMessage(content=condense_research(research, budget // 2)))
+    remaining = budget - sum(estimate_tokens(m.content) for m in messages) - estimate_tokens(draft or "")
+
+    feedback = _feedback(state, max(remaining, budget // 8)) if draft else ""
+    if draft:
+        messages.append(AIMessage(content=draft))
+    if feedback:
+        messages.append(HumanMessage(content=feedback))
+    return messages
+
+
+def build_reflection_context(state: Sequence[BaseMessage], budget: int = REFLECTION_BUDGET) -> List[BaseMessage]:
+    """Messages for reflection_chain: topic, the latest draft and any feedback on it."""
+    topic = _topic(state)
+    draft = latest_draft(state) or ""
+    messages: List[BaseMessage] = [topic] if topic is not None else []
+    remaining = budget - sum(estimate_tokens(m.content) for m in messages)
+    feedback = _feedback(state, budget // 4)
+    remaining -= estimate_tokens(feedback)
+    messages.append(HumanMessage(content="Article to grade:\n" + truncate_to_tokens(draft, remaining)))
+    if feedback:
+        messages.append(HumanMessage(content=feedback))
+    return messages
+
+
+@dataclass
+class RoundUsage:
+    stage: str
+    estimated_input_tokens: int
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
+class TokenUsageLog:
+    """Per-round token usage of the generate/reflect loop."""
+
+    def __init__(self):
+        self.rounds: List[RoundUsage] = []
+
+    def record(self, stage: str, messages: Sequence[BaseMessage], response=None) -> RoundUsage:
+        """Record the estimated prompt size and, when reported, the provider's actual counts."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        entry = RoundUsage(
+            stage=stage,
+            estimated_input_tokens=sum(estimate_tokens(str(m.content)) for m in messages),
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens"),
+        )
+        self.rounds.append(entry)
+        # Summed on the current span, since one node may make several calls
+        span = current_span()
+        span.add("estimated_input_tokens", entry.estimated_input_tokens)
+        if entry.input_tokens is not None:
+            span.add("gen_ai.usage.input_tokens", entry.input_tokens)
+        if entry.output_tokens is not None:
+            span.add("gen_ai.usage.output_tokens", entry.output_tokens)
+        logger.info(
+            "%s round %d: ~%d context tokens (input=%s, output=%s)",
+            stage, len(self.rounds), entry.estimated_input_tokens, entry.input_tokens, entry.output_tokens,
+        )
+        return entry
+
+    def total_tokens(self) -> int:
+        return sum(
+            (r.input_tokens if r.input_tokens is not None else r.estimated_input_tokens) + (r.output_tokens or 0)
+            for r in self.rounds
+        )
+
+    def reset(self):
+        self.rounds = []
+
+
+# Usage log of the run being executed; each WorkflowManager binds its own, so
+# concurrent Streamlit sessions do not add to each other's totals
+_token_usage: ContextVar[TokenUsageLog] = ContextVar("token_usage", default=TokenUsageLog())
+
+
+def current_token_usage() -> TokenUsageLog:
+    """The usage log of the current run (a process-wide log outside use_token_usage)."""
+    return _token_usage.get()
+
+
+@contextmanager
+def use_token_usage(log: TokenUsageLog):
+    """Records the token usage of the calls made in the block to the given log."""
+    token = _token_usage.set(log)
+    try:
+        yield log
+    finally:
+        _token_usage.reset(token)
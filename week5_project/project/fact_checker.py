@@ -0,0 +1,220 @@
+"""
+Claim-level fact checking for the multi-agent Medium article generator.
+Splits an article into paragraphs and check-worthy claims, verifies the claims
+concurrently against the research already held in the workflow state, and merges
+the verdicts into one report. Verdicts are cached per claim, so after a revision
+only the claims of paragraphs that actually changed go back to the model.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from buildables_common.tracing import current_span, tracer
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from reflection_chains import claim_check_chain
+
+SUPPORTED = "SUPPORTED"
+CONTRADICTED = "CONTRADICTED"
+UNVERIFIED = "UNVERIFIED"
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_VERDICT_LINE = re.compile(r"VERDICT:\s*(SUPPORTED|CONTRADICTED|UNVERIFIED)", re.IGNORECASE)
+_NOTE_LINE = re.compile(r"NOTE:\s*(.+)", re.IGNORECASE)
+_CHECK_WORTHY = re.compile(
+    r"\d|%|\$|\baccording to\b|\bstud(?:y|ies)\b|\bresearch\b|\breport(?:s|ed)?\b|\bsurvey\b|"
+    r"\bpercent\b|\bmillion\b|\bbillion\b|\bmost\b|\blargest\b|\bfirst\b|\bproven\b|\bfounded\b",
+    re.IGNORECASE,
+)
+_PROPER_NOUN = re.compile(r"\s[A-Z][a-z]+")
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_paragraphs(article: str) -> List[str]:
+    """Split an article into non-empty paragraphs separated by blank lines."""
+    return [p.strip() for p in re.split(r"\n\s*\n", article) if p.strip()]
+
+
+def extract_claims(paragraph: str) -> List[str]:
+    """
+    Pick the sentences of a paragraph that make a verifiable factual statement.
+    Headings, questions and short sentences are skipped; a sentence is kept when it
+    mentions numbers, sources, superlatives or proper nouns.
+    """
+    if paragraph.lstrip().startswith("#"):
+        return []
+
+    claims = []
+    for sentence in _SENTENCE_SPLIT.split(" ".join(paragraph.split())):
+        sentence = sentence.strip(" *-_>")
+        if len(sentence.split()) < 6 or sentence.endswith("?"):
+            continue
+        if _CHECK_WORTHY.search(sentence) or _PROPER_NOUN.search(sentence):
+            claims.append(sentence)
+    return claims
+
+
+def find_research(state: Sequence[BaseMessage]) -> str:
+    """Return the research notes gathered by the research node, if any."""
+    for msg in state:
+        if isinstance(msg, SystemMessage) and "Research on" in msg.content:
+            return msg.content
+    return ""
+
+
+@dataclass
+class ClaimResult:
+    claim: str
+    verdict: str
+    note: str
+    cached: bool = False
+
+
+@dataclass
+class FactCheckReport:
+    results: List[ClaimResult] = field(default_factory=list)
+    paragraphs_total: int = 0
+    paragraphs_changed: int = 0
+
+    def count(self, verdict: str) -> int:
+        return sum(1 for r in self.results if r.verdict == verdict)
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for r in self.results if r.cached)
+
+    def to_text(self) -> str:
+        """Render the report as the fact-check message shown to the human reviewer."""
+        lines = [
+            f"Fact-check report: {len(self.results)} factual claims checked "
+            f"({self.cache_hits} from cache), {self.paragraphs_changed} of "
+            f"{self.paragraphs_total} paragraphs changed since the last check.",
+            f"Supported: {self.count(SUPPORTED)} | Contradicted: {self.count(CONTRADICTED)} "
+            f"| Unverified: {self.count(UNVERIFIED)}",
+        ]
+        for verdict, title in (
+            (CONTRADICTED, "Corrections needed"),
+            (UNVERIFIED, "Could not verify"),
+            (SUPPORTED, "Supported by research"),
+        ):
+            matching = [r for r in self.results if r.verdict == verdict]
+            if matching:
+                lines.append(f"\n{title}:")
+                lines.extend(f"- \"{r.claim}\" -- {r.note}" for r in matching)
+        if not self.results:
+            lines.append("\nNo check-worthy factual claims were found in the article.")
+        return "\n".join(lines)
+
+
+def parse_verdict(text: str) -> ClaimResult:
+    """Parse the two-line VERDICT/NOTE answer of the claim check chain."""
+    verdict_match = _VERDICT_LINE.search(text)
+    note_match = _NOTE_LINE.search(text)
+    verdict = verdict_match.group(1).upper() if verdict_match else UNVERIFIED
+    note = note_match.group(1).strip() if note_match else text.strip()[:200]
+    return ClaimResult(claim="", verdict=verdict, note=note)
+
+
+class FactChecker:
+    """
+    Checks article claims in parallel and caches verdicts between revisions.
+    The checker keeps no per-article state besides the verdict cache, so one
+    instance can be shared by every run and Streamlit session.
+    """
+
+    def __init__(self, chain=None, max_concurrency: int = 4, cache_size: int = 512):
+        """
+        Args:
+            chain: Runnable taking {"claim", "research"}; defaults to claim_check_chain
+            max_concurrency: Upper bound on simultaneous model calls
+            cache_size: Number of claim verdicts kept in the LRU cache
+        """
+        self.chain = chain or claim_check_chain
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+        self._verdicts: "OrderedDict[str, ClaimResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget cached verdicts."""
+        with self._lock:
+            self._verdicts.clear()
+
+    def _cache_get(self, key: str) -> Optional[ClaimResult]:
+        with self._lock:
+            result = self._verdicts.get(key)
+            if result is not None:
+                self._verdicts.move_to_end(key)
+            return result
+
+    def _cache_put(self, key: str, result: ClaimResult):
+        with self._lock:
+            self._verdicts[key] = result
+            self._verdicts.move_to_end(key)
+            while len(self._verdicts) > self.cache_size:
+                self._verdicts.popitem(last=False)
+
+    def check(self, article: str, research: str, previous_article: Optional[str] = None) -> FactCheckReport:
+        """
+        Fact-check an article against the research notes.
+        Only claims without a cached verdict are sent to the model, in one bounded
+        parallel batch. previous_article, the draft checked before this one, is
+        only used to count the paragraphs that changed.
+        """
+        paragraphs = split_paragraphs(article)
+        previous = {_digest(p) for p in split_paragraphs(previous_article or "")}
+        changed = len({_digest(p) for p in paragraphs} - previous)
+
+        research_key = _digest(research)
+        claims: List[str] = []
+        for paragraph in paragraphs:
+            for claim in extract_claims(paragraph):
+                if claim not in claims:
+                    claims.append(claim)
+
+        results: Dict[str, ClaimResult] = {}
+        pending: List[str] = []
+        for claim in claims:
+            cached = self._cache_get(_digest(f"{research_key}:{claim.lower()}"))
+            if cached is not None:
+                results[claim] = ClaimResult(claim, cached.verdict, cached.note, cached=True)
+            else:
+                pending.append(claim)
+
+        if pending:
+            with tracer.span("claim_check.batch", {"claims": len(pending)}):
+                responses = self.chain.batch(
+                    [{"claim": claim, "research": research or "No research available."} for claim in pending],
+                    config={"max_concurrency": self.max_concurrency},
+                    return_exceptions=True,
+                )
+            for claim, response in zip(pending, responses):
+                if isinstance(response, Exception):
+                    results[claim] = ClaimResult(claim, UNVERIFIED, f"check failed: {response}")
+                    continue
+                parsed = parse_verdict(response.content)
+                result = ClaimResult(claim, parsed.verdict, parsed.note)
+                self._cache_put(_digest(f"{research_key}:{claim.lower()}"), result)
+                results[claim] = result
+
+        report = FactCheckReport(
+            results=[results[claim] for claim in claims],
+            paragraphs_total=len(paragraphs),
+            paragraphs_changed=changed,
+        )
+        span = current_span()
+        span.set("claims", len(claims))
+        span.set("cache_hits", report.cache_hits)
+        span.set("failed_checks", sum(result.note.startswith("check failed") for result in report.results))
+        return report
+
+
+# Shared checker so verdicts survive across workflow steps, Streamlit reruns and sessions
+fact_checker = FactChecker()
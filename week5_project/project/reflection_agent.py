@@ -1,10 +1,16 @@
 from typing import List, Sequence
 from dotenv import load_dotenv
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langgraph.graph import END, MessageGraph
 from langgraph.types import Command
 from langchain_community.tools.tavily_search import TavilySearchResults
-from reflection_chains import generation_chain, reflection_chain, research_chain, fact_check_chain
+from reflection_chains import generation_chain, reflection_chain, research_chain
+from fact_checker import fact_checker, find_research
+from context_builder import (
+    FACT_CHECK_NAME, REFLECTION_NAME, build_generation_context, build_reflection_context, current_token_usage, latest_draft
+)
+from revision import revise_sections, stop_reason
+from buildables_common.tracing import current_span, traced, tracer
 
 load_dotenv()
 
@@ -15,24 +21,41 @@ FACT_CHECK = "fact_check"
 HUMAN_REVIEW = "human_review"
 graph = MessageGraph()
 
+@traced("research_node")
 def research_node(state):
     topic = state[-1].content
     # Use Tavily for real-time web search
     tool = TavilySearchResults(max_results=3)
-    research_results = tool.invoke({"query": topic})
+    with tracer.span("tavily.search") as span:
+        research_results = tool.invoke({"query": topic})
+        span.set("results", len(research_results))
     # Format results into a string
     research_content = "\n".join([f"{r['title']}: {r['content'][:200]}..." for r in research_results])  # Truncate for brevity
     return state + [SystemMessage(content=f"Research on '{topic}':\n{research_content}")]
 
+@traced("generate_node")
 def generate_node(state):
-    return generation_chain.invoke({
-        "messages": state
+    # Revise only the sections the feedback targets; fall back to a full rewrite
+    # for the first draft and for feedback about the article as a whole
+    revised = revise_sections(state)
+    if revised is not None:
+        return AIMessage(content=revised)
+    current_span().set("full_rewrite", True)
+    # Send only topic, condensed research, latest draft and feedback, not the whole history
+    context = build_generation_context(state)
+    response = generation_chain.invoke({
+        "messages": context
     })
+    current_token_usage().record(GENERATE, context, response)
+    return response
 
+@traced("fact_check_node")
 def fact_check_node(state):
     article = state[-1].content
-    check = fact_check_chain.invoke({"article": article})
-    return state + [HumanMessage(content=check.content)]
+    # Claims are checked in parallel against the research already in state;
+    # unchanged claims from earlier revisions are served from the checker's cache
+    report = fact_checker.check(article, find_research(state), previous_article=latest_draft(state[:-1]))
+    return state + [HumanMessage(content=report.to_text(), name=FACT_CHECK_NAME)]
 
 def human_review_node(state):
     # Display current state for review
@@ -45,11 +68,14 @@ def human_review_node(state):
     else:
         return Command(goto=REFLECT)
 
+@traced("reflect_node")
 def reflect_node(messages):
+    context = build_reflection_context(messages)
     response = reflection_chain.invoke({
-        "messages": messages
+        "messages": context
     })
-    return [HumanMessage(content=response.content)]
+    current_token_usage().record(REFLECT, context, response)
+    return [HumanMessage(content=response.content, name=REFLECTION_NAME)]
 
 graph.add_node(RESEARCH, research_node)
 graph.add_node(GENERATE, generate_node)
@@ -59,8 +85,8 @@ graph.add_node(REFLECT, reflect_node)
 graph.set_entry_point(RESEARCH)
 
 def should_continue(state):
-    if len(state) > 12:  # Further adjusted for human input
-        return END 
+    if stop_reason(state):  # Quality score reached, drafts converged or revision cap hit
+        return END
     return HUMAN_REVIEW  # Route to human review instead of direct reflect
 
 graph.add_edge(RESEARCH, GENERATE)
@@ -76,5 +102,6 @@ if __name__ == "__main__":
     print(app.get_graph().draw_mermaid())
     app.get_graph().print_ascii()
     
-    response = app.invoke(HumanMessage(content="top 10 ways to become financially independent"))
+    with tracer.span("article_run"):
+        response = app.invoke(HumanMessage(content="top 10 ways to become financially independent"))
     print(response)
\ No newline at end of file
@@ -19,23 +19,46 @@ reflection_prompt = ChatPromptTemplate.from_messages(
         (
             "system",
             "You are a viral Medium influencer grading an article. Generate critique and recommendations for the user's article."
-            "Always provide detailed recommendations, including requests for length, hooks, virality, style, etc.",
+            "Always provide detailed recommendations, including requests for length, hooks, virality, style, etc."
+            " End your critique with a final line 'SCORE: <1-10>' rating how ready the article is to publish.",
         ),
         MessagesPlaceholder(variable_name="messages"),
     ]
 )
 
+section_revision_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "You are a medium techie influencer assistant revising one section of a Medium article."
+            " Rewrite only the section you are given so that it addresses the feedback, keep its heading line unchanged,"
+            " stay consistent with the rest of the article and return only the revised section in Markdown.",
+        ),
+        (
+            "human",
+            "Article outline:\n{outline}\n\nResearch notes:\n{research}\n\n"
+            "Feedback to address:\n{feedback}\n\nSection to revise:\n{section}",
+        ),
+    ]
+)
+
 research_prompt = ChatPromptTemplate.from_template(
     "Research the following topic and provide key facts, context, and relevant insights for creating a Medium article: {topic}"
 )
 
-fact_check_prompt = ChatPromptTemplate.from_template(
-    "Fact-check the following article for accuracy, factual claims, and potential misinformation. Provide corrections or notes if needed: {article}"
+claim_check_prompt = ChatPromptTemplate.from_template(
+    "You are a fact-checker verifying a single claim from a Medium article against the research notes below.\n"
+    "Research notes:\n{research}\n\n"
+    "Claim: {claim}\n\n"
+    "Answer in exactly two lines:\n"
+    "VERDICT: SUPPORTED, CONTRADICTED or UNVERIFIED\n"
+    "NOTE: one short sentence with the correction or the supporting evidence"
 )
 
 llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash")
 
 generation_chain = generation_prompt | llm
 reflection_chain = reflection_prompt | llm
+section_revision_chain = section_revision_prompt | llm
 research_chain =   research_prompt   | llm
-fact_check_chain = fact_check_prompt | llm
\ No newline at end of file
+claim_check_chain = claim_check_prompt | llm
\ No newline at end of file
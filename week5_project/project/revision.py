@@ -0,0 +1,192 @@
+"""
+Section-level revision for the generate/reflect loop.
+Splits a draft into addressable sections, maps reviewer feedback onto the sections
+it is about, regenerates only those sections and stitches the article back together.
+Also decides when the loop should stop: once the reviewer's score is high enough,
+once consecutive drafts stop changing, or after a fixed number of revisions.
+"""
+
+import difflib
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from buildables_common.tracing import tracer
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from context_builder import (
+    FACT_CHECK_NAME, REFLECTION_NAME, condense_research, current_token_usage, latest_draft, messages_since_draft
+)
+from fact_checker import find_research
+from reflection_chains import section_revision_chain
+
+MAX_REVISIONS = 6         # drafts generated before the loop is stopped regardless
+QUALITY_THRESHOLD = 8.0   # reflection score (out of 10) that counts as publishable
+CONVERGENCE_RATIO = 0.99  # word-level similarity at which two drafts count as converged
+
+_HEADING = re.compile(r"^(#{1,6}\s+.+|\*\*[^*\n]+\*\*)\s*$", re.MULTILINE)
+_SCORE = re.compile(r"SCORE:\s*(\d+(?:\.\d+)?)\s*(?:/\s*10)?", re.IGNORECASE)
+_CORRECTION = re.compile(r'^- "(.+)" -- ', re.MULTILINE)
+_CORRECTIONS_BLOCK = re.compile(r"^Corrections needed:\n(.*?)(?=^(?!- )\S[^\n]*:[ \t]*$|\Z)", re.MULTILINE | re.DOTALL)
+
+_INTRO_HINTS = ("hook", "intro", "opening", "title", "headline", "first paragraph")
+_CONCLUSION_HINTS = ("conclusion", "ending", "outro", "call to action", "closing", "wrap up")
+_BODY_HINTS = ("example", "detail", "depth", "body")
+_FACT_HINTS = ("fact", "accura", "correct")
+_GLOBAL_HINTS = ("shorter", "longer", "length", "tone", "style", "engaging", "emoji", "rewrite", "whole", "entire", "overall")
+
+
+@dataclass
+class Section:
+    heading: str
+    body: str
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(part for part in (self.heading, self.body) if part)
+
+
+def split_sections(article: str) -> List[Section]:
+    """
+    Split an article on its Markdown headings (or bold heading lines).
+    The text before the second heading, i.e. title plus introduction, is section 0.
+    Articles without headings are split into paragraphs instead.
+    """
+    starts = [m.start() for m in _HEADING.finditer(article)]
+    if len(starts) < 2:
+        return [Section("", p.strip()) for p in re.split(r"\n\s*\n", article) if p.strip()]
+
+    bounds = [0] + starts[1:] + [len(article)]
+    sections = []
+    for start, end in zip(bounds, bounds[1:]):
+        chunk = article[start:end].strip()
+        if start in starts:
+            heading, _, body = chunk.partition("\n")
+            sections.append(Section(heading.strip(), body.strip()))
+        else:
+            sections.append(Section("", chunk))
+    return sections
+
+
+def join_sections(sections: Sequence[Section]) -> str:
+    return "\n\n".join(section.text for section in sections)
+
+
+def latest_feedback(state: Sequence[BaseMessage]) -> str:
+    """Human feedback (or, without it, the reflection critique) given on the latest draft."""
+    return "\n".join(_human_notes(state) or _critiques(state))
+
+
+def _human_notes(state: Sequence[BaseMessage]) -> List[str]:
+    return [m.content for m in messages_since_draft(state) if isinstance(m, HumanMessage) and m.name is None]
+
+
+def _critiques(state: Sequence[BaseMessage]) -> List[str]:
+    return [m.content for m in messages_since_draft(state) if isinstance(m, HumanMessage) and m.name == REFLECTION_NAME]
+
+
+def corrected_claims(fact_check: str) -> List[str]:
+    """Claims listed under "Corrections needed:" in a fact-check report, whitespace-normalized."""
+    block = _CORRECTIONS_BLOCK.search(fact_check)
+    return [" ".join(c.split()) for c in _CORRECTION.findall(block.group(1))] if block else []
+
+
+def reflection_score(state: Sequence[BaseMessage]) -> Optional[float]:
+    """Score the reflection agent gave the latest draft, if it gave one."""
+    for msg in reversed(messages_since_draft(state)):
+        if isinstance(msg, HumanMessage) and msg.name == REFLECTION_NAME:
+            match = _SCORE.search(msg.content)
+            return float(match.group(1)) if match else None
+    return None
+
+
+def select_sections(
+    feedback: str, sections: Sequence[Section], fact_check: str = "", from_human: bool = True
+) -> List[int]:
+    """
+    Map feedback onto the indexes of the sections it is about.
+    Returns an empty list when the feedback is about the whole article, in which
+    case the caller should regenerate it in full. Whole-article hints such as
+    "length" or "style" only count in a human note: the reflection prompt asks
+    for them in every critique.
+    """
+    text = feedback.lower()
+    last = len(sections) - 1
+    if last < 1 or (from_human and any(hint in text for hint in _GLOBAL_HINTS)):
+        return []
+
+    selected = set()
+    if any(hint in text for hint in _INTRO_HINTS):
+        selected.add(0)
+    if any(hint in text for hint in _CONCLUSION_HINTS):
+        selected.add(last)
+    if any(hint in text for hint in _BODY_HINTS):
+        selected.update(range(1, last) if last > 1 else [last])
+    if any(hint in text for hint in _FACT_HINTS):
+        claims = corrected_claims(fact_check)
+        for i, section in enumerate(sections):
+            flat = " ".join(section.text.split())
+            if any(claim in flat for claim in claims):
+                selected.add(i)
+
+    words = {w for w in re.findall(r"[a-z]{4,}", text)}
+    for i, section in enumerate(sections):
+        if section.heading and words & set(re.findall(r"[a-z]{4,}", section.heading.lower())):
+            selected.add(i)
+
+    return [] if len(selected) == len(sections) else sorted(selected)
+
+
+def revise_sections(state: Sequence[BaseMessage], max_concurrency: int = 4) -> Optional[str]:
+    """
+    Regenerate only the sections of the latest draft that the feedback targets.
+    Returns the stitched article, or None when a full regeneration is needed.
+    """
+    draft = latest_draft(state)
+    feedback = latest_feedback(state)
+    if not draft or not feedback:
+        return None
+
+    fact_check = next(
+        (m.content for m in reversed(state) if isinstance(m, HumanMessage) and m.name == FACT_CHECK_NAME), ""
+    )
+    sections = split_sections(draft)
+    targets = select_sections(feedback, sections, fact_check, from_human=bool(_human_notes(state)))
+    if not targets:
+        return None
+
+    outline = "\n".join(s.heading or s.body.split("\n")[0][:80] for s in sections)
+    research = condense_research(find_research(state), 1000) or "No research available."
+    inputs = [
+        {"outline": outline, "research": research, "feedback": feedback, "section": sections[i].text}
+        for i in targets
+    ]
+    with tracer.span("section_revision.batch", {"sections": len(targets), "sections_total": len(sections)}):
+        responses = section_revision_chain.batch(inputs, config={"max_concurrency": max_concurrency})
+    for i, item, response in zip(targets, inputs, responses):
+        current_token_usage().record("section_revision", [HumanMessage(content="\n".join(item.values()))], response)
+        revised = response.content.strip()
+        heading = sections[i].heading
+        if heading and revised.startswith(heading):
+            revised = revised[len(heading):].strip()
+        sections[i] = Section(heading, revised)
+    return join_sections(sections)
+
+
+def stop_reason(state: Sequence[BaseMessage]) -> Optional[str]:
+    """
+    Return why the generate/reflect loop should stop, or None to keep revising.
+    """
+    drafts = [m.content for m in state if isinstance(m, AIMessage)]
+    if len(drafts) >= MAX_REVISIONS:
+        return f"reached {MAX_REVISIONS} drafts"
+
+    score = reflection_score(state)
+    if score is not None and score >= QUALITY_THRESHOLD:
+        return f"reflection score {score:g}/10"
+
+    if len(drafts) >= 2:
+        ratio = difflib.SequenceMatcher(None, drafts[-2].split(), drafts[-1].split()).ratio()
+        if ratio >= CONVERGENCE_RATIO:
+            return f"drafts converged ({ratio:.0%} identical)"
+    return None
@@ -0,0 +1,34 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from context_builder import REFLECTION_NAME, build_generation_context, estimate_tokens
+
+RESEARCH = "Research on Rust adoption:\n" + "\n".join(
+    f"Source {i}: " + "Rust adoption grew across systems teams in the developer survey. " * 6 for i in range(4)
+)
+
+def round_state(draft, critique):
+    return [
+        HumanMessage(content="Write an article about Rust adoption"),
+        SystemMessage(content=RESEARCH),
+        AIMessage(content=draft),
+        HumanMessage(content=critique, name=REFLECTION_NAME),
+    ]
+
+def prefix(messages):
+    return [(type(m).__name__, m.content) for m in messages[:2]]
+
+# --- Tests ---
+
+def test_topic_and_research_prefix_is_stable_across_rounds():
+    """Test the cacheable prefix does not change when the draft and feedback do."""
+    first = build_generation_context(round_state("A short draft.", "Add sources."), budget=300)
+    second = build_generation_context(
+        round_state("A much longer second draft. " * 20, "Tighten the conclusion. " * 10), budget=300
+    )
+    assert prefix(first) == prefix(second)
+    assert estimate_tokens(first[1].content) < estimate_tokens(RESEARCH)
+    assert first[2].content == "A short draft."
+
+def test_long_draft_still_gets_feedback():
+    """Test the feedback keeps its minimum share when the draft uses up the rest of the budget."""
+    messages = build_generation_context(round_state("Draft sentence. " * 200, "Fix the intro."), budget=300)
+    assert messages[-1].content == "Reviewer critique:\nFix the intro."
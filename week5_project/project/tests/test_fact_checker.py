@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+from fact_checker import SUPPORTED, FactChecker
+
+FIRST = "Rust adoption grew 40% in 2024 according to the developer survey.\n\nCargo was first released in 2014 with Rust."
+SECOND = FIRST + "\n\nThe borrow checker was the largest change in the 2018 edition of Rust."
+
+class StubChain:
+    """Answers every claim as supported and counts the claims it was sent."""
+
+    def __init__(self):
+        self.claims = []
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        self.claims.extend(item["claim"] for item in inputs)
+        return [SimpleNamespace(content="VERDICT: SUPPORTED\nNOTE: matches the research") for _ in inputs]
+
+# --- Tests ---
+
+def test_changed_paragraphs_are_counted_against_the_previous_draft():
+    """Test the change count depends only on the drafts passed in, not on earlier checks."""
+    checker = FactChecker(chain=StubChain())
+    assert checker.check(FIRST, "research").paragraphs_changed == 2
+    assert checker.check(SECOND, "research", previous_article=FIRST).paragraphs_changed == 1
+    # Another session checking its first draft is not compared with this one's
+    assert checker.check(FIRST, "research").paragraphs_changed == 2
+
+def test_verdicts_are_shared_between_runs():
+    """Test a claim already checked against the same research is served from the cache."""
+    chain = StubChain()
+    checker = FactChecker(chain=chain)
+    checker.check(FIRST, "research")
+    report = checker.check(SECOND, "research", previous_article=FIRST)
+    assert len(chain.claims) == 3
+    assert report.cache_hits == 2
+    assert all(result.verdict == SUPPORTED for result in report.results)
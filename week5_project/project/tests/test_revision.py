@@ -0,0 +1,49 @@
+import pytest
+from fact_checker import CONTRADICTED, SUPPORTED, UNVERIFIED, ClaimResult, FactCheckReport
+from revision import corrected_claims, select_sections, split_sections
+
+ARTICLE = """# Why Rust Is Taking Over Systems Programming
+
+Rust adoption grew 40% in 2024, driven by memory safety.
+
+## Memory Safety
+
+The borrow checker removes whole classes of bugs at compile time.
+
+## Ecosystem
+
+Cargo ships with every Rust install and handles builds and dependencies.
+
+## Conclusion
+
+Rust is worth learning for any systems programmer."""
+
+def report(*results):
+    return FactCheckReport(results=[ClaimResult(claim, verdict, note) for claim, verdict, note in results]).to_text()
+
+# --- Tests ---
+
+def test_all_verified_report_has_no_corrections():
+    """Test supported claims are not read as corrections when nothing was contradicted."""
+    fact_check = report(
+        ("Rust adoption grew 40% in 2024", SUPPORTED, "matches the survey"),
+        ("Cargo ships with every Rust install", SUPPORTED, "documented"),
+    )
+    assert corrected_claims(fact_check) == []
+    assert select_sections("Please fix the factual errors.", split_sections(ARTICLE), fact_check) == []
+
+def test_only_contradicted_claims_are_corrections():
+    """Test the corrections block stops at the next section header."""
+    fact_check = report(
+        ("Rust adoption grew 40% in 2024", CONTRADICTED, "the survey says 25%"),
+        ("The borrow checker removes whole classes of bugs", UNVERIFIED, "not in the research"),
+        ("Cargo ships with every Rust install", SUPPORTED, "documented"),
+    )
+    assert corrected_claims(fact_check) == ["Rust adoption grew 40% in 2024"]
+    assert select_sections("Please fix the factual errors.", split_sections(ARTICLE), fact_check) == [0]
+
+@pytest.mark.parametrize("from_human, expected", [(True, []), (False, [0, 3])])
+def test_style_hints_only_rewrite_for_human_notes(from_human, expected):
+    """Test a critique mentioning length and style still targets the sections it names."""
+    feedback = "The hook is weak and the conclusion needs a call to action. Keep the length and style."
+    assert select_sections(feedback, split_sections(ARTICLE), from_human=from_human) == expected
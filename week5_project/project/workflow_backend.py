@@ -5,6 +5,9 @@ This module provides clean interfaces for Streamlit to interact with the LangGra
 
 from typing import List, Tuple, Dict, Any
 from langchain_core.messages import HumanMessage, SystemMessage, BaseMessage, AIMessage
+from context_builder import TokenUsageLog, use_token_usage
+from revision import stop_reason
+from buildables_common.tracing import NOOP_SPAN, tracer
 from reflection_agent import (
     research_node, generate_node, fact_check_node, reflect_node,
     RESEARCH, GENERATE, FACT_CHECK, REFLECT
@@ -16,16 +19,28 @@ class WorkflowManager:
     def __init__(self):
         self.current_step = None
         self.workflow_state = []
+        self.run_span = NOOP_SPAN
+        self.token_usage = TokenUsageLog()
         
     def reset_workflow(self):
         """Reset the workflow state"""
+        self._end_run()
         self.current_step = None
         self.workflow_state = []
+        self.token_usage.reset()
         
     def initialize_workflow(self, topic: str):
         """Initialize workflow with a topic"""
+        self._end_run()
         self.workflow_state = [HumanMessage(content=topic)]
         self.current_step = RESEARCH
+        # One trace per article, spanning every step and the time spent in human review
+        self.run_span = tracer.start_span("article_run", {"topic.chars": len(topic)})
+
+    def _end_run(self):
+        self.run_span.set("gen_ai.usage.total_tokens", self.token_usage.total_tokens())
+        tracer.end_span(self.run_span)
+        self.run_span = NOOP_SPAN
         
     def run_single_step(self) -> Tuple[List[BaseMessage], str]:
         """
@@ -33,36 +48,41 @@ class WorkflowManager:
         Returns: (new_state, next_step)
         """
         try:
-            if self.current_step == RESEARCH:
-                new_state = research_node(self.workflow_state)
-                next_step = GENERATE
+            # Spans of the node functions become children of the article's run span
+            with tracer.use_span(self.run_span), use_token_usage(self.token_usage):
+                if self.current_step == RESEARCH:
+                    new_state = research_node(self.workflow_state)
+                    next_step = GENERATE
                 
-            elif self.current_step == GENERATE:
-                result = generate_node(self.workflow_state)
-                new_state = self.workflow_state + [result]
-                next_step = FACT_CHECK
+                elif self.current_step == GENERATE:
+                    result = generate_node(self.workflow_state)
+                    new_state = self.workflow_state + [result]
+                    next_step = FACT_CHECK
                 
-            elif self.current_step == FACT_CHECK:
-                new_state = fact_check_node(self.workflow_state)
-                next_step = "HUMAN_REVIEW"
+                elif self.current_step == FACT_CHECK:
+                    new_state = fact_check_node(self.workflow_state)
+                    next_step = "HUMAN_REVIEW"
                 
-            elif self.current_step == REFLECT:
-                result = reflect_node(self.workflow_state)
-                new_state = self.workflow_state + result
-                # Check if we should continue (simplified logic)
-                if len(new_state) > 12:
-                    next_step = "END"
-                else:
-                    next_step = GENERATE
+                elif self.current_step == REFLECT:
+                    result = reflect_node(self.workflow_state)
+                    new_state = self.workflow_state + result
+                    # Stop once the critique scores the draft as publishable or drafts converge
+                    if stop_reason(new_state):
+                        next_step = "END"
+                    else:
+                        next_step = GENERATE
                     
-            else:
-                return self.workflow_state, "END"
+                else:
+                    return self.workflow_state, "END"
                 
-            self.workflow_state = new_state
-            self.current_step = next_step
-            return new_state, next_step
+                self.workflow_state = new_state
+                self.current_step = next_step
+                if next_step == "END":
+                    self._end_run()
+                return new_state, next_step
             
         except Exception as e:
+            self.run_span.record_error(e)
             return self.workflow_state, f"ERROR: {str(e)}"
     
     def process_human_feedback(self, feedback: str) -> str:
@@ -75,6 +95,7 @@ class WorkflowManager:
         
         if "approve" in feedback.lower():
             self.current_step = "END"
+            self._end_run()
             return "END"
         else:
             self.current_step = REFLECT
@@ -138,7 +159,8 @@ class WorkflowManager:
             "current_step": self.current_step,
             "message_count": len(self.workflow_state),
             "is_complete": self.current_step == "END",
-            "needs_human_review": self.current_step == "HUMAN_REVIEW"
+            "needs_human_review": self.current_step == "HUMAN_REVIEW",
+            "tokens_used": self.token_usage.total_tokens()
         }
 
 # Global workflow manager instance
@@ -0,0 +1,87 @@
+import sys
+from datetime import datetime, timedelta
+
+from airflow.sdk import dag, task
+
+# ./src is mounted at /opt/airflow/src; import it as the `src` package so its relative imports resolve
+sys.path.insert(0, "/opt/airflow")
+
+
+@dag(
+    schedule="@daily",
+    start_date=datetime(2025, 1, 1),
+    catchup=False,
+    default_args={"retries": 2, "retry_delay": timedelta(minutes=5)},
+    tags=["arxiv", "ingestion"],
+)
+def arxiv_ingestion():
+    @task
+    def ingest_papers(query: str = "cat:cs.AI OR cat:cs.CL OR cat:cs.LG", max_results: int = 1000) -> dict:
+        """Write new and changed papers to Postgres; the index catches up in sync_index."""
+        import httpx
+        from src.config import get_settings
+        from src.database import create_db_engine, create_session_factory
+        from src.ingestion import run_ingestion, stream_arxiv
+        from src.models import Base
+
+        settings = get_settings()
+        engine = create_db_engine(settings)
+        Base.metadata.create_all(engine)
+        try:
+            with httpx.Client(timeout=settings.opensearch_timeout, follow_redirects=True) as http:
+                papers = stream_arxiv(
+                    http,
+                    settings.arxiv_api_url,
+                    query,
+                    max_results,
+                    page_size=settings.arxiv_page_size,
+                    request_delay=settings.arxiv_request_delay,
+                )
+                stats = run_ingestion(
+                    papers,
+                    create_session_factory(engine),
+                    batch_size=settings.ingestion_batch_size,
+                )
+        finally:
+            engine.dispose()
+        return stats.as_dict()
+
+    @task
+    def sync_index(rebuild: bool = False, sweep_orphans: bool = False) -> dict:
+        """Re-chunk and re-embed the papers changed since the last sync, or rebuild blue/green."""
+        from src.config import get_settings
+        from src.database import create_db_engine, create_session_factory
+        from src.ingestion import run_reindex
+        from src.services.embeddings import BlockingEmbedder
+        from src.services.opensearch import OpenSearchChunkIndex, create_opensearch_client
+
+        settings = get_settings()
+        engine = create_db_engine(settings)
+        opensearch = create_opensearch_client(settings)
+        index = OpenSearchChunkIndex(
+            opensearch,
+            settings.opensearch_index_name,
+            chunk_size=settings.opensearch_bulk_chunk_size,
+            max_chunk_bytes=settings.opensearch_bulk_max_bytes,
+            embedding_dimension=settings.embedding_dimension,
+        )
+        embedder = BlockingEmbedder(settings)
+        try:
+            stats = run_reindex(
+                settings,
+                create_session_factory(engine),
+                index,
+                embed=embedder,
+                rebuild=rebuild,
+                sweep=sweep_orphans,
+            )
+        finally:
+            embedder.close()
+            opensearch.close()
+            engine.dispose()
+        return stats.as_dict()
+
+    ingest_papers() >> sync_index()
+
+
+arxiv_ingestion()
@@ -0,0 +1,33 @@
+import asyncio
+from typing import Awaitable, TypeVar
+
+from fastapi import HTTPException, Request
+
+T = TypeVar("T")
+
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def run_until_disconnected(request: Request, awaitable: Awaitable[T], timeout: float, poll_interval: float = 0.5) -> T:
+    """
+    Await a request's work while watching the client connection.
+    The work is cancelled, and its upstream calls with it, when the client
+    disconnects or the timeout expires.
+    """
+    task = asyncio.ensure_future(awaitable)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise HTTPException(status_code=504, detail="Request timed out")
+            done, _ = await asyncio.wait({task}, timeout=min(poll_interval, remaining))
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
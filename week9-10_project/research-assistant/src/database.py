@@ -0,0 +1,44 @@
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from .config import Settings
+
+
+def to_async_url(database_url: str) -> str:
+    """Swap the driver of a PostgreSQL URL (psycopg2 or none) for asyncpg."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+def create_db_engine(settings: Settings) -> Engine:
+    """Create a pooled synchronous engine for batch jobs such as ingestion."""
+    return create_engine(
+        settings.postgresql_database_url,
+        echo=settings.postgresql_echo_sql,
+        pool_size=settings.postgresql_pool_size,
+        max_overflow=settings.postgresql_max_overflow,
+        pool_pre_ping=True,
+    )
+
+
+def create_session_factory(engine: Engine) -> sessionmaker[Session]:
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def create_async_db_engine(settings: Settings) -> AsyncEngine:
+    """Create the pooled asyncpg engine shared by all requests of an API worker."""
+    return create_async_engine(
+        to_async_url(settings.postgresql_database_url),
+        echo=settings.postgresql_echo_sql,
+        pool_size=settings.postgresql_pool_size,
+        max_overflow=settings.postgresql_max_overflow,
+        pool_pre_ping=True,
+    )
+
+
+def create_async_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
@@ -0,0 +1,54 @@
+from typing import Annotated, AsyncGenerator, Optional
+
+from fastapi import Depends, Request
+from opensearchpy import AsyncOpenSearch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import Settings
+from .services.answer_cache import SemanticAnswerCache
+from .services.ollama import ModelScheduler, OllamaClient
+from .services.search import CrossEncoderReranker, HybridSearcher
+
+
+def get_app_settings(request: Request) -> Settings:
+    return request.app.state.settings
+
+
+async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Yield an async session from the engine pool created at startup."""
+    async with request.app.state.session_factory() as session:
+        yield session
+
+
+def get_opensearch_client(request: Request) -> AsyncOpenSearch:
+    return request.app.state.opensearch_client
+
+
+def get_ollama_client(request: Request) -> OllamaClient:
+    return request.app.state.ollama_client
+
+
+def get_model_scheduler(request: Request) -> ModelScheduler:
+    return request.app.state.model_scheduler
+
+
+def get_searcher(request: Request) -> HybridSearcher:
+    return request.app.state.searcher
+
+
+def get_answer_cache(request: Request) -> Optional[SemanticAnswerCache]:
+    return request.app.state.answer_cache
+
+
+def get_reranker(request: Request) -> Optional[CrossEncoderReranker]:
+    return request.app.state.reranker
+
+
+SettingsDep = Annotated[Settings, Depends(get_app_settings)]
+SessionDep = Annotated[AsyncSession, Depends(get_db_session)]
+OpenSearchDep = Annotated[AsyncOpenSearch, Depends(get_opensearch_client)]
+OllamaDep = Annotated[OllamaClient, Depends(get_ollama_client)]
+SearcherDep = Annotated[HybridSearcher, Depends(get_searcher)]
+AnswerCacheDep = Annotated[Optional[SemanticAnswerCache], Depends(get_answer_cache)]
+SchedulerDep = Annotated[ModelScheduler, Depends(get_model_scheduler)]
+RerankerDep = Annotated[Optional[CrossEncoderReranker], Depends(get_reranker)]
@@ -0,0 +1,14 @@
+class OllamaException(Exception):
+    """Raised when the Ollama API returns an error or cannot be reached."""
+
+
+class OllamaTimeoutError(OllamaException):
+    """Raised when an Ollama call exceeds its timeout."""
+
+
+class SearchException(Exception):
+    """Raised when the search backend fails."""
+
+
+class IndexOutOfDateError(Exception):
+    """Raised when the chunk index was built with different chunking, embedding or mapping settings."""
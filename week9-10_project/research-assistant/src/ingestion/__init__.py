@@ -0,0 +1,25 @@
+from .chunking import Chunk, Chunker, chunk_documents, chunk_stream, chunk_text
+from .pipeline import IngestionStats, index_papers, run_ingestion
+from .reindex import SyncStats, rebuild_index, run_reindex, sweep_orphans, sync_index
+from .repository import upsert_papers
+from .sources import PaperRecord, read_jsonl, stream_arxiv
+
+__all__ = [
+    "Chunk",
+    "Chunker",
+    "IngestionStats",
+    "PaperRecord",
+    "SyncStats",
+    "chunk_documents",
+    "chunk_stream",
+    "chunk_text",
+    "index_papers",
+    "read_jsonl",
+    "rebuild_index",
+    "run_ingestion",
+    "run_reindex",
+    "stream_arxiv",
+    "sweep_orphans",
+    "sync_index",
+    "upsert_papers",
+]
@@ -0,0 +1,95 @@
+"""
+Bulk-ingest arXiv papers into Postgres and OpenSearch.
+
+    python -m src.ingestion --query "cat:cs.CL" --max-results 1000
+    python -m src.ingestion --jsonl arxiv-metadata.jsonl.gz --memory-index --no-embeddings
+    python -m src.ingestion --query "cat:cs.CL" --postgres-only   # then: python -m src.ingestion.reindex
+"""
+
+import argparse
+import json
+import logging
+
+import httpx
+
+from ..config import get_settings
+from ..database import create_db_engine, create_session_factory
+from ..models import Base
+from ..services.embeddings import BlockingEmbedder
+from ..services.opensearch import OpenSearchChunkIndex, create_opensearch_client
+from ..services.search import InMemoryChunkIndex
+from .chunking import Chunker
+from .pipeline import run_ingestion
+from .sources import read_jsonl, stream_arxiv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--query", help="arXiv API search query, e.g. 'cat:cs.CL'")
+    source.add_argument("--jsonl", help="JSON-lines dump of papers (.jsonl or .jsonl.gz)")
+    parser.add_argument("--max-results", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=None)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--memory-index", action="store_true", help="Index into memory instead of OpenSearch")
+    target.add_argument(
+        "--postgres-only", action="store_true", help="Only write Postgres; index later with src.ingestion.reindex"
+    )
+    parser.add_argument("--no-embeddings", action="store_true", help="Index BM25 fields only, without calling Ollama")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    settings = get_settings()
+
+    engine = create_db_engine(settings)
+    Base.metadata.create_all(engine)
+
+    opensearch = None
+    index = None
+    if args.memory_index:
+        index = InMemoryChunkIndex()
+    elif not args.postgres_only:
+        opensearch = create_opensearch_client(settings)
+        index = OpenSearchChunkIndex(
+            opensearch,
+            settings.opensearch_index_name,
+            chunk_size=settings.opensearch_bulk_chunk_size,
+            max_chunk_bytes=settings.opensearch_bulk_max_bytes,
+            embedding_dimension=settings.embedding_dimension,
+        )
+
+    embedder = None if args.no_embeddings or index is None else BlockingEmbedder(settings)
+
+    with httpx.Client(timeout=settings.opensearch_timeout, follow_redirects=True) as http:
+        if args.jsonl:
+            papers = read_jsonl(args.jsonl)
+        else:
+            papers = stream_arxiv(
+                http,
+                settings.arxiv_api_url,
+                args.query,
+                args.max_results,
+                page_size=settings.arxiv_page_size,
+                request_delay=settings.arxiv_request_delay,
+            )
+        try:
+            stats = run_ingestion(
+                papers,
+                create_session_factory(engine),
+                index,
+                batch_size=args.batch_size or settings.ingestion_batch_size,
+                chunker=Chunker.from_settings(settings),
+                embed=embedder,
+            )
+        finally:
+            if embedder is not None:
+                embedder.close()
+            if opensearch is not None:
+                opensearch.close()
+            engine.dispose()
+
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
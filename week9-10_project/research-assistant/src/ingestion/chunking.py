@@ -0,0 +1,110 @@
+"""
+Chunking of papers for the search index.
+
+The chunker itself is shared with the other projects in buildables_common.chunking:
+it packs headings and sentences into overlapping, token-bounded chunks, and every chunk
+is an exact slice of the source, source[chunk.start:chunk.end] == chunk.text, so a
+citation can point back to it. This module adds the settings, the index fingerprint
+and the conversion of papers into index documents.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from buildables_common.chunking import Chunk
+from buildables_common.chunking import Chunker as TextChunker
+
+from ..config import Settings
+from .sources import PaperRecord
+
+# Bump when chunk boundaries or chunk documents change, so the next reindex rebuilds the index
+CHUNKING_VERSION = 2
+
+
+@dataclass(frozen=True)
+class Chunker(TextChunker):
+    """
+    Chunking settings; plain values, so a Chunker can be sent to worker processes.
+
+    Args:
+        chunk_size: Maximum tokens per chunk; a longer sentence is cut at word boundaries
+        overlap: Maximum tokens of whole sentences repeated at the start of the next chunk
+        tokenizer: tiktoken encoding that defines a token; None counts words and punctuation
+        workers: Processes chunk_documents spreads papers over; 1 chunks in the calling process
+    """
+
+    chunk_size: int = 400
+    overlap: int = 60
+    tokenizer: Optional[str] = None
+    workers: int = 1
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "Chunker":
+        return cls(
+            chunk_size=settings.chunk_size_tokens,
+            overlap=settings.chunk_overlap_tokens,
+            tokenizer=settings.chunk_tokenizer,
+            workers=settings.chunk_workers,
+        )
+
+    @property
+    def fingerprint(self) -> Dict:
+        """The settings that decide the chunk boundaries."""
+        config = asdict(self)
+        config.pop("workers")
+        return config
+
+
+def chunk_text(text: str, chunk_size: int = 400, overlap: int = 60, tokenizer: Optional[str] = None) -> List[Chunk]:
+    """Split text into overlapping chunks of at most chunk_size tokens, with their offsets."""
+    return Chunker(chunk_size, overlap, tokenizer).chunk_text(text)
+
+
+def chunk_stream(stream: TextIO, chunk_size: int = 400, overlap: int = 60, tokenizer: Optional[str] = None) -> Iterator[Chunk]:
+    return Chunker(chunk_size, overlap, tokenizer).chunk_stream(stream)
+
+
+def _spans(text: str, chunker: Chunker) -> List[Tuple[int, int, Optional[str]]]:
+    return [(chunk.start, chunk.end, chunk.section) for chunk in chunker.chunk_text(text)]
+
+
+@lru_cache(maxsize=None)
+def _pool(workers: int) -> ProcessPoolExecutor:
+    # One pool per process, reused by every batch instead of paying for worker startup each time
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def chunk_documents(papers: Sequence[PaperRecord], chunker: Chunker = Chunker()) -> Iterator[dict]:
+    """Yield the index documents of each paper's chunks, in paper order."""
+    fields = ["body" if p.body else "abstract" if p.abstract else "title" for p in papers]
+    texts = [getattr(paper, field) for paper, field in zip(papers, fields)]
+    if chunker.workers > 1 and len(papers) > 1:
+        # Workers return offsets only; slicing the text here is cheaper than pickling the chunks back
+        chunksize = max(1, len(papers) // (chunker.workers * 4))
+        spans = _pool(chunker.workers).map(_spans, texts, repeat(chunker), chunksize=chunksize)
+    else:
+        spans = (_spans(text, chunker) for text in texts)
+
+    for paper, field, text, paper_spans in zip(papers, fields, texts, spans):
+        content_hash = paper.content_hash
+        published = paper.published_date.isoformat() if paper.published_date else None
+        for i, (start, end, section) in enumerate(paper_spans):
+            yield {
+                "chunk_id": f"{paper.arxiv_id}:{i}",
+                "arxiv_id": paper.arxiv_id,
+                "chunk_index": i,
+                "title": paper.title,
+                "abstract": paper.abstract,
+                "chunk_text": text[start:end],
+                "section": section,
+                "source_field": field,
+                "char_start": start,
+                "char_end": end,
+                "authors": paper.authors,
+                "categories": paper.categories,
+                "published_date": published,
+                "content_hash": content_hash,
+            }
@@ -0,0 +1,120 @@
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..services.opensearch import ChunkIndex
+from .chunking import Chunker, chunk_documents
+from .repository import upsert_papers
+from .sources import PaperRecord
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Synchronous batch embedding function, e.g. a BlockingEmbedder
+DocumentEmbedder = Callable[[List[str]], List[List[float]]]
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def embedding_text(doc: Dict) -> str:
+    return f"{doc['title']}\n{doc['chunk_text']}"
+
+
+def index_papers(
+    papers: Sequence[PaperRecord],
+    index: ChunkIndex,
+    chunker: Chunker = Chunker(),
+    embed: Optional[DocumentEmbedder] = None,
+) -> Tuple[int, int]:
+    """
+    Re-chunk, embed and index the papers, then delete the chunks they no longer have.
+    Chunk ids are "<arxiv_id>:<chunk_index>", so indexing overwrites the existing chunks
+    and only the tail of a paper that got shorter is left to delete; the paper stays
+    searchable throughout. Returns (chunks indexed, stale chunks deleted).
+    """
+    docs = list(chunk_documents(papers, chunker))
+    if embed is not None and docs:
+        for doc, vector in zip(docs, embed([embedding_text(doc) for doc in docs])):
+            doc["embedding"] = vector
+    counts = {paper.arxiv_id: 0 for paper in papers}
+    for doc in docs:
+        counts[doc["arxiv_id"]] += 1
+    indexed = index.bulk_index(docs)
+    return indexed, index.delete_stale_chunks(counts)
+
+
+@dataclass
+class IngestionStats:
+    papers_seen: int = 0
+    papers_written: int = 0
+    papers_unchanged: int = 0
+    chunks_indexed: int = 0
+    batches: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.papers_seen / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("started")
+        data["docs_per_second"] = round(self.docs_per_second, 1)
+        return data
+
+
+def run_ingestion(
+    papers: Iterable[PaperRecord],
+    session_factory: sessionmaker[Session],
+    index: Optional[ChunkIndex] = None,
+    batch_size: int = 500,
+    chunker: Chunker = Chunker(),
+    embed: Optional[DocumentEmbedder] = None,
+) -> IngestionStats:
+    """
+    Stream papers into Postgres and the chunk index in batches.
+
+    The pipeline is pull-based: the next batch is only read from the source once the
+    previous one is committed and indexed, so a slow database or cluster slows the
+    download down instead of buffering papers in memory. Papers whose content hash is
+    unchanged are skipped, which makes re-running an ingestion cheap and idempotent.
+    With an embed function, every indexed chunk also gets an embedding.
+
+    Without an index only Postgres is written; src.ingestion.reindex then brings the
+    index up to date from the papers' updated_at watermark.
+    """
+    if index is not None:
+        index.ensure_index()
+    stats = IngestionStats()
+
+    for batch in batched(papers, batch_size):
+        with session_factory() as session, session.begin():
+            changed = upsert_papers(session, batch)
+
+        to_index = list({p.arxiv_id: p for p in batch if p.arxiv_id in changed}.values())
+        if index is not None and to_index:
+            indexed, _ = index_papers(to_index, index, chunker, embed)
+            stats.chunks_indexed += indexed
+
+        stats.batches += 1
+        stats.papers_seen += len(batch)
+        stats.papers_written += len(changed)
+        stats.papers_unchanged += len(batch) - len(changed)
+        stats.elapsed = time.perf_counter() - stats.started
+        logger.info(
+            "Batch %d: %d papers, %d written, %d chunks indexed (%.1f docs/s)",
+            stats.batches, len(batch), len(changed), stats.chunks_indexed, stats.docs_per_second,
+        )
+
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
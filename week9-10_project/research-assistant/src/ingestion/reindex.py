@@ -0,0 +1,316 @@
+"""
+Incremental, change-data-driven sync of the chunk index with the papers table.
+
+    python -m src.ingestion.reindex                   # index the papers changed since the last run
+    python -m src.ingestion.reindex --sweep-orphans   # also drop chunks of papers gone from Postgres
+    python -m src.ingestion.reindex --rebuild         # blue/green rebuild behind the alias
+
+A run reads only the papers whose updated_at is past the stored watermark, so its cost
+follows the number of changed papers rather than the size of the corpus. When the
+chunking, embedding or mapping settings change, the index is rebuilt into a new
+physical index and the alias is swapped once it is complete.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..config import Settings, get_settings
+from ..database import create_db_engine, create_session_factory
+from ..exceptions import IndexOutOfDateError
+from ..models import Base, IndexSyncState, Paper
+from ..services.embeddings import BlockingEmbedder
+from ..services.opensearch import (
+    ChunkIndex,
+    OpenSearchChunkIndex,
+    chunk_index_body,
+    create_opensearch_client,
+    physical_index_name,
+)
+from .chunking import CHUNKING_VERSION, Chunker
+from .pipeline import DocumentEmbedder, batched, index_papers
+from .sources import PaperRecord
+
+logger = logging.getLogger(__name__)
+
+# Rows are stamped with now() when their transaction runs but become visible when it
+# commits, so a transaction still open during the last sync can commit rows older than
+# the watermark. Each run re-reads this window before the watermark to pick them up.
+WATERMARK_LAG = timedelta(minutes=5)
+
+
+@dataclass
+class SyncStats:
+    mode: str
+    index: str
+    papers: int = 0
+    chunks_indexed: int = 0
+    stale_chunks_deleted: int = 0
+    orphan_papers_deleted: int = 0
+    watermark: Optional[str] = None
+    started: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("started")
+        data["elapsed"] = round(self.elapsed, 2)
+        return data
+
+
+def pipeline_version(settings: Settings, embeddings: bool = True) -> str:
+    """Fingerprint of everything that shapes the indexed documents; a change requires a rebuild."""
+    config = {
+        "chunking": CHUNKING_VERSION,
+        "chunker": Chunker.from_settings(settings).fingerprint,
+        "embedding_model": settings.ollama_embedding_model if embeddings else None,
+        "mapping": chunk_index_body(settings.embedding_dimension),
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def paper_record(paper: Paper) -> PaperRecord:
+    return PaperRecord(
+        arxiv_id=paper.arxiv_id,
+        title=paper.title,
+        abstract=paper.abstract,
+        authors=list(paper.authors or []),
+        categories=list(paper.categories or []),
+        published_date=paper.published_date,
+        pdf_url=paper.pdf_url,
+        body=paper.body,
+    )
+
+
+def changed_papers(
+    session_factory: sessionmaker[Session], since: Optional[datetime], batch_size: int = 500
+) -> Iterator[List[Paper]]:
+    """
+    Yield the papers updated after `since` (all papers if None) in (updated_at, id)
+    order. Only the ids are read up front, from the updated_at index, so memory follows
+    the number of changed papers; the papers themselves are loaded one batch at a time.
+    """
+    stmt = select(Paper.id).order_by(Paper.updated_at, Paper.id)
+    if since is not None:
+        stmt = stmt.where(Paper.updated_at > since)
+    with session_factory() as session:
+        ids = list(session.scalars(stmt))
+
+    for batch in batched(ids, batch_size):
+        with session_factory() as session:
+            papers = list(session.scalars(select(Paper).where(Paper.id.in_(batch)).order_by(Paper.updated_at, Paper.id)))
+        if papers:
+            yield papers
+
+
+def load_state(session_factory: sessionmaker[Session], alias: str) -> Optional[IndexSyncState]:
+    with session_factory() as session:
+        return session.get(IndexSyncState, alias)
+
+
+def save_state(session_factory: sessionmaker[Session], alias: str, **values) -> None:
+    with session_factory() as session, session.begin():
+        state = session.get(IndexSyncState, alias) or IndexSyncState(alias=alias)
+        for key, value in values.items():
+            setattr(state, key, value)
+        session.add(state)
+
+
+def _sync(
+    session_factory: sessionmaker[Session],
+    index: ChunkIndex,
+    since: Optional[datetime],
+    stats: SyncStats,
+    chunker: Chunker,
+    embed: Optional[DocumentEmbedder],
+    batch_size: int,
+    on_batch: Optional[Callable[[datetime], None]] = None,
+) -> None:
+    for papers in changed_papers(session_factory, since, batch_size):
+        indexed, stale = index_papers([paper_record(p) for p in papers], index, chunker, embed)
+        stats.papers += len(papers)
+        stats.chunks_indexed += indexed
+        stats.stale_chunks_deleted += stale
+        stats.watermark = papers[-1].updated_at.isoformat()
+        stats.elapsed = time.perf_counter() - stats.started
+        if on_batch is not None:
+            on_batch(papers[-1].updated_at)
+        logger.info(
+            "%s: %d papers, %d chunks indexed, %d stale chunks deleted, watermark %s",
+            stats.index, stats.papers, stats.chunks_indexed, stats.stale_chunks_deleted, stats.watermark,
+        )
+
+
+def sync_index(
+    session_factory: sessionmaker[Session],
+    index: ChunkIndex,
+    alias: str,
+    version: str,
+    chunker: Chunker = Chunker(),
+    embed: Optional[DocumentEmbedder] = None,
+    batch_size: int = 500,
+    lag: timedelta = WATERMARK_LAG,
+) -> SyncStats:
+    """
+    Re-chunk, re-embed and re-index the papers changed since the alias's watermark.
+    The watermark is saved after every batch, so an interrupted run resumes where it
+    stopped. The first run of an alias without state indexes every paper in place.
+    Raises IndexOutOfDateError when the index was built with a different pipeline_version.
+    """
+    state = load_state(session_factory, alias)
+    if state is not None and state.pipeline_version != version:
+        raise IndexOutOfDateError(
+            f"Index {alias} was built with pipeline {state.pipeline_version}, the settings give {version}; "
+            "run a rebuild"
+        )
+    index.ensure_index()
+    since = state.watermark - lag if state is not None and state.watermark is not None else None
+    stats = SyncStats(mode="incremental", index=alias)
+
+    def checkpoint(watermark: datetime) -> None:
+        save_state(session_factory, alias, pipeline_version=version, watermark=watermark)
+
+    _sync(session_factory, index, since, stats, chunker, embed, batch_size, checkpoint)
+    if state is None and stats.papers == 0:
+        save_state(session_factory, alias, pipeline_version=version)
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
+
+
+def rebuild_index(
+    session_factory: sessionmaker[Session],
+    index: OpenSearchChunkIndex,
+    version: str,
+    chunker: Chunker = Chunker(),
+    embed: Optional[DocumentEmbedder] = None,
+    batch_size: int = 500,
+    keep_old: bool = False,
+) -> SyncStats:
+    """
+    Blue/green rebuild: index every paper into a new physical index while searches keep
+    using the current one, then swap index.index_name (the alias) over in one call.
+    The watermark is the newest updated_at seen before the rebuild started, so the next
+    incremental run picks up papers that changed while it ran.
+    """
+    alias = index.index_name
+    with session_factory() as session:
+        watermark = session.scalar(select(func.max(Paper.updated_at)))
+
+    target = index.for_index(physical_index_name(alias))
+    target.create_index(target.index_name)
+    stats = SyncStats(mode="rebuild", index=target.index_name)
+    try:
+        target.set_refresh_interval("-1")
+        _sync(session_factory, target, None, stats, chunker, embed, batch_size)
+        target.set_refresh_interval(None)
+        index.client.indices.refresh(index=target.index_name)
+    except BaseException:
+        index.client.indices.delete(index=target.index_name)
+        raise
+
+    target.swap_alias(alias, delete_old=not keep_old)
+    save_state(
+        session_factory, alias, physical_index=target.index_name, pipeline_version=version, watermark=watermark
+    )
+    stats.watermark = watermark.isoformat() if watermark else None
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
+
+
+def sweep_orphans(session_factory: sessionmaker[Session], index: ChunkIndex, batch_size: int = 1000) -> int:
+    """Delete the chunks of papers that are in the index but no longer in Postgres."""
+    deleted = 0
+    for arxiv_ids in batched(index.paper_ids(), batch_size):
+        with session_factory() as session:
+            present = set(session.scalars(select(Paper.arxiv_id).where(Paper.arxiv_id.in_(arxiv_ids))))
+        orphans = [arxiv_id for arxiv_id in arxiv_ids if arxiv_id not in present]
+        if orphans:
+            index.delete_papers(orphans)
+            deleted += len(orphans)
+            logger.info("Deleted the chunks of %d papers missing from Postgres", len(orphans))
+    return deleted
+
+
+def run_reindex(
+    settings: Settings,
+    session_factory: sessionmaker[Session],
+    index: OpenSearchChunkIndex,
+    embed: Optional[DocumentEmbedder] = None,
+    rebuild: bool = False,
+    sweep: bool = False,
+    batch_size: Optional[int] = None,
+) -> SyncStats:
+    """
+    Nightly maintenance entry point: an incremental sync, or a blue/green rebuild when
+    asked for or when the pipeline settings changed since the index was built.
+    """
+    version = pipeline_version(settings, embeddings=embed is not None)
+    options = dict(
+        chunker=Chunker.from_settings(settings),
+        embed=embed,
+        batch_size=batch_size or settings.ingestion_batch_size,
+    )
+    if rebuild:
+        return rebuild_index(session_factory, index, version, **options)
+    try:
+        stats = sync_index(session_factory, index, index.index_name, version, **options)
+    except IndexOutOfDateError as e:
+        logger.warning("%s; rebuilding", e)
+        return rebuild_index(session_factory, index, version, **options)
+    if sweep:
+        stats.orphan_papers_deleted = sweep_orphans(session_factory, index)
+        stats.elapsed = time.perf_counter() - stats.started
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild into a new index and swap the alias")
+    parser.add_argument("--sweep-orphans", action="store_true", help="Delete chunks of papers missing from Postgres")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--no-embeddings", action="store_true", help="Index BM25 fields only, without calling Ollama")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    settings = get_settings()
+
+    engine = create_db_engine(settings)
+    Base.metadata.create_all(engine)
+    opensearch = create_opensearch_client(settings)
+    index = OpenSearchChunkIndex(
+        opensearch,
+        settings.opensearch_index_name,
+        chunk_size=settings.opensearch_bulk_chunk_size,
+        max_chunk_bytes=settings.opensearch_bulk_max_bytes,
+        embedding_dimension=settings.embedding_dimension,
+    )
+    embedder = None if args.no_embeddings else BlockingEmbedder(settings)
+    try:
+        stats = run_reindex(
+            settings,
+            create_session_factory(engine),
+            index,
+            embed=embedder,
+            rebuild=args.rebuild,
+            sweep=args.sweep_orphans,
+            batch_size=args.batch_size,
+        )
+    finally:
+        if embedder is not None:
+            embedder.close()
+        opensearch.close()
+        engine.dispose()
+
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from typing import Dict, List, Sequence, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import Paper
+from .sources import PaperRecord
+
+
+def _insert(session: Session):
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Upserts are not supported on {dialect}")
+    return insert
+
+
+def _row(paper: PaperRecord) -> Dict:
+    return {
+        "arxiv_id": paper.arxiv_id,
+        "title": paper.title,
+        "abstract": paper.abstract,
+        "authors": paper.authors,
+        "categories": paper.categories,
+        "published_date": paper.published_date,
+        "pdf_url": paper.pdf_url,
+        "body": paper.body,
+        "content_hash": paper.content_hash,
+    }
+
+
+def upsert_papers(session: Session, papers: Sequence[PaperRecord]) -> Set[str]:
+    """
+    Write a batch of papers with one multi-row INSERT ... ON CONFLICT statement.
+    Rows whose content hash is unchanged are left untouched. Returns the ids of the
+    papers that were inserted or changed, i.e. the ones that need re-indexing.
+    """
+    # A statement may not touch the same row twice, so keep the last copy of each id
+    rows: List[Dict] = list({p.arxiv_id: _row(p) for p in papers}.values())
+    if not rows:
+        return set()
+
+    insert = _insert(session)
+    stmt = insert(Paper).values(rows)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Paper.arxiv_id],
+        set_={
+            **{key: getattr(excluded, key) for key in rows[0] if key != "arxiv_id"},
+            "updated_at": func.now(),
+        },
+        where=Paper.content_hash != excluded.content_hash,
+    ).returning(Paper.arxiv_id)
+    return set(session.execute(stmt).scalars())
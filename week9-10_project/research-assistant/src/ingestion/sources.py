@@ -0,0 +1,143 @@
+import gzip
+import hashlib
+import json
+import logging
+import re
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+_VERSION = re.compile(r"v\d+$")
+
+
+@dataclass(slots=True)
+class PaperRecord:
+    arxiv_id: str
+    title: str
+    abstract: str
+    authors: List[str] = field(default_factory=list)
+    categories: List[str] = field(default_factory=list)
+    published_date: Optional[datetime] = None
+    pdf_url: Optional[str] = None
+    body: Optional[str] = None
+
+    @property
+    def content_hash(self) -> str:
+        """Hash of everything that ends up in the index; equal hashes mean nothing to re-ingest."""
+        parts = [self.title, self.abstract, self.body or "", "|".join(self.authors), "|".join(self.categories)]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _clean(text: Optional[str]) -> str:
+    return " ".join((text or "").split())
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _parse_entry(entry: ET.Element) -> PaperRecord:
+    # <id>http://arxiv.org/abs/2401.00001v2</id> -> 2401.00001
+    arxiv_id = _VERSION.sub("", (entry.findtext(f"{ATOM}id") or "").rsplit("/abs/", 1)[-1])
+    pdf_url = next(
+        (link.get("href") for link in entry.findall(f"{ATOM}link") if link.get("title") == "pdf"),
+        None,
+    )
+    return PaperRecord(
+        arxiv_id=arxiv_id,
+        title=_clean(entry.findtext(f"{ATOM}title")),
+        abstract=_clean(entry.findtext(f"{ATOM}summary")),
+        authors=[_clean(a.findtext(f"{ATOM}name")) for a in entry.findall(f"{ATOM}author")],
+        categories=[c.get("term") for c in entry.findall(f"{ATOM}category") if c.get("term")],
+        published_date=_parse_date(entry.findtext(f"{ATOM}published")),
+        pdf_url=pdf_url,
+    )
+
+
+def stream_arxiv(
+    client: httpx.Client,
+    api_url: str,
+    query: str,
+    max_results: int,
+    page_size: int = 200,
+    request_delay: float = 3.0,
+) -> Iterator[PaperRecord]:
+    """
+    Yield papers from the arXiv API page by page.
+    Each response is parsed incrementally while it downloads, so entries reach the
+    pipeline before the page has finished and memory stays flat regardless of size.
+    """
+    start = 0
+    while start < max_results:
+        params = {
+            "search_query": query,
+            "start": start,
+            "max_results": min(page_size, max_results - start),
+            "sortBy": "lastUpdatedDate",
+            "sortOrder": "descending",
+        }
+        parser = ET.XMLPullParser(events=("end",))
+        received = 0
+        with client.stream("GET", api_url, params=params) as response:
+            response.raise_for_status()
+            for data in response.iter_bytes():
+                parser.feed(data)
+                for _, element in parser.read_events():
+                    if element.tag == f"{ATOM}entry":
+                        received += 1
+                        yield _parse_entry(element)
+                        element.clear()
+        parser.close()
+
+        logger.info("Fetched %d papers from arXiv (offset %d)", received, start)
+        if received == 0:
+            break
+        start += received
+        if start < max_results:
+            time.sleep(request_delay)
+
+
+def read_jsonl(path: str) -> Iterator[PaperRecord]:
+    """
+    Yield papers from a JSON-lines dump (optionally gzipped), e.g. the Kaggle arXiv
+    metadata snapshot. A "body" field, if present, is indexed as the full text.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping malformed line %d of %s", line_number, path)
+                continue
+
+            authors = item.get("authors") or []
+            if isinstance(authors, str):
+                authors = [a.strip() for a in authors.replace(" and ", ",").split(",") if a.strip()]
+            categories = item.get("categories") or []
+            if isinstance(categories, str):
+                categories = categories.split()
+            yield PaperRecord(
+                arxiv_id=str(item.get("arxiv_id") or item["id"]),
+                title=_clean(item.get("title")),
+                abstract=_clean(item.get("abstract")),
+                authors=authors,
+                categories=categories,
+                published_date=_parse_date(item.get("published_date") or item.get("update_date")),
+                pdf_url=item.get("pdf_url"),
+                body=item.get("body"),
+            )
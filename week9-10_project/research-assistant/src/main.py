@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from .config import get_settings
+from .database import create_async_db_engine, create_async_session_factory
+from .middleware import RequestMetricsMiddleware, TracingMiddleware
+from .routers import ask, health, metrics, ping, search
+from .services.answer_cache import SemanticAnswerCache
+from .services.embeddings import create_embedding_service
+from .services.health import HealthChecker, ollama_check, opensearch_check, postgres_check
+from .services.ollama import ModelScheduler, OllamaClient
+from .services.opensearch import create_async_opensearch_client
+from .services.search import OpenSearchSearcher, create_reranker
+from .tracing import configure_tracing
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build settings, connection pools and service clients once per worker."""
+    settings = get_settings()
+    configure_tracing(settings)
+    engine = create_async_db_engine(settings)
+
+    app.state.settings = settings
+    app.state.db_engine = engine
+    app.state.session_factory = create_async_session_factory(engine)
+    app.state.opensearch_client = create_async_opensearch_client(settings)
+    app.state.ollama_client = OllamaClient(settings)
+    app.state.model_scheduler = ModelScheduler(app.state.ollama_client, settings)
+    app.state.embedding_service = create_embedding_service(settings, app.state.ollama_client)
+    app.state.searcher = OpenSearchSearcher(
+        app.state.opensearch_client,
+        settings.opensearch_index_name,
+        embed=app.state.embedding_service.embed,
+        default_mode=settings.search_mode,
+        candidates=settings.search_candidates,
+        rrf_k=settings.search_rrf_k,
+    )
+    app.state.reranker = create_reranker(settings)
+    app.state.answer_cache = (
+        SemanticAnswerCache(
+            app.state.embedding_service.embed,
+            capacity=settings.answer_cache_size,
+            ttl=settings.answer_cache_ttl,
+            threshold=settings.answer_cache_threshold,
+        )
+        if settings.answer_cache_enabled
+        else None
+    )
+    app.state.health_checker = HealthChecker(
+        {
+            "postgres": postgres_check(engine),
+            "opensearch": opensearch_check(app.state.opensearch_client),
+            "ollama": ollama_check(app.state.ollama_client),
+        },
+        timeout=settings.health_check_timeout,
+        ttl=settings.health_cache_ttl,
+    )
+    logger.info("%s %s started (%s)", settings.service_name, settings.app_version, settings.environment)
+
+    # Warm the models in the background so startup does not wait for a cold load
+    preload = asyncio.create_task(app.state.model_scheduler.preload(settings.ollama_preload_models))
+    # Until the reranker has loaded, answers use the first-stage order
+    load_reranker = asyncio.create_task(app.state.reranker.load()) if app.state.reranker else None
+
+    try:
+        yield
+    finally:
+        preload.cancel()
+        if load_reranker is not None:
+            load_reranker.cancel()
+            app.state.reranker.close()
+        await app.state.ollama_client.close()
+        await app.state.opensearch_client.close()
+        await engine.dispose()
+
+
+app = FastAPI(
+    title="Research Assistant API",
+    version=get_settings().app_version,
+    lifespan=lifespan,
+)
+
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+
+app.include_router(ping.router)
+app.include_router(health.router)
+app.include_router(ask.router)
+app.include_router(search.router)
+app.include_router(metrics.router)
@@ -0,0 +1,85 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+# Upper bounds in seconds, from cache hits (milliseconds) to large-model generations (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _labels(labels: Dict[str, str]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def format_sample(name: str, labels: Iterable[Tuple[str, str]], value: float) -> str:
+    """One line of the Prometheus text exposition format."""
+    pairs = ",".join(f'{key}="{value}"' for key, value in labels)
+    return f"{name}{{{pairs}}} {value:g}" if pairs else f"{name} {value:g}"
+
+
+def render_family(name: str, kind: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(format_sample(name, _labels(labels), value) for labels, value in samples)
+    return lines
+
+
+class Histogram:
+    """Cumulative latency histogram with Prometheus-style buckets."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.counts[bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def render(self, name: str, labels: LabelSet) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(format_sample(f"{name}_bucket", labels + (("le", le),), cumulative))
+        lines.append(format_sample(f"{name}_sum", labels, self.sum))
+        lines.append(format_sample(f"{name}_count", labels, self.count))
+        return lines
+
+
+class Metrics:
+    """In-process metrics of one API worker: labelled latency histograms and gauges."""
+
+    def __init__(self):
+        self.histograms: Dict[str, Dict[LabelSet, Histogram]] = {}
+        self.gauges: Dict[str, Dict[LabelSet, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = _labels(labels)
+        histogram = self.histograms.get(name, {}).get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, {}).setdefault(key, Histogram())
+        histogram.observe(seconds)
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        self.gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        for name, series in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in sorted(series.items()):
+                lines.extend(histogram.render(name, labels))
+        for name, series in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(format_sample(name, labels, value) for labels, value in sorted(series.items()))
+        return lines
+
+
+metrics = Metrics()
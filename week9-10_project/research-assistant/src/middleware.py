@@ -0,0 +1,83 @@
+import time
+from typing import Tuple
+
+from buildables_common.tracing import format_traceparent, parse_traceparent, tracer
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Records the duration of every HTTP request by method, route template and status.
+    A plain ASGI middleware, so streamed responses are timed until their last byte and
+    client disconnects still reach the endpoint.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route,
+                status=str(status),
+            )
+
+
+class TracingMiddleware:
+    """
+    Opens the root span of every HTTP request, so the retrieval, reranking and generation
+    spans of a handler nest under it. A W3C traceparent header continues the caller's
+    trace, and the response carries the request span's traceparent back.
+    """
+
+    def __init__(self, app: ASGIApp, exclude: Tuple[str, ...] = ("/metrics", "/ping", "/health", "/ready")):
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled or scope["path"].startswith(self.exclude):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        with tracer.span(scope["method"], {"http.request.method": scope["method"]}, parent=parent) as span:
+
+            async def send_with_trace(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.error = f"HTTP {message['status']}"
+                    message.setdefault("headers", [])
+                    message["headers"] = [
+                        *message["headers"], (b"traceparent", format_traceparent(span.context).encode("latin-1"))
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace)
+            finally:
+                route = getattr(scope.get("route"), "path", "unmatched")
+                span.name = f"{scope['method']} {route}"
+                span.set("http.route", route)
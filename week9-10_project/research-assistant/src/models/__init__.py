@@ -0,0 +1,5 @@
+from .base import Base
+from .index_state import IndexSyncState
+from .paper import Paper
+
+__all__ = ["Base", "IndexSyncState", "Paper"]
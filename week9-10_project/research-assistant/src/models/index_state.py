@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class IndexSyncState(Base):
+    """How far the chunk index behind an alias has caught up with the papers table."""
+
+    __tablename__ = "index_sync_state"
+
+    alias: Mapped[str] = mapped_column(String(255), primary_key=True)
+    physical_index: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # Fingerprint of the chunking, embedding and mapping settings the index was built with
+    pipeline_version: Mapped[str] = mapped_column(String(64))
+    # Largest papers.updated_at that has been indexed
+    watermark: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,86 @@
+import json
+import time
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from ..concurrency import run_until_disconnected
+from ..dependencies import AnswerCacheDep, RerankerDep, SchedulerDep, SearcherDep, SettingsDep
+from ..exceptions import OllamaException, OllamaTimeoutError, SearchException
+from ..metrics import metrics
+from ..schemas.ask import AskRequest, AskResponse
+from ..services.rag import answer_question, stream_answer
+
+router = APIRouter(tags=["ask"])
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/ask", response_model=AskResponse)
+async def ask(
+    request: Request,
+    body: AskRequest,
+    settings: SettingsDep,
+    searcher: SearcherDep,
+    llm: SchedulerDep,
+    cache: AnswerCacheDep,
+    reranker: RerankerDep,
+) -> AskResponse:
+    """Answer a research question from the indexed papers."""
+    started = time.perf_counter()
+    try:
+        response = await run_until_disconnected(
+            request,
+            answer_question(searcher, llm, body.query, body.top_k, body.model, body.filters, cache, reranker),
+            timeout=settings.ollama_timeout,
+        )
+    except OllamaTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except (OllamaException, SearchException) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    metrics.observe("ask_cached_seconds" if response.cached else "ask_seconds", time.perf_counter() - started)
+    return response
+
+
+@router.post("/ask/stream")
+async def ask_stream(
+    body: AskRequest, searcher: SearcherDep, llm: SchedulerDep, cache: AnswerCacheDep, reranker: RerankerDep
+) -> StreamingResponse:
+    """
+    Answer a research question as Server-Sent Events: a `sources` event once retrieval
+    is done, a `token` event per generated chunk, then `done` (or `error`) with timings.
+    When the client disconnects, Starlette cancels the stream, which closes the Ollama request.
+    """
+    started = time.perf_counter()
+
+    async def events() -> AsyncIterator[str]:
+        timings = {}
+        answer = stream_answer(searcher, llm, body.query, body.top_k, body.model, body.filters, cache, reranker)
+        try:
+            async for event, data in answer:
+                elapsed = time.perf_counter() - started
+                if event == "sources":
+                    timings["sources_ms"] = round(elapsed * 1000, 1)
+                    metrics.observe("ask_stream_sources_seconds", elapsed)
+                elif event == "token" and "first_token_ms" not in timings:
+                    timings["first_token_ms"] = round(elapsed * 1000, 1)
+                    metrics.observe("ask_stream_first_token_seconds", elapsed)
+                elif event == "done":
+                    timings["total_ms"] = round(elapsed * 1000, 1)
+                    metrics.observe("ask_stream_total_seconds", elapsed)
+                    data = {**data, **timings}
+                yield sse_event(event, data)
+        except (OllamaException, SearchException) as e:
+            yield sse_event("error", {"detail": str(e), **timings})
+        finally:
+            await answer.aclose()
+
+    # X-Accel-Buffering stops reverse proxies from holding back the events
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
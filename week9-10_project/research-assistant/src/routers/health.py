@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from ..dependencies import SettingsDep
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/health")
+async def health(request: Request, settings: SettingsDep) -> dict:
+    """Liveness: answers 200 while the process is up and reports the state of each backing service."""
+    result = await request.app.state.health_checker.check()
+    return {"version": settings.app_version, "environment": settings.environment, **result}
+
+
+@router.get("/ready")
+async def ready(request: Request) -> JSONResponse:
+    """Readiness: 503 until Postgres, OpenSearch and Ollama all respond."""
+    result = await request.app.state.health_checker.check()
+    return JSONResponse(result, status_code=200 if result["status"] == "ok" else 503)
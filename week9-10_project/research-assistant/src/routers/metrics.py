@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from ..metrics import metrics, render_family
+
+router = APIRouter(tags=["metrics"])
+
+
+def _pool_metrics(request: Request) -> list:
+    engine = request.app.state.db_engine
+    settings = request.app.state.settings
+    pool = engine.pool
+    capacity = settings.postgresql_pool_size + settings.postgresql_max_overflow
+    checked_out = pool.checkedout()
+    return [
+        *render_family("db_pool_size", "gauge", "Connections the pool keeps open.", [({}, pool.size())]),
+        *render_family("db_pool_checked_out", "gauge", "Connections in use.", [({}, checked_out)]),
+        *render_family("db_pool_overflow", "gauge", "Connections opened beyond pool_size.", [({}, max(pool.overflow(), 0))]),
+        *render_family(
+            "db_pool_utilization", "gauge", "Share of the pool capacity in use.", [({}, checked_out / capacity if capacity else 0)]
+        ),
+    ]
+
+
+def _cache_metrics(request: Request) -> list:
+    lines = []
+    cache = request.app.state.answer_cache
+    if cache is not None:
+        stats = cache.stats.as_dict()
+        lines += render_family(
+            "answer_cache_lookups_total",
+            "counter",
+            "Answer cache lookups by result.",
+            [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])],
+        )
+        lines += render_family(
+            "answer_cache_removals_total",
+            "counter",
+            "Answer cache entries removed, by reason.",
+            [({"reason": reason}, stats[reason]) for reason in ("stale", "expired", "evicted")],
+        )
+        lines += render_family("answer_cache_hit_ratio", "gauge", "Answer cache hit rate.", [({}, stats["hit_rate"])])
+        lines += render_family("answer_cache_entries", "gauge", "Cached answers.", [({}, len(cache))])
+
+    embedding = request.app.state.embedding_service.stats
+    lines += render_family(
+        "embedding_texts_total",
+        "counter",
+        "Texts requested from the embedding service, by how they were served.",
+        [
+            ({"source": "cache"}, embedding.cache_hits),
+            ({"source": "coalesced"}, embedding.coalesced),
+            ({"source": "model"}, embedding.texts_embedded),
+        ],
+    )
+    lines += render_family("embedding_model_calls_total", "counter", "Batched embedding model calls.", [({}, embedding.model_calls)])
+
+    reranker = request.app.state.reranker
+    if reranker is not None:
+        lines += render_family(
+            "rerank_requests_total",
+            "counter",
+            "Rerank requests, by whether the cross-encoder order or the first-stage fallback was used.",
+            [({"result": result}, count) for result, count in reranker.stats.as_dict().items()],
+        )
+    return lines
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(request: Request) -> PlainTextResponse:
+    """Metrics of this worker in the Prometheus text exposition format."""
+    lines = metrics.render() + _pool_metrics(request) + _cache_metrics(request)
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
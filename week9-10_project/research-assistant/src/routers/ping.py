@@ -3,5 +3,5 @@ from ..config import get_settings
 router = APIRouter()
 
 @router.get("/ping")
-def ping():
+async def ping():
     return {"ping": "pong"}
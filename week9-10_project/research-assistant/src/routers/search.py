@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException
+
+from ..dependencies import SearcherDep
+from ..exceptions import SearchException
+from ..schemas.search import SearchRequest, SearchResponse
+
+router = APIRouter(tags=["search"])
+
+
+@router.post("/search", response_model=SearchResponse)
+async def search(body: SearchRequest, searcher: SearcherDep) -> SearchResponse:
+    """Hybrid (BM25 + k-NN) search over the paper chunks, one page at a time."""
+    mode = body.mode or searcher.default_mode
+    try:
+        results = await searcher.search(body.query, top_k=body.top_k, offset=body.offset, filters=body.filters, mode=mode)
+    except SearchException as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return SearchResponse(query=body.query, mode=mode, offset=body.offset, results=results)
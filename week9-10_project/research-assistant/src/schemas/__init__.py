@@ -0,0 +1 @@
+"""Request and response models of the research assistant API"""
@@ -0,0 +1,23 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from .search import SearchFilters, SourceChunk
+
+
+class AskRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=2000, description="Research question")
+    top_k: int = Field(default=5, ge=1, le=20, description="Number of chunks to retrieve")
+    model: Optional[str] = Field(
+        default=None,
+        description="Ollama model; by default the scheduler picks the small or large model by question complexity",
+    )
+    filters: Optional[SearchFilters] = None
+
+
+class AskResponse(BaseModel):
+    query: str
+    answer: str
+    model: str
+    sources: List[SourceChunk]
+    cached: bool = Field(default=False, description="Served from the semantic answer cache")
@@ -0,0 +1,41 @@
+from datetime import date
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+SearchMode = Literal["hybrid", "bm25", "vector"]
+
+
+class SearchFilters(BaseModel):
+    categories: List[str] = Field(default_factory=list, description="Only chunks of papers in any of these arXiv categories")
+    arxiv_ids: List[str] = Field(default_factory=list, description="Only chunks of these papers")
+    published_from: Optional[date] = None
+    published_to: Optional[date] = None
+
+
+class SearchRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=2000)
+    top_k: int = Field(default=10, ge=1, le=100, description="Results per page")
+    offset: int = Field(default=0, ge=0, le=1000, description="Results to skip, for pagination")
+    mode: Optional[SearchMode] = Field(default=None, description="Defaults to search_mode")
+    filters: Optional[SearchFilters] = None
+
+
+class SourceChunk(BaseModel):
+    chunk_id: str
+    arxiv_id: Optional[str] = None
+    title: Optional[str] = None
+    text: str
+    score: float
+    section: Optional[str] = None
+    # Character offsets of text in the paper's source_field (body, abstract or title)
+    source_field: Optional[str] = None
+    char_start: Optional[int] = None
+    char_end: Optional[int] = None
+
+
+class SearchResponse(BaseModel):
+    query: str
+    mode: SearchMode
+    offset: int
+    results: List[SourceChunk]
@@ -0,0 +1 @@
+"""External service clients used by the research assistant"""
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from buildables_common.tracing import tracer
+
+from ..exceptions import OllamaException
+from ..schemas.search import SearchFilters, SourceChunk
+from .search import Embedder
+
+logger = logging.getLogger(__name__)
+
+
+def answer_scope(model: str, top_k: int, filters: Optional[SearchFilters]) -> str:
+    """Everything besides the question that shapes an answer; only equal scopes share answers."""
+    return json.dumps([model, top_k, filters.model_dump(mode="json") if filters else None], sort_keys=True)
+
+
+def chunk_fingerprint(chunks: Sequence[SourceChunk]) -> str:
+    """Identifies the retrieved chunk set, including chunk content, independent of ranking order."""
+    digest = hashlib.sha256()
+    for chunk_id, text in sorted((c.chunk_id, c.text) for c in chunks):
+        digest.update(chunk_id.encode("utf-8") + b"\x00" + text.encode("utf-8") + b"\x00")
+    return digest.hexdigest()
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    answer: str
+    model: str
+    sources: List[SourceChunk]
+    scope: str
+    fingerprint: str
+    created: float
+
+
+@dataclass
+class AnswerCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0     # a similar question was cached, but retrieval now returns other chunks
+    expired: int = 0
+    evicted: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SemanticAnswerCache:
+    """
+    Per-worker cache of generated answers, looked up by question similarity.
+
+    Question embeddings live in a preallocated, row-normalised NumPy matrix; a lookup is
+    one matrix-vector product, which for a cache of a few thousand entries takes well
+    under a millisecond. An answer is only served when its scope matches and retrieval
+    for the new question returns the same chunk set the answer was generated from, so
+    re-indexed papers never get stale answers. Entries expire after `ttl` seconds and the
+    least recently used entry is evicted when the cache is full.
+    """
+
+    def __init__(self, embed: Embedder, capacity: int = 1000, ttl: float = 86400.0, threshold: float = 0.95):
+        self.embed = embed
+        self.capacity = capacity
+        self.ttl = ttl
+        self.threshold = threshold
+        self.stats = AnswerCacheStats()
+
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._free = list(range(capacity - 1, -1, -1))
+        self._matrix: Optional[np.ndarray] = None
+        self._occupied = np.zeros(capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @tracer.traced("embed_question")
+    async def embed_question(self, question: str) -> Optional[np.ndarray]:
+        """Normalised question embedding, or None when the embedding model is unavailable."""
+        try:
+            vectors = await self.embed([question])
+        except OllamaException as e:
+            logger.warning("Answer cache bypassed, question embedding failed: %s", e)
+            return None
+        vector = np.asarray(vectors[0], dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _remove(self, slot: int) -> None:
+        del self._entries[slot]
+        self._occupied[slot] = False
+        self._free.append(slot)
+
+    def get(self, vector: np.ndarray, scope: str, fingerprint: str) -> Optional[CachedAnswer]:
+        """Most similar cached answer above the threshold with the same scope and chunk set."""
+        if self._matrix is None or not self._entries:
+            self.stats.misses += 1
+            return None
+
+        similarities = np.where(self._occupied, self._matrix @ vector, -np.inf)
+        candidates = np.flatnonzero(similarities >= self.threshold)
+        now = time.monotonic()
+        for slot in (int(i) for i in candidates[np.argsort(-similarities[candidates])]):
+            entry = self._entries[slot]
+            if now - entry.created > self.ttl:
+                self._remove(slot)
+                self.stats.expired += 1
+            elif entry.scope != scope:
+                continue
+            elif entry.fingerprint != fingerprint:
+                # Answered from chunks that are no longer what retrieval returns
+                self._remove(slot)
+                self.stats.stale += 1
+            else:
+                self._entries.move_to_end(slot)
+                self.stats.hits += 1
+                return entry
+
+        self.stats.misses += 1
+        return None
+
+    def put(self, vector: np.ndarray, entry: CachedAnswer) -> None:
+        if self._matrix is None:
+            self._matrix = np.zeros((self.capacity, len(vector)), dtype=np.float32)
+        if not self._free:
+            self._remove(next(iter(self._entries)))
+            self.stats.evicted += 1
+        slot = self._free.pop()
+        self._matrix[slot] = vector
+        self._occupied[slot] = True
+        self._entries[slot] = entry
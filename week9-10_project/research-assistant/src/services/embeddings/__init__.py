@@ -0,0 +1,4 @@
+from .cache import EmbeddingCache
+from .service import BlockingEmbedder, EmbeddingService, EmbeddingStats, create_embedding_service
+
+__all__ = ["BlockingEmbedder", "EmbeddingCache", "EmbeddingService", "EmbeddingStats", "create_embedding_service"]
@@ -0,0 +1,119 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+KEY_SIZE = 32  # sha256 digest
+
+
+class EmbeddingCache:
+    """
+    Append-only on-disk cache of embeddings keyed by (model, sha256(text)).
+
+    Each model has its own directory holding two parallel files: keys.bin with one
+    32-byte digest per row and vectors.f16 with one float16 vector per row, read
+    through a memory map. Appends take an exclusive file lock, so ingestion jobs and
+    API workers can share a cache; rows written by other processes are picked up on
+    the next miss.
+    """
+
+    def __init__(self, directory: str, model: str):
+        self.model = model
+        self.directory = os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]", "_", model))
+        os.makedirs(self.directory, exist_ok=True)
+        self._keys_path = os.path.join(self.directory, "keys.bin")
+        self._vectors_path = os.path.join(self.directory, "vectors.f16")
+        self._meta_path = os.path.join(self.directory, "meta.json")
+        self._lock_path = os.path.join(self.directory, ".lock")
+
+        self.dimension: Optional[int] = None
+        self._rows: Dict[bytes, int] = {}
+        self._keys_read = 0
+        self._vectors: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._refresh()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _refresh(self) -> None:
+        """Index rows appended since the last read, by this or another process."""
+        size = os.path.getsize(self._keys_path) if os.path.exists(self._keys_path) else 0
+        if size <= self._keys_read:
+            return
+        if self.dimension is None:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self.dimension = json.load(f)["dimension"]
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_read)
+            data = f.read((size - self._keys_read) // KEY_SIZE * KEY_SIZE)
+        first_row = self._keys_read // KEY_SIZE
+        for i in range(len(data) // KEY_SIZE):
+            self._rows.setdefault(data[i * KEY_SIZE:(i + 1) * KEY_SIZE], first_row + i)
+        self._keys_read += len(data)
+        self._vectors = None
+
+    def _matrix(self) -> np.memmap:
+        if self._vectors is None:
+            rows = self._keys_read // KEY_SIZE
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float16, mode="r", shape=(rows, self.dimension))
+        return self._vectors
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors as float32 arrays, None for texts that are not cached."""
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            if any(key not in self._rows for key in keys):
+                self._refresh()
+            if not self._rows:
+                return [None] * len(keys)
+            matrix = self._matrix()
+            return [np.asarray(matrix[self._rows[key]], dtype=np.float32) if key in self._rows else None for key in keys]
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        # The file lock is taken first: waiting on another process must not hold the
+        # thread lock, or readers in this process would wait on that process too
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with self._lock:
+                    self._append(texts, vectors)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _append(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Writes the uncached vectors; called with both the file lock and the thread lock held."""
+        self._refresh()
+        new: Dict[bytes, Sequence[float]] = {}
+        for text, vector in zip(texts, vectors):
+            key = self.key(text)
+            if key not in self._rows:
+                new.setdefault(key, vector)
+        if not new:
+            return
+
+        array = np.asarray(list(new.values()), dtype=np.float16)
+        if self.dimension is None:
+            self.dimension = int(array.shape[1])
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model, "dimension": self.dimension, "dtype": "float16"}, f)
+        elif array.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-dimensional vectors, got {array.shape[1]}")
+
+        # Vectors go first, so every key on disk has its vector. Truncating drops
+        # vectors left behind by a writer that died before appending its keys.
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(self._keys_read // KEY_SIZE * self.dimension * 2)
+            f.write(array.tobytes())
+        with open(self._keys_path, "ab") as f:
+            f.write(b"".join(new))
+        self._refresh()
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Set
+
+from ...config import Settings
+from ..ollama import OllamaClient
+from ..search import Embedder
+from .cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EmbeddingStats:
+    requested: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0
+    model_calls: int = 0
+    texts_embedded: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class EmbeddingService:
+    """
+    Embeds texts through a shared micro-batcher.
+
+    Cached texts are answered from the EmbeddingCache. The remaining ones wait in a
+    queue for up to max_wait seconds, or until max_batch_size texts are queued, and are
+    then embedded with one model call, so concurrent requests share calls instead of
+    issuing one each. A text that is already queued or being embedded is not queued
+    again; its callers wait on the same future.
+    """
+
+    def __init__(
+        self,
+        embed: Embedder,
+        cache: Optional[EmbeddingCache] = None,
+        max_batch_size: int = 64,
+        max_wait: float = 0.005,
+        max_concurrent_batches: int = 2,
+    ):
+        self._embed = embed
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = EmbeddingStats()
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_slots = asyncio.Semaphore(max_concurrent_batches)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in order. Has the Embedder signature, so it can back the searcher."""
+        loop = asyncio.get_running_loop()
+        self.stats.requested += len(texts)
+        # The cache reads files on a miss, so it is read off the event loop
+        cached = await asyncio.to_thread(self.cache.get_many, texts) if self.cache is not None else [None] * len(texts)
+
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        waiting: Dict[int, asyncio.Future] = {}
+        for i, (text, vector) in enumerate(zip(texts, cached)):
+            if vector is not None:
+                results[i] = vector.tolist()
+                self.stats.cache_hits += 1
+                continue
+            future = self._inflight.get(text)
+            if future is None:
+                future = self._inflight[text] = loop.create_future()
+                self._queue.append(text)
+            else:
+                self.stats.coalesced += 1
+            waiting[i] = future
+
+        if self._queue:
+            self._schedule(loop)
+        for i, future in waiting.items():
+            # Shielded: a cancelled caller must not cancel the batch other callers wait on
+            results[i] = await asyncio.shield(future)
+        return results
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop) -> None:
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._queue:
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[str]) -> None:
+        try:
+            async with self._batch_slots:
+                vectors = await self._embed(batch)
+                if len(vectors) != len(batch):
+                    raise ValueError(f"Embedding model returned {len(vectors)} vectors for {len(batch)} texts")
+                self.stats.model_calls += 1
+                self.stats.texts_embedded += len(batch)
+            if self.cache is not None:
+                await asyncio.to_thread(self.cache.put_many, batch, vectors)
+        except Exception as e:
+            for text in batch:
+                future = self._inflight.pop(text)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, vector in zip(batch, vectors):
+            future = self._inflight.pop(text)
+            if not future.done():
+                future.set_result(vector)
+
+
+def create_embedding_service(settings: Settings, ollama: OllamaClient) -> EmbeddingService:
+    return EmbeddingService(
+        ollama.embed,
+        cache=EmbeddingCache(settings.embedding_cache_dir, settings.ollama_embedding_model),
+        max_batch_size=settings.embedding_batch_size,
+        max_wait=settings.embedding_batch_wait_ms / 1000,
+    )
+
+
+class BlockingEmbedder:
+    """Runs an EmbeddingService on a private event loop, for synchronous jobs such as ingestion."""
+
+    def __init__(self, settings: Settings):
+        self._loop = asyncio.new_event_loop()
+        self._ollama = OllamaClient(settings)
+        self.service = create_embedding_service(settings, self._ollama)
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        return self._loop.run_until_complete(self.service.embed(texts))
+
+    def close(self) -> None:
+        logger.info("Embedding stats: %s", self.service.stats.as_dict())
+        self._loop.run_until_complete(self._ollama.close())
+        self._loop.close()
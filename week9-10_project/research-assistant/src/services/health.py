@@ -0,0 +1,81 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from opensearchpy import AsyncOpenSearch
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .ollama import OllamaClient
+
+Check = Callable[[], Awaitable[None]]
+
+
+class HealthChecker:
+    """
+    Checks the backing services concurrently, each with a short timeout.
+    Results are cached for `ttl` seconds and concurrent probes share one run, so
+    frequent health and readiness probes cost at most one round of checks per ttl.
+    """
+
+    def __init__(self, checks: Dict[str, Check], timeout: float = 2.0, ttl: float = 5.0):
+        self.checks = checks
+        self.timeout = timeout
+        self.ttl = ttl
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._running: Optional[asyncio.Future] = None
+
+    async def _check(self, check: Check) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+        except asyncio.TimeoutError:
+            result = {"status": "error", "detail": f"timed out after {self.timeout:g}s"}
+        except Exception as e:
+            result = {"status": "error", "detail": str(e)[:200] or type(e).__name__}
+        else:
+            result = {"status": "ok"}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    async def _run(self) -> Dict[str, Any]:
+        results = await asyncio.gather(*(self._check(check) for check in self.checks.values()))
+        services = dict(zip(self.checks, results))
+        healthy = all(service["status"] == "ok" for service in services.values())
+        self._result = {
+            "status": "ok" if healthy else "degraded",
+            "services": services,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._checked_at = time.monotonic()
+        return self._result
+
+    async def check(self) -> Dict[str, Any]:
+        if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._result
+        if self._running is None or self._running.done():
+            self._running = asyncio.ensure_future(self._run())
+        return await asyncio.shield(self._running)
+
+
+def postgres_check(engine: AsyncEngine) -> Check:
+    async def check() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    return check
+
+
+def opensearch_check(client: AsyncOpenSearch) -> Check:
+    async def check() -> None:
+        health = await client.cluster.health()
+        if health.get("status") == "red":
+            raise RuntimeError("cluster status is red")
+    return check
+
+
+def ollama_check(ollama: OllamaClient) -> Check:
+    async def check() -> None:
+        await ollama.list_models()
+    return check
@@ -0,0 +1,4 @@
+from .client import OllamaClient
+from .scheduler import BATCH, INTERACTIVE, ModelScheduler, is_simple_query
+
+__all__ = ["BATCH", "INTERACTIVE", "ModelScheduler", "OllamaClient", "is_simple_query"]
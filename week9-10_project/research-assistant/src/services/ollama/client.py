@@ -0,0 +1,98 @@
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from ...config import Settings
+from ...exceptions import OllamaException, OllamaTimeoutError
+from ...metrics import metrics
+
+
+class OllamaClient:
+    """Async client for the Ollama HTTP API, sharing one keep-alive connection pool."""
+
+    def __init__(self, settings: Settings):
+        self.default_model = settings.ollama_default_model
+        self.embedding_model = settings.ollama_embedding_model
+        self._http = httpx.AsyncClient(
+            base_url=settings.ollama_host,
+            timeout=httpx.Timeout(settings.ollama_timeout, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.ollama_max_connections,
+                max_keepalive_connections=settings.ollama_max_connections,
+            ),
+        )
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            response = await self._http.post(path, json=payload)
+            response.raise_for_status()
+            return response.json()
+        except httpx.TimeoutException as e:
+            raise OllamaTimeoutError(f"Ollama {path} timed out") from e
+        except httpx.HTTPError as e:
+            raise OllamaException(f"Ollama {path} failed: {e}") from e
+        finally:
+            metrics.observe("ollama_request_duration_seconds", time.perf_counter() - started, endpoint=path)
+
+    def _generate_payload(self, prompt: str, model: Optional[str], stream: bool, keep_alive: Optional[str], options: Dict) -> Dict:
+        payload = {"model": model or self.default_model, "prompt": prompt, "stream": stream, "options": options}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        return payload
+
+    async def generate(
+        self, prompt: str, model: Optional[str] = None, keep_alive: Optional[str] = None, **options: Any
+    ) -> Dict[str, Any]:
+        """Generate a completion. Cancelling the awaiting task closes the request, which stops generation."""
+        return await self._post("/api/generate", self._generate_payload(prompt, model, False, keep_alive, options))
+
+    async def generate_stream(
+        self, prompt: str, model: Optional[str] = None, keep_alive: Optional[str] = None, **options: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the NDJSON chunks of a streamed completion as they arrive.
+        Closing the generator closes the request, which stops generation in Ollama.
+        """
+        payload = self._generate_payload(prompt, model, True, keep_alive, options)
+        started = time.perf_counter()
+        try:
+            async with self._http.stream("POST", "/api/generate", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise OllamaException(f"Ollama /api/generate failed: {chunk['error']}")
+                    yield chunk
+                    if chunk.get("done"):
+                        break
+        except httpx.TimeoutException as e:
+            raise OllamaTimeoutError("Ollama /api/generate timed out") from e
+        except httpx.HTTPError as e:
+            raise OllamaException(f"Ollama /api/generate failed: {e}") from e
+        finally:
+            metrics.observe("ollama_request_duration_seconds", time.perf_counter() - started, endpoint="/api/generate/stream")
+
+    async def load(self, model: str, keep_alive: str) -> None:
+        """Load a model into memory without generating, and keep it there for keep_alive."""
+        await self._post("/api/generate", {"model": model, "keep_alive": keep_alive})
+
+    async def embed(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """Embed a batch of texts with one /api/embed call."""
+        result = await self._post("/api/embed", {"model": model or self.embedding_model, "input": texts})
+        return result.get("embeddings", [])
+
+    async def list_models(self) -> List[str]:
+        try:
+            response = await self._http.get("/api/tags")
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise OllamaException(f"Ollama /api/tags failed: {e}") from e
+        return [model["name"] for model in response.json().get("models", [])]
+
+    async def close(self) -> None:
+        await self._http.aclose()
@@ -0,0 +1,188 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from buildables_common.tracing import Span, tracer
+
+from ...config import Settings
+from ...exceptions import OllamaException, OllamaTimeoutError
+from ...metrics import metrics
+from .client import OllamaClient
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0  # user-facing requests
+BATCH = 10       # background work, served when no interactive request is waiting
+
+_COMPLEX_QUERY = re.compile(
+    r"\b(compare|contrast|differen\w*|trade-?offs?|why|explain|derive|prove|analy[sz]e|evaluate|critique|step by step)\b",
+    re.IGNORECASE,
+)
+
+
+def is_simple_query(query: str, max_words: int = 12) -> bool:
+    """Short lookup-style questions that a small model answers as well as a large one."""
+    return len(query.split()) <= max_words and not _COMPLEX_QUERY.search(query)
+
+
+@dataclass
+class _ModelQueue:
+    limit: int
+    active: int = 0
+    waiting: int = 0
+    heap: List = field(default_factory=list)
+
+
+class ModelScheduler:
+    """
+    Front door to Ollama generation.
+
+    Each model has a concurrency limit; requests beyond it wait in a queue ordered by
+    priority, then deadline. A freed slot is handed straight to the next waiter, and a
+    request still queued at its deadline fails with OllamaTimeoutError instead of piling
+    up behind a slow model. Every request passes keep_alive so hot models stay resident,
+    and the configured models are preloaded at startup so the first user does not pay
+    for a cold load. Without an explicit model, simple questions go to the small model.
+    """
+
+    def __init__(self, ollama: OllamaClient, settings: Settings):
+        self.ollama = ollama
+        self.keep_alive = settings.ollama_keep_alive
+        self.queue_timeout = settings.ollama_queue_timeout
+        self.default_model = settings.ollama_default_model
+        self.routing_enabled = settings.ollama_routing_enabled
+        self.small_model = settings.ollama_small_model
+        self.large_model = settings.ollama_large_model
+        self._limits = settings.ollama_model_concurrency
+        self._default_limit = settings.ollama_default_concurrency
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._sequence = itertools.count()
+
+    def choose_model(self, query: str, requested: Optional[str] = None) -> str:
+        if requested:
+            return requested
+        if not self.routing_enabled:
+            return self.default_model
+        return self.small_model if is_simple_query(query) else self.large_model
+
+    def _queue(self, model: str) -> _ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            queue = self._queues[model] = _ModelQueue(limit=self._limits.get(model, self._default_limit))
+        return queue
+
+    def _report(self, model: str, queue: _ModelQueue) -> None:
+        metrics.set_gauge("ollama_queue_depth", queue.waiting, model=model)
+        metrics.set_gauge("ollama_active_requests", queue.active, model=model)
+
+    def _release(self, model: str) -> None:
+        queue = self._queues[model]
+        while queue.heap:
+            *_, waiter = heapq.heappop(queue.heap)
+            if not waiter.done():
+                waiter.set_result(None)  # the slot passes to the waiter, active stays the same
+                return
+        queue.active -= 1
+        self._report(model, queue)
+
+    @asynccontextmanager
+    async def slot(self, model: str, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one of the model's concurrency slots, waiting at most `timeout` seconds for it."""
+        queue = self._queue(model)
+        started = time.monotonic()
+        if queue.active < queue.limit and not queue.waiting:
+            queue.active += 1
+        else:
+            timeout = self.queue_timeout if timeout is None else timeout
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(queue.heap, (priority, started + timeout, next(self._sequence), waiter))
+            queue.waiting += 1
+            self._report(model, queue)
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if waiter.done() and not waiter.cancelled():
+                    self._release(model)  # granted just as we gave up; pass it on
+                else:
+                    waiter.cancel()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise OllamaTimeoutError(f"No {model} slot became free within {timeout:g}s") from e
+                raise
+            finally:
+                queue.waiting -= 1
+                self._report(model, queue)
+        metrics.observe("ollama_queue_wait_seconds", time.monotonic() - started, model=model)
+        self._report(model, queue)
+        try:
+            yield
+        finally:
+            self._release(model)
+
+    @staticmethod
+    def _record_usage(span: Span, result: Dict[str, Any]) -> None:
+        # Ollama reports token counts on the final chunk; a cached prompt has no prompt_eval_count
+        span.set("gen_ai.usage.input_tokens", result.get("prompt_eval_count", 0))
+        span.set("gen_ai.usage.output_tokens", result.get("eval_count", 0))
+
+    async def generate(self, prompt: str, model: str, priority: int = INTERACTIVE, **options: Any) -> Dict[str, Any]:
+        with tracer.span("ollama.generate", {"gen_ai.system": "ollama", "gen_ai.request.model": model}) as span:
+            started = time.monotonic()
+            async with self.slot(model, priority):
+                span.set("queue_wait_ms", round((time.monotonic() - started) * 1000, 1))
+                result = await self.ollama.generate(prompt, model=model, keep_alive=self.keep_alive, **options)
+            self._record_usage(span, result)
+            return result
+
+    async def generate_stream(
+        self, prompt: str, model: str, priority: int = INTERACTIVE, **options: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a completion; the slot is held until the stream ends or is closed."""
+        # Not made current: a context variable set here would leak into the consumer between yields
+        span = tracer.start_span("ollama.generate_stream", {"gen_ai.system": "ollama", "gen_ai.request.model": model})
+        started = time.monotonic()
+        first_token = True
+        try:
+            async with self.slot(model, priority):
+                span.set("queue_wait_ms", round((time.monotonic() - started) * 1000, 1))
+                tokens = self.ollama.generate_stream(prompt, model=model, keep_alive=self.keep_alive, **options)
+                try:
+                    async for chunk in tokens:
+                        if first_token and chunk.get("response"):
+                            span.set("first_token_ms", round((time.monotonic() - started) * 1000, 1))
+                            first_token = False
+                        if chunk.get("done"):
+                            self._record_usage(span, chunk)
+                        yield chunk
+                finally:
+                    await tokens.aclose()
+        except (asyncio.CancelledError, GeneratorExit):
+            span.set("cancelled", True)
+            raise
+        except Exception as e:
+            span.record_error(e)
+            raise
+        finally:
+            tracer.end_span(span)
+
+    async def preload(self, models: List[str]) -> None:
+        """Load models one after another, so a 20B model does not cold-load inside a user request."""
+        for model in models:
+            started = time.monotonic()
+            try:
+                await self.ollama.load(model, self.keep_alive)
+            except OllamaException as e:
+                logger.warning("Could not preload %s: %s", model, e)
+                continue
+            logger.info("Preloaded %s in %.1fs", model, time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            model: {"limit": queue.limit, "active": queue.active, "waiting": queue.waiting}
+            for model, queue in sorted(self._queues.items())
+        }
@@ -0,0 +1,12 @@
+from .client import create_async_opensearch_client, create_opensearch_client
+from .index_config import chunk_index_body
+from .indexer import ChunkIndex, OpenSearchChunkIndex, physical_index_name
+
+__all__ = [
+    "ChunkIndex",
+    "OpenSearchChunkIndex",
+    "chunk_index_body",
+    "create_async_opensearch_client",
+    "create_opensearch_client",
+    "physical_index_name",
+]
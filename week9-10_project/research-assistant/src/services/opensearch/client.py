@@ -0,0 +1,23 @@
+from opensearchpy import AsyncOpenSearch, OpenSearch
+
+from ...config import Settings
+
+
+def _client_options(settings: Settings) -> dict:
+    return {
+        "hosts": [settings.opensearch_host],
+        "use_ssl": settings.opensearch_host.startswith("https"),
+        "verify_certs": False,
+        "pool_maxsize": settings.opensearch_pool_maxsize,
+        "timeout": settings.opensearch_timeout,
+    }
+
+
+def create_opensearch_client(settings: Settings) -> OpenSearch:
+    """Create a synchronous OpenSearch client for batch jobs such as ingestion."""
+    return OpenSearch(**_client_options(settings))
+
+
+def create_async_opensearch_client(settings: Settings) -> AsyncOpenSearch:
+    """Create the async OpenSearch client; its connection pool is reused across requests."""
+    return AsyncOpenSearch(**_client_options(settings))
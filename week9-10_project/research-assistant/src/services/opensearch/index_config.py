@@ -0,0 +1,49 @@
+from typing import Dict
+
+
+def chunk_index_body(embedding_dimension: int = 768) -> Dict:
+    """
+    Settings and mapping of the paper chunk index: BM25 text fields plus an HNSW
+    k-NN vector field. Chunks are addressed as "<arxiv_id>:<chunk_index>", so
+    re-indexing a paper overwrites its chunks instead of duplicating them.
+    """
+    return {
+        "settings": {
+            "index": {
+                "number_of_shards": 1,
+                "number_of_replicas": 0,
+                "knn": True,
+            },
+        },
+        "mappings": {
+            "dynamic": "strict",
+            "properties": {
+                "arxiv_id": {"type": "keyword"},
+                "chunk_index": {"type": "integer"},
+                "title": {"type": "text"},
+                "abstract": {"type": "text"},
+                "chunk_text": {"type": "text"},
+                "section": {"type": "text"},
+                # chunk_text is source_field[char_start:char_end] of the paper, for citations
+                "source_field": {"type": "keyword", "index": False},
+                "char_start": {"type": "integer", "index": False},
+                "char_end": {"type": "integer", "index": False},
+                "authors": {"type": "keyword"},
+                "categories": {"type": "keyword"},
+                "published_date": {"type": "date"},
+                "content_hash": {"type": "keyword"},
+                "embedding": {
+                    "type": "knn_vector",
+                    "dimension": embedding_dimension,
+                    "method": {
+                        # The lucene engine applies filters during the graph search, so
+                        # filtered k-NN queries still return k hits
+                        "name": "hnsw",
+                        "engine": "lucene",
+                        "space_type": "cosinesimil",
+                        "parameters": {"m": 16, "ef_construction": 128},
+                    },
+                },
+            },
+        },
+    }
@@ -0,0 +1,180 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Protocol, Sequence
+
+from opensearchpy import OpenSearch, helpers
+
+from .index_config import chunk_index_body
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkIndex(Protocol):
+    """Write side of the chunk index, implemented by OpenSearch and the in-memory stand-in."""
+
+    def ensure_index(self) -> None: ...
+
+    def delete_papers(self, arxiv_ids: Sequence[str]) -> None: ...
+
+    def delete_stale_chunks(self, chunk_counts: Dict[str, int]) -> int: ...
+
+    def bulk_index(self, docs: Iterable[Dict]) -> int: ...
+
+    def paper_ids(self) -> Iterator[str]: ...
+
+
+def physical_index_name(alias: str) -> str:
+    """Timestamped name of a concrete index behind the alias, e.g. arxiv-paper-chunks-20250101120000."""
+    return f"{alias}-{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+
+
+class OpenSearchChunkIndex:
+    """
+    Indexes chunk documents through the _bulk API.
+    streaming_bulk sends one request at a time and waits for its response, so a slow
+    cluster throttles the producer; 429 rejections are retried with exponential backoff.
+
+    index_name is normally an alias over a timestamped physical index, so a full
+    rebuild can fill a new index and swap the alias atomically (blue/green).
+    """
+
+    def __init__(
+        self,
+        client: OpenSearch,
+        index_name: str,
+        chunk_size: int = 500,
+        max_chunk_bytes: int = 10 * 1024 * 1024,
+        max_retries: int = 5,
+        embedding_dimension: int = 768,
+    ):
+        self.client = client
+        self.index_name = index_name
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_retries = max_retries
+        self.embedding_dimension = embedding_dimension
+
+    def for_index(self, name: str) -> "OpenSearchChunkIndex":
+        """Same client and bulk settings, writing to another index."""
+        return OpenSearchChunkIndex(
+            self.client,
+            name,
+            chunk_size=self.chunk_size,
+            max_chunk_bytes=self.max_chunk_bytes,
+            max_retries=self.max_retries,
+            embedding_dimension=self.embedding_dimension,
+        )
+
+    def ensure_index(self) -> None:
+        """Create a physical index with index_name as its alias, unless the alias (or a legacy index) exists."""
+        if not self.client.indices.exists(index=self.index_name):
+            self.create_index(physical_index_name(self.index_name), alias=self.index_name)
+
+    def create_index(self, name: str, alias: Optional[str] = None) -> None:
+        body = chunk_index_body(self.embedding_dimension)
+        if alias:
+            body = {**body, "aliases": {alias: {}}}
+        self.client.indices.create(index=name, body=body)
+        logger.info("Created index %s%s", name, f" behind alias {alias}" if alias else "")
+
+    def set_refresh_interval(self, interval: Optional[str]) -> None:
+        """Refreshing is switched off ("-1") while a rebuild bulk-loads a new index; None restores the default."""
+        self.client.indices.put_settings(index=self.index_name, body={"index": {"refresh_interval": interval}})
+
+    def alias_targets(self, alias: str) -> List[str]:
+        """Physical indices behind the alias; empty if the alias is missing."""
+        if not self.client.indices.exists_alias(name=alias):
+            return []
+        return sorted(self.client.indices.get_alias(name=alias))
+
+    def swap_alias(self, alias: str, delete_old: bool = True) -> List[str]:
+        """
+        Point the alias at this index in one atomic _aliases call and return the indices
+        it was moved away from. A legacy concrete index named like the alias is removed
+        in the same call, so searches never see a missing index.
+        """
+        old = self.alias_targets(alias)
+        actions: List[Dict] = [{"remove": {"index": name, "alias": alias}} for name in old]
+        if not old and self.client.indices.exists(index=alias):
+            actions.append({"remove_index": {"index": alias}})
+        actions.append({"add": {"index": self.index_name, "alias": alias}})
+        self.client.indices.update_aliases(body={"actions": actions})
+        logger.info("Alias %s now points at %s", alias, self.index_name)
+
+        if delete_old:
+            for name in old:
+                if name != self.index_name:
+                    self.client.indices.delete(index=name)
+                    logger.info("Deleted index %s", name)
+        return old
+
+    def delete_papers(self, arxiv_ids: Sequence[str]) -> None:
+        """Remove every chunk of the given papers, e.g. papers deleted from Postgres."""
+        if not arxiv_ids:
+            return
+        self.client.delete_by_query(
+            index=self.index_name,
+            body={"query": {"terms": {"arxiv_id": list(arxiv_ids)}}},
+            params={"conflicts": "proceed", "refresh": "true"},
+        )
+
+    def delete_stale_chunks(self, chunk_counts: Dict[str, int], batch_size: int = 500) -> int:
+        """
+        Delete the chunks a re-chunked paper no longer has, i.e. chunk_index >= its new
+        chunk count. Called after the new chunks are indexed, so a paper being updated
+        is never missing from search. Papers go in batches to stay under max_clause_count.
+        """
+        deleted = 0
+        items = list(chunk_counts.items())
+        for start in range(0, len(items), batch_size):
+            should = [
+                {"bool": {"filter": [{"term": {"arxiv_id": arxiv_id}}, {"range": {"chunk_index": {"gte": count}}}]}}
+                for arxiv_id, count in items[start:start + batch_size]
+            ]
+            result = self.client.delete_by_query(
+                index=self.index_name,
+                body={"query": {"bool": {"should": should, "minimum_should_match": 1}}},
+                params={"conflicts": "proceed", "refresh": "true"},
+            )
+            deleted += result.get("deleted", 0)
+        return deleted
+
+    def paper_ids(self, page_size: int = 1000) -> Iterator[str]:
+        """Page through the distinct arxiv_ids in the index with a composite aggregation."""
+        after = None
+        while True:
+            composite: Dict = {"size": page_size, "sources": [{"arxiv_id": {"terms": {"field": "arxiv_id"}}}]}
+            if after:
+                composite["after"] = after
+            response = self.client.search(
+                index=self.index_name, body={"size": 0, "aggs": {"papers": {"composite": composite}}}
+            )
+            result = response["aggregations"]["papers"]
+            for bucket in result["buckets"]:
+                yield bucket["key"]["arxiv_id"]
+            after = result.get("after_key")
+            if not result["buckets"] or not after:
+                return
+
+    def _actions(self, docs: Iterable[Dict]) -> Iterable[Dict]:
+        for doc in docs:
+            source = dict(doc)
+            yield {"_index": self.index_name, "_id": source.pop("chunk_id"), "_source": source}
+
+    def bulk_index(self, docs: Iterable[Dict]) -> int:
+        """Index the documents and return how many succeeded; failures are logged, not raised."""
+        indexed = 0
+        for ok, item in helpers.streaming_bulk(
+            self.client,
+            self._actions(docs),
+            chunk_size=self.chunk_size,
+            max_chunk_bytes=self.max_chunk_bytes,
+            max_retries=self.max_retries,
+            initial_backoff=1,
+            raise_on_error=False,
+        ):
+            if ok:
+                indexed += 1
+            else:
+                logger.warning("Failed to index chunk: %s", item)
+        return indexed
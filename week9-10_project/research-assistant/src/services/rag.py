@@ -0,0 +1,131 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+from buildables_common.tracing import current_span, tracer
+
+from ..schemas.ask import AskResponse
+from ..schemas.search import SearchFilters, SourceChunk
+from .answer_cache import CachedAnswer, SemanticAnswerCache, answer_scope, chunk_fingerprint
+from .ollama import ModelScheduler
+from .search import CrossEncoderReranker, HybridSearcher
+
+PROMPT_TEMPLATE = """You are a research assistant. Answer the question using only the excerpts from arXiv papers below.
+Cite sources as [arxiv_id]. If the excerpts do not contain the answer, say so.
+
+Excerpts:
+{context}
+
+Question: {query}
+Answer:"""
+
+
+def build_prompt(query: str, chunks: List[SourceChunk]) -> str:
+    context = "\n\n".join(f"[{c.arxiv_id or c.chunk_id}] {c.title or ''}\n{c.text}" for c in chunks)
+    return PROMPT_TEMPLATE.format(context=context or "(no excerpts found)", query=query)
+
+
+async def _search(
+    searcher: HybridSearcher,
+    reranker: Optional[CrossEncoderReranker],
+    query: str,
+    top_k: int,
+    filters: Optional[SearchFilters],
+) -> List[SourceChunk]:
+    """First-stage retrieval, then, with a reranker, cross-encoder scoring of its candidates down to top_k."""
+    if reranker is None:
+        return await searcher.search(query, top_k=top_k, filters=filters)
+    candidates = await searcher.search(query, top_k=max(top_k, reranker.candidates), filters=filters)
+    return await reranker.rerank(query, candidates, top_k)
+
+
+async def _retrieve(
+    searcher: HybridSearcher,
+    cache: Optional[SemanticAnswerCache],
+    query: str,
+    top_k: int,
+    filters: Optional[SearchFilters],
+    reranker: Optional[CrossEncoderReranker] = None,
+) -> Tuple[List[SourceChunk], Optional[np.ndarray]]:
+    """Retrieve chunks and, when caching, embed the question for the cache lookup concurrently."""
+    with tracer.span("retrieve", {"retrieve.top_k": top_k}):
+        if cache is None:
+            return await _search(searcher, reranker, query, top_k, filters), None
+        chunks, vector = await asyncio.gather(_search(searcher, reranker, query, top_k, filters), cache.embed_question(query))
+        return chunks, vector
+
+
+async def answer_question(
+    searcher: HybridSearcher,
+    llm: ModelScheduler,
+    query: str,
+    top_k: int,
+    model: Optional[str] = None,
+    filters: Optional[SearchFilters] = None,
+    cache: Optional[SemanticAnswerCache] = None,
+    reranker: Optional[CrossEncoderReranker] = None,
+) -> AskResponse:
+    """
+    Retrieve supporting chunks with hybrid search and generate an answer, without blocking
+    the event loop. With a cache, a near-identical earlier question answered from the same
+    chunks is served without generating. With a reranker, only its top_k chunks reach the prompt.
+    """
+    chunks, vector = await _retrieve(searcher, cache, query, top_k, filters, reranker)
+    model = llm.choose_model(query, model)
+    scope, fingerprint = answer_scope(model, top_k, filters), chunk_fingerprint(chunks)
+    if vector is not None:
+        hit = cache.get(vector, scope, fingerprint)
+        current_span().set("cache.hit", hit is not None)
+        if hit is not None:
+            return AskResponse(query=query, answer=hit.answer, model=model, sources=chunks, cached=True)
+
+    result = await llm.generate(build_prompt(query, chunks), model)
+    answer = result.get("response", "").strip()
+    if vector is not None and answer:
+        cache.put(vector, CachedAnswer(query, answer, model, chunks, scope, fingerprint, time.monotonic()))
+    return AskResponse(query=query, answer=answer, model=model, sources=chunks)
+
+
+async def stream_answer(
+    searcher: HybridSearcher,
+    llm: ModelScheduler,
+    query: str,
+    top_k: int,
+    model: Optional[str] = None,
+    filters: Optional[SearchFilters] = None,
+    cache: Optional[SemanticAnswerCache] = None,
+    reranker: Optional[CrossEncoderReranker] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield ("sources", ...) as soon as retrieval finishes, then a ("token", ...) event per
+    generated chunk and a final ("done", ...). Closing the generator stops generation.
+    A cached answer is sent as a single token event.
+    """
+    chunks, vector = await _retrieve(searcher, cache, query, top_k, filters, reranker)
+    model = llm.choose_model(query, model)
+    yield "sources", {"sources": [chunk.model_dump() for chunk in chunks]}
+
+    scope, fingerprint = answer_scope(model, top_k, filters), chunk_fingerprint(chunks)
+    if vector is not None:
+        hit = cache.get(vector, scope, fingerprint)
+        current_span().set("cache.hit", hit is not None)
+        if hit is not None:
+            yield "token", {"text": hit.answer}
+            yield "done", {"model": model, "cached": True}
+            return
+
+    parts: List[str] = []
+    tokens = llm.generate_stream(build_prompt(query, chunks), model)
+    try:
+        async for chunk in tokens:
+            if chunk.get("response"):
+                parts.append(chunk["response"])
+                yield "token", {"text": chunk["response"]}
+            if chunk.get("done"):
+                answer = "".join(parts).strip()
+                if vector is not None and answer:
+                    cache.put(vector, CachedAnswer(query, answer, model, chunks, scope, fingerprint, time.monotonic()))
+                yield "done", {"model": model, "eval_count": chunk.get("eval_count"), "cached": False}
+    finally:
+        await tokens.aclose()
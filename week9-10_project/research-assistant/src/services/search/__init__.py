@@ -0,0 +1,16 @@
+from .base import Embedder, Hit, HybridSearcher, reciprocal_rank_fusion
+from .memory import InMemoryChunkIndex
+from .opensearch import OpenSearchSearcher
+from .rerank import CrossEncoderReranker, RerankStats, create_reranker
+
+__all__ = [
+    "CrossEncoderReranker",
+    "Embedder",
+    "Hit",
+    "HybridSearcher",
+    "InMemoryChunkIndex",
+    "OpenSearchSearcher",
+    "RerankStats",
+    "create_reranker",
+    "reciprocal_rank_fusion",
+]
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from buildables_common.tracing import current_span, tracer
+
+from ...exceptions import OllamaException, SearchException
+from ...schemas.search import SearchFilters, SearchMode, SourceChunk
+
+logger = logging.getLogger(__name__)
+
+# Async batch embedding function, e.g. OllamaClient.embed
+Embedder = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+@dataclass
+class Hit:
+    chunk_id: str
+    source: Dict
+    score: float
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hit]], k: int = 60) -> List[Hit]:
+    """
+    Fuse rankings by summing 1 / (k + rank) over every ranking a chunk appears in.
+    Only ranks are used, so BM25 and cosine scores never need to be normalised
+    against each other.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    hits: Dict[str, Hit] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, 1):
+            scores[hit.chunk_id] += 1.0 / (k + rank)
+            hits.setdefault(hit.chunk_id, hit)
+    ordered = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [Hit(chunk_id, hits[chunk_id].source, score) for chunk_id, score in ordered]
+
+
+class HybridSearcher:
+    """
+    Runs a lexical (BM25) and a semantic (k-NN) query concurrently and fuses them
+    with reciprocal rank fusion. Backends implement _lexical and _semantic.
+    """
+
+    def __init__(
+        self,
+        embed: Optional[Embedder] = None,
+        default_mode: SearchMode = "hybrid",
+        candidates: int = 50,
+        rrf_k: int = 60,
+    ):
+        self.embed = embed
+        self.default_mode = default_mode
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    async def _lexical(self, query: str, size: int, filters: Optional[SearchFilters]) -> List[Hit]:
+        raise NotImplementedError
+
+    async def _semantic(self, vector: List[float], size: int, filters: Optional[SearchFilters]) -> List[Hit]:
+        raise NotImplementedError
+
+    async def _embed_query(self, query: str) -> Optional[List[float]]:
+        if self.embed is None:
+            return None
+        try:
+            vectors = await self.embed([query])
+        except OllamaException as e:
+            logger.warning("Query embedding failed, using BM25 only: %s", e)
+            return None
+        return vectors[0] if vectors else None
+
+    async def _semantic_for(self, query: str, size: int, filters: Optional[SearchFilters]) -> List[Hit]:
+        vector = await self._embed_query(query)
+        return await self._semantic(vector, size, filters) if vector is not None else []
+
+    @tracer.traced("search")
+    async def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        offset: int = 0,
+        filters: Optional[SearchFilters] = None,
+        mode: Optional[SearchMode] = None,
+    ) -> List[SourceChunk]:
+        """Return results offset..offset + top_k of the ranking for the given mode."""
+        mode = mode or self.default_mode
+        # Each retriever must rank deeper than the requested page for fusion to be stable
+        depth = max(self.candidates, offset + top_k)
+        span = current_span()
+        span.set("search.mode", mode)
+        span.set("search.depth", depth)
+
+        if mode == "bm25":
+            ranked = await self._lexical(query, depth, filters)
+        elif mode == "vector":
+            vector = await self._embed_query(query)
+            if vector is None:
+                raise SearchException("Vector search needs a query embedding, but none is available")
+            ranked = await self._semantic(vector, depth, filters)
+        else:
+            lexical, semantic = await asyncio.gather(
+                self._lexical(query, depth, filters),
+                self._semantic_for(query, depth, filters),
+            )
+            ranked = reciprocal_rank_fusion([lexical, semantic], self.rrf_k) if semantic else lexical
+
+        span.set("search.hits", len(ranked))
+        return [
+            SourceChunk(
+                chunk_id=hit.chunk_id,
+                arxiv_id=hit.source.get("arxiv_id"),
+                title=hit.source.get("title"),
+                text=hit.source.get("chunk_text", ""),
+                score=hit.score,
+                section=hit.source.get("section"),
+                source_field=hit.source.get("source_field"),
+                char_start=hit.source.get("char_start"),
+                char_end=hit.source.get("char_end"),
+            )
+            for hit in ranked[offset:offset + top_k]
+        ]
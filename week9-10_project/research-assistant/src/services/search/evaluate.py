@@ -0,0 +1,130 @@
+"""
+Measure retrieval quality and latency of the bm25, vector and hybrid search modes.
+
+The query file is JSON lines of {"query": "...", "relevant": ["<arxiv_id>", ...]}.
+A result counts as relevant when its paper is listed.
+
+    # Against the OpenSearch index, embedding queries with Ollama
+    python -m src.services.search.evaluate --queries eval.jsonl
+    # Fully in-process: load a JSONL corpus into the in-memory index
+    python -m src.services.search.evaluate --queries eval.jsonl --corpus papers.jsonl --embedder hashing
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import statistics
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from ...config import get_settings
+from ...ingestion import chunk_documents, read_jsonl
+from ..ollama import OllamaClient
+from ..opensearch import create_async_opensearch_client
+from .base import HybridSearcher
+from .memory import InMemoryChunkIndex, tokenize
+from .opensearch import OpenSearchSearcher
+
+MODES = ("bm25", "vector", "hybrid")
+
+
+class HashingEmbedder:
+    """
+    Bag-of-words feature-hashing embeddings. A dependency-free baseline that lets the
+    vector and hybrid modes be exercised without an embedding model.
+    """
+
+    def __init__(self, dimension: int = 768):
+        self.dimension = dimension
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in tokenize(text):
+            digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+            vector[digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+        return vector.tolist()
+
+    async def __call__(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+
+def load_queries(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+async def evaluate(searcher: HybridSearcher, queries: List[Dict], k: int) -> Dict[str, Dict[str, float]]:
+    report = {}
+    for mode in MODES:
+        recalls, reciprocal_ranks, latencies = [], [], []
+        for item in queries:
+            relevant = set(item["relevant"])
+            start = time.perf_counter()
+            results = await searcher.search(item["query"], top_k=k, mode=mode)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            papers = list(dict.fromkeys(r.arxiv_id for r in results))
+            recalls.append(len(relevant & set(papers)) / len(relevant) if relevant else 0.0)
+            rank = next((i for i, paper in enumerate(papers, 1) if paper in relevant), None)
+            reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+        report[mode] = {
+            f"recall@{k}": statistics.mean(recalls),
+            f"mrr@{k}": statistics.mean(reciprocal_ranks),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+        }
+    return report
+
+
+async def build_memory_index(corpus: str, embed, batch_size: int = 64) -> InMemoryChunkIndex:
+    index = InMemoryChunkIndex(embed=embed)
+    docs = list(chunk_documents(list(read_jsonl(corpus))))
+    for start in range(0, len(docs), batch_size):
+        batch = docs[start:start + batch_size]
+        for doc, vector in zip(batch, await embed([doc["chunk_text"] for doc in batch])):
+            doc["embedding"] = vector
+        index.bulk_index(batch)
+    return index
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", required=True, help="JSON lines of queries with relevant arxiv ids")
+    parser.add_argument("--corpus", help="Evaluate against an in-memory index built from this JSONL corpus")
+    parser.add_argument("--embedder", choices=["ollama", "hashing"], default="ollama")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    ollama = OllamaClient(settings)
+    embed = HashingEmbedder(settings.embedding_dimension) if args.embedder == "hashing" else ollama.embed
+    opensearch = None
+    try:
+        if args.corpus:
+            searcher: HybridSearcher = await build_memory_index(args.corpus, embed)
+        else:
+            opensearch = create_async_opensearch_client(settings)
+            searcher = OpenSearchSearcher(opensearch, settings.opensearch_index_name, embed=embed)
+        searcher.candidates = settings.search_candidates
+        searcher.rrf_k = settings.search_rrf_k
+        report = await evaluate(searcher, load_queries(args.queries), args.k)
+    finally:
+        await ollama.close()
+        if opensearch is not None:
+            await opensearch.close()
+
+    print(f"{'mode':<8}" + "".join(f"{name:>12}" for name in next(iter(report.values()))))
+    for mode, metrics in report.items():
+        print(f"{mode:<8}" + "".join(f"{value:>12.3f}" for value in metrics.values()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
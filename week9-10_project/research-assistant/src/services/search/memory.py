@@ -0,0 +1,167 @@
+import math
+import re
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
+
+from ...schemas.search import SearchFilters
+from .base import Hit, HybridSearcher
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def matches(doc: Dict, filters: Optional[SearchFilters]) -> bool:
+    if filters is None:
+        return True
+    if filters.categories and not set(filters.categories) & set(doc.get("categories") or []):
+        return False
+    if filters.arxiv_ids and doc.get("arxiv_id") not in filters.arxiv_ids:
+        return False
+    if filters.published_from or filters.published_to:
+        published = doc.get("published_date")
+        if not published:
+            return False
+        day = date.fromisoformat(published[:10])
+        if filters.published_from and day < filters.published_from:
+            return False
+        if filters.published_to and day > filters.published_to:
+            return False
+    return True
+
+
+class InMemoryChunkIndex(HybridSearcher):
+    """
+    In-process stand-in for the OpenSearch chunk index, for local runs, tests and the
+    eval script. Implements both the ingestion write side and hybrid search: BM25 over
+    an inverted index (title counted twice, like the title^2 boost) and exact cosine
+    k-NN over a NumPy matrix of the chunk embeddings.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, **kwargs):
+        super().__init__(**kwargs)
+        self.k1 = k1
+        self.b = b
+        self.docs: Dict[str, Dict] = {}
+        self._terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._total_length = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[str] = []
+
+    # Write side, same interface as OpenSearchChunkIndex
+
+    def ensure_index(self) -> None:
+        pass
+
+    def _remove(self, chunk_id: str) -> None:
+        self.docs.pop(chunk_id)
+        terms = self._terms.pop(chunk_id)
+        self._total_length -= self._lengths.pop(chunk_id)
+        for term in terms:
+            self._postings[term].discard(chunk_id)
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def delete_papers(self, arxiv_ids: Sequence[str]) -> None:
+        ids = set(arxiv_ids)
+        for chunk_id in [cid for cid, doc in self.docs.items() if doc["arxiv_id"] in ids]:
+            self._remove(chunk_id)
+        self._matrix = None
+
+    def delete_stale_chunks(self, chunk_counts: Dict[str, int]) -> int:
+        stale = [
+            cid for cid, doc in self.docs.items()
+            if doc["arxiv_id"] in chunk_counts and doc["chunk_index"] >= chunk_counts[doc["arxiv_id"]]
+        ]
+        for chunk_id in stale:
+            self._remove(chunk_id)
+        self._matrix = None
+        return len(stale)
+
+    def paper_ids(self) -> Iterator[str]:
+        return iter(sorted({doc["arxiv_id"] for doc in self.docs.values()}))
+
+    def bulk_index(self, docs: Iterable[Dict]) -> int:
+        indexed = 0
+        for doc in docs:
+            source = dict(doc)
+            chunk_id = source.pop("chunk_id")
+            if chunk_id in self.docs:
+                self._remove(chunk_id)
+            terms = Counter(tokenize(source.get("chunk_text", "")) + tokenize(source.get("title", "")) * 2)
+            self.docs[chunk_id] = source
+            self._terms[chunk_id] = terms
+            self._lengths[chunk_id] = sum(terms.values())
+            self._total_length += self._lengths[chunk_id]
+            for term in terms:
+                self._postings[term].add(chunk_id)
+            indexed += 1
+        self._matrix = None
+        return indexed
+
+    def chunks_for(self, arxiv_id: str) -> List[Dict]:
+        return [doc for doc in self.docs.values() if doc["arxiv_id"] == arxiv_id]
+
+    # Search side
+
+    async def _lexical(self, query: str, size: int, filters: Optional[SearchFilters]) -> List[Hit]:
+        n = len(self.docs)
+        if not n:
+            return []
+        avg_length = self._total_length / n
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id in postings:
+                tf = self._terms[chunk_id][term]
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / avg_length)
+                scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        hits = []
+        for chunk_id, score in ranked:
+            if matches(self.docs[chunk_id], filters):
+                hits.append(Hit(chunk_id, self.docs[chunk_id], score))
+                if len(hits) == size:
+                    break
+        return hits
+
+    def _vectors(self) -> np.ndarray:
+        """Row-normalised embedding matrix, rebuilt lazily after writes."""
+        if self._matrix is None:
+            self._matrix_ids = [cid for cid, doc in self.docs.items() if doc.get("embedding") is not None]
+            if self._matrix_ids:
+                matrix = np.asarray([self.docs[cid]["embedding"] for cid in self._matrix_ids], dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                self._matrix = matrix / np.maximum(norms, 1e-12)
+            else:
+                self._matrix = np.zeros((0, 0), dtype=np.float32)
+        return self._matrix
+
+    async def _semantic(self, vector: List[float], size: int, filters: Optional[SearchFilters]) -> List[Hit]:
+        matrix = self._vectors()
+        if not len(matrix):
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        similarities = matrix @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        if filters is not None:
+            mask = np.fromiter((matches(self.docs[cid], filters) for cid in self._matrix_ids), dtype=bool)
+            similarities = np.where(mask, similarities, -np.inf)
+        top = min(size, len(similarities))
+        candidates = np.argpartition(-similarities, top - 1)[:top]
+        order = candidates[np.argsort(-similarities[candidates])]
+        return [
+            Hit(self._matrix_ids[i], self.docs[self._matrix_ids[i]], float(similarities[i]))
+            for i in order
+            if np.isfinite(similarities[i])
+        ]
@@ -0,0 +1,81 @@
+import time
+from typing import Dict, List, Optional
+
+from opensearchpy import AsyncOpenSearch
+from opensearchpy.exceptions import NotFoundError, OpenSearchException
+
+from ...exceptions import SearchException
+from ...metrics import metrics
+from ...schemas.search import SearchFilters
+from .base import Hit, HybridSearcher
+
+SOURCE_FIELDS = [
+    "arxiv_id",
+    "title",
+    "chunk_text",
+    "chunk_index",
+    "section",
+    "source_field",
+    "char_start",
+    "char_end",
+    "categories",
+    "published_date",
+]
+
+
+def filter_clauses(filters: Optional[SearchFilters]) -> List[Dict]:
+    if filters is None:
+        return []
+    clauses: List[Dict] = []
+    if filters.categories:
+        clauses.append({"terms": {"categories": filters.categories}})
+    if filters.arxiv_ids:
+        clauses.append({"terms": {"arxiv_id": filters.arxiv_ids}})
+    if filters.published_from or filters.published_to:
+        bounds = {}
+        if filters.published_from:
+            bounds["gte"] = filters.published_from.isoformat()
+        if filters.published_to:
+            bounds["lte"] = filters.published_to.isoformat()
+        clauses.append({"range": {"published_date": bounds}})
+    return clauses
+
+
+class OpenSearchSearcher(HybridSearcher):
+    """Hybrid search over the OpenSearch chunk index."""
+
+    def __init__(self, client: AsyncOpenSearch, index_name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.index_name = index_name
+
+    async def _search(self, body: Dict, operation: str) -> List[Hit]:
+        started = time.perf_counter()
+        try:
+            result = await self.client.search(index=self.index_name, body=body)
+        except NotFoundError:
+            return []
+        except OpenSearchException as e:
+            raise SearchException(f"Search failed: {e}") from e
+        finally:
+            metrics.observe("opensearch_request_duration_seconds", time.perf_counter() - started, operation=operation)
+        return [Hit(hit["_id"], hit["_source"], hit["_score"]) for hit in result["hits"]["hits"]]
+
+    async def _lexical(self, query: str, size: int, filters: Optional[SearchFilters]) -> List[Hit]:
+        return await self._search({
+            "size": size,
+            "query": {
+                "bool": {
+                    "must": [{"multi_match": {"query": query, "fields": ["chunk_text", "title^2", "abstract"]}}],
+                    "filter": filter_clauses(filters),
+                }
+            },
+            "_source": SOURCE_FIELDS,
+        }, "bm25")
+
+    async def _semantic(self, vector: List[float], size: int, filters: Optional[SearchFilters]) -> List[Hit]:
+        knn: Dict = {"vector": vector, "k": size}
+        clauses = filter_clauses(filters)
+        if clauses:
+            knn["filter"] = {"bool": {"filter": clauses}}
+        return await self._search({"size": size, "query": {"knn": {"embedding": knn}}, "_source": SOURCE_FIELDS}, "knn")
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from buildables_common.tracing import current_span, tracer
+
+from ...config import Settings
+from ...metrics import metrics
+from ...schemas.search import SourceChunk
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RerankStats:
+    reranked: int = 0
+    timeouts: int = 0   # scoring exceeded the time budget; the first-stage order was used
+    busy: int = 0       # too many rerankings in flight; skipped without waiting
+    errors: int = 0
+    unavailable: int = 0  # the model is not loaded (yet, or sentence-transformers is missing)
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class CrossEncoderReranker:
+    """
+    Second retrieval stage: re-scores the first-stage candidates with a small
+    cross-encoder, which reads the query and chunk together, and keeps the best top_k.
+
+    Inference is CPU-bound, so it runs in a dedicated single-thread executor in
+    batches of batch_size pairs; the event loop only waits for it up to `timeout`
+    seconds. On timeout, error or overload the first-stage order is returned, so the
+    reranker can make an answer better but never much slower. A scoring run that
+    times out still finishes in its thread, which is why at most max_pending runs
+    may be outstanding before new requests skip reranking.
+
+    The ONNX backend runs the model through ONNX Runtime; onnx_file selects an exported
+    or quantized variant from the model repository, e.g. "onnx/model_qint8_avx512.onnx".
+    """
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L6-v2",
+        backend: str = "onnx",
+        onnx_file: Optional[str] = None,
+        candidates: int = 20,
+        batch_size: int = 16,
+        max_length: int = 256,
+        timeout: float = 0.3,
+        max_pending: int = 2,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.stats = RerankStats()
+        self._model: Any = None
+        self._load_failed = False
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+
+    def _load(self) -> None:
+        from sentence_transformers import CrossEncoder
+
+        model_kwargs = {"file_name": self.onnx_file} if self.backend == "onnx" and self.onnx_file else None
+        self._model = CrossEncoder(
+            self.model_name,
+            max_length=self.max_length,
+            device="cpu",
+            backend=self.backend,
+            model_kwargs=model_kwargs,
+        )
+
+    async def load(self) -> None:
+        """Load the model off the event loop; called in the background at startup."""
+        started = time.monotonic()
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._load)
+        except Exception as e:
+            self._load_failed = True
+            logger.warning("Could not load reranker %s, using first-stage order: %s", self.model_name, e)
+            return
+        logger.info("Loaded reranker %s (%s) in %.1fs", self.model_name, self.backend, time.monotonic() - started)
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    def _score(self, query: str, texts: List[str]) -> np.ndarray:
+        started = time.perf_counter()
+        scores = self._model.predict(
+            [(query, text) for text in texts], batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False
+        )
+        metrics.observe("rerank_inference_seconds", time.perf_counter() - started)
+        return np.asarray(scores, dtype=np.float32).reshape(-1)
+
+    def _done(self, _) -> None:
+        self._pending -= 1
+
+    @tracer.traced("rerank")
+    async def rerank(self, query: str, chunks: List[SourceChunk], top_k: int) -> List[SourceChunk]:
+        """Return the top_k chunks by cross-encoder score, or the first top_k on fallback."""
+        first_stage = chunks[:top_k]
+        span = current_span()
+        span.set("rerank.candidates", len(chunks))
+        if len(chunks) <= 1:
+            return first_stage
+        if not self.ready:
+            self.stats.unavailable += 1
+            span.set("rerank.outcome", "unavailable")
+            return first_stage
+        if self._pending >= self.max_pending:
+            self.stats.busy += 1
+            span.set("rerank.outcome", "busy")
+            return first_stage
+
+        self._pending += 1
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._score, query, [f"{c.title or ''}\n{c.text}" for c in chunks]
+        )
+        future.add_done_callback(self._done)
+        try:
+            # shield: a timeout stops the wait, not the executor job, which _done still accounts for
+            scores = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            span.set("rerank.outcome", "timeout")
+            logger.warning("Reranking %d chunks exceeded %.0f ms, using first-stage order", len(chunks), self.timeout * 1000)
+            return first_stage
+        except Exception as e:
+            self.stats.errors += 1
+            span.record_error(e)
+            logger.warning("Reranking failed, using first-stage order: %s", e)
+            return first_stage
+        finally:
+            metrics.observe("rerank_seconds", time.perf_counter() - started)
+
+        self.stats.reranked += 1
+        span.set("rerank.outcome", "reranked")
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [chunks[i].model_copy(update={"score": float(scores[i])}) for i in order]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_reranker(settings: Settings) -> Optional[CrossEncoderReranker]:
+    if not settings.rerank_enabled:
+        return None
+    return CrossEncoderReranker(
+        settings.rerank_model,
+        backend=settings.rerank_backend,
+        onnx_file=settings.rerank_onnx_file,
+        candidates=settings.rerank_candidates,
+        batch_size=settings.rerank_batch_size,
+        max_length=settings.rerank_max_length,
+        timeout=settings.rerank_timeout_ms / 1000,
+        max_pending=settings.rerank_max_pending,
+    )
@@ -0,0 +1,31 @@
+"""
+Tracing settings of the API and the ingestion jobs.
+
+The tracer itself is shared with the other projects in buildables_common.tracing;
+this module points it at the exporter the tracing_* settings choose:
+
+    TRACING_EXPORTER       "jsonl", "otlp" or "none" (default)
+    TRACING_FILE           JSON lines file for the "jsonl" exporter (default traces.jsonl)
+    TRACING_SAMPLE_RATE    Fraction of traces exported, 0.0-1.0 (default 1.0)
+    TRACING_OTLP_ENDPOINT  Collector for the "otlp" exporter (default http://localhost:4318)
+
+Where the time went, per span name:
+
+    python -m buildables_common.tracing traces.jsonl
+"""
+
+from buildables_common.tracing import JsonlExporter, OtlpExporter, Tracer, configure
+
+from .config import Settings
+
+
+def configure_tracing(settings: Settings) -> Tracer:
+    """Points the shared tracer at the exporter chosen by the settings."""
+    kind = settings.tracing_exporter.lower()
+    if kind == "jsonl":
+        exporter = JsonlExporter(settings.tracing_file)
+    elif kind == "otlp":
+        exporter = OtlpExporter(settings.tracing_otlp_endpoint, settings.service_name)
+    else:
+        exporter = None
+    return configure(exporter, settings.tracing_sample_rate, settings.service_name)
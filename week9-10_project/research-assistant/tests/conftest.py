@@ -0,0 +1,13 @@
+import pytest
+from src.config import Settings
+from src.database import create_db_engine, create_session_factory
+from src.models import Base
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a fresh SQLite database; upsert_papers supports SQLite as well as PostgreSQL."""
+    engine = create_db_engine(Settings(postgresql_database_url=f"sqlite:///{tmp_path / 'papers.db'}"))
+    Base.metadata.create_all(engine)
+    yield create_session_factory(engine)
+    engine.dispose()
@@ -0,0 +1,98 @@
+"""Test doubles for the services the app calls over the network."""
+
+import asyncio
+import re
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from src.exceptions import OllamaException
+from src.ingestion.sources import PaperRecord
+
+BODIES = {
+    "2401.00001": (
+        "Attention in Transformers",
+        "# Introduction\n\nSelf-attention lets each token weigh every other token in the sequence. "
+        "The weights come from a softmax over scaled dot products of queries and keys.\n\n"
+        "# Results\n\nAttention layers replace recurrence and train in parallel on long sequences.",
+    ),
+    "2401.00002": (
+        "Retrieval for Question Answering",
+        "# Method\n\nA retriever selects passages from a corpus and a reader answers from them. "
+        "Dense retrieval embeds questions and passages into one vector space.",
+    ),
+    "2401.00003": (
+        "Graph Neural Networks for Molecules",
+        "# Model\n\nMessage passing updates every atom from its bonded neighbours. "
+        "Pooling the atom states gives a representation of the whole molecule.",
+    ),
+}
+
+
+def make_paper(arxiv_id: str, **fields) -> PaperRecord:
+    title, body = BODIES.get(arxiv_id, (f"Paper {arxiv_id}", f"The body of paper {arxiv_id}."))
+    values = {
+        "title": title,
+        "abstract": f"Abstract of {title}.",
+        "authors": ["Ada Lovelace"],
+        "categories": ["cs.CL"],
+        "published_date": datetime(2024, 1, 1),
+        "body": body,
+    }
+    values.update(fields)
+    return PaperRecord(arxiv_id=arxiv_id, **values)
+
+
+def word_vector(text: str, dimension: int = 32) -> List[float]:
+    """Bag-of-words embedding: texts with the same words get the same direction."""
+    vector = [0.0] * dimension
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        vector[zlib.crc32(word.encode("utf-8")) % dimension] += 1.0
+    return vector
+
+
+async def embed(texts: List[str]) -> List[List[float]]:
+    return [word_vector(text) for text in texts]
+
+
+def embed_documents(texts: List[str]) -> List[List[float]]:
+    return [word_vector(text) for text in texts]
+
+
+class FakeOllama:
+    """Stands in for OllamaClient: generates fixed tokens and records the prompts it was sent."""
+
+    def __init__(self, tokens: Sequence[str] = ("Self-attention ", "weighs tokens [2401.00001]."), delay: float = 0.0):
+        self.tokens = list(tokens)
+        self.delay = delay
+        self.error: Optional[Exception] = None
+        self.prompts: List[str] = []
+
+    async def generate(self, prompt: str, model: Optional[str] = None, keep_alive: Optional[str] = None, **options: Any) -> Dict:
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"response": "".join(self.tokens), "done": True, "eval_count": len(self.tokens)}
+
+    async def generate_stream(
+        self, prompt: str, model: Optional[str] = None, keep_alive: Optional[str] = None, **options: Any
+    ) -> AsyncIterator[Dict]:
+        self.prompts.append(prompt)
+        for token in self.tokens:
+            await asyncio.sleep(self.delay)
+            if self.error is not None:
+                raise self.error
+            yield {"response": token, "done": False}
+        yield {"response": "", "done": True, "eval_count": len(self.tokens)}
+
+    async def load(self, model: str, keep_alive: str) -> None:
+        pass
+
+    async def list_models(self) -> List[str]:
+        if self.error is not None:
+            raise OllamaException(str(self.error))
+        return ["llama3.2:1b"]
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+from src.config import Settings
+from src.ingestion.pipeline import index_papers
+from src.schemas.search import SourceChunk
+from src.services.answer_cache import CachedAnswer, SemanticAnswerCache, answer_scope, chunk_fingerprint
+from src.services.ollama import ModelScheduler
+from src.services.rag import answer_question
+from src.services.search import InMemoryChunkIndex
+
+from stubs import FakeOllama, embed, embed_documents, make_paper
+
+MODEL = "llama3.2:1b"
+QUESTION = "How does self-attention weigh tokens?"
+SCOPE = answer_scope(MODEL, 5, None)
+CHUNKS = [SourceChunk(chunk_id="2401.00001:0", arxiv_id="2401.00001", text="Self-attention weighs tokens.", score=1.0)]
+
+
+async def store(cache, question, chunks=CHUNKS, scope=SCOPE, created=None):
+    vector = await cache.embed_question(question)
+    entry = CachedAnswer(question, f"Answer to {question}", MODEL, chunks, scope, chunk_fingerprint(chunks),
+                         time.monotonic() if created is None else created)
+    cache.put(vector, entry)
+
+
+async def lookup(cache, question, chunks=CHUNKS, scope=SCOPE):
+    return cache.get(await cache.embed_question(question), scope, chunk_fingerprint(chunks))
+
+
+@pytest.fixture
+def cache():
+    return SemanticAnswerCache(embed, capacity=2, ttl=60)
+
+
+async def test_a_rephrased_question_is_served_from_the_cache(cache):
+    await store(cache, QUESTION)
+    hit = await lookup(cache, "how does SELF-ATTENTION weigh tokens")
+    assert hit.answer == f"Answer to {QUESTION}"
+    assert await lookup(cache, "Which molecules do graph networks model?") is None
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+async def test_other_scopes_do_not_share_answers(cache):
+    await store(cache, QUESTION)
+    assert await lookup(cache, QUESTION, scope=answer_scope("gpt-oss:20b", 5, None)) is None
+    assert await lookup(cache, QUESTION, scope=answer_scope(MODEL, 10, None)) is None
+    assert len(cache) == 1
+
+
+async def test_changed_chunks_invalidate_the_answer(cache):
+    """Test an answer generated from chunks retrieval no longer returns is dropped."""
+    await store(cache, QUESTION)
+    reindexed = [CHUNKS[0].model_copy(update={"text": "Self-attention weighs tokens by similarity."})]
+    assert await lookup(cache, QUESTION, chunks=reindexed) is None
+    assert (cache.stats.stale, len(cache)) == (1, 0)
+
+
+async def test_expired_answers_are_dropped(cache):
+    await store(cache, QUESTION, created=time.monotonic() - 61)
+    assert await lookup(cache, QUESTION) is None
+    assert (cache.stats.expired, len(cache)) == (1, 0)
+
+
+async def test_the_least_recently_used_answer_is_evicted(cache):
+    await store(cache, QUESTION)
+    await store(cache, "Which molecules do graph networks model?")
+    assert await lookup(cache, QUESTION) is not None
+    await store(cache, "What does a dense retriever embed?")
+    assert await lookup(cache, QUESTION) is not None
+    assert await lookup(cache, "Which molecules do graph networks model?") is None
+    assert cache.stats.evicted == 1
+
+
+async def test_answers_are_regenerated_after_the_paper_is_reindexed():
+    index = InMemoryChunkIndex(embed=embed)
+    index_papers([make_paper("2401.00001"), make_paper("2401.00002")], index, embed=embed_documents)
+    ollama = FakeOllama()
+    llm = ModelScheduler(ollama, Settings())
+    cache = SemanticAnswerCache(embed)
+
+    first = await answer_question(index, llm, QUESTION, 5, MODEL, cache=cache)
+    second = await answer_question(index, llm, QUESTION, 5, MODEL, cache=cache)
+    assert (first.cached, second.cached, second.answer) == (False, True, first.answer)
+    assert len(ollama.prompts) == 1
+
+    revised = make_paper("2401.00001", body="Self-attention weighs tokens with learned query and key projections.")
+    index_papers([revised], index, embed=embed_documents)
+    third = await answer_question(index, llm, QUESTION, 5, MODEL, cache=cache)
+    assert not third.cached
+    assert len(ollama.prompts) == 2
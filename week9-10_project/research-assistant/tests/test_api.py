@@ -0,0 +1,95 @@
+import json
+
+import httpx
+import pytest
+from asgi_lifespan import LifespanManager
+from src.config import get_settings
+from src.exceptions import OllamaException
+from src.ingestion.pipeline import index_papers
+from src.main import app
+from src.services.answer_cache import SemanticAnswerCache
+from src.services.health import HealthChecker, ollama_check
+from src.services.ollama import ModelScheduler
+from src.services.search import InMemoryChunkIndex
+
+from stubs import FakeOllama, embed, embed_documents, make_paper
+
+QUESTION = {"query": "How does self-attention weigh tokens?", "model": "llama3.2:1b"}
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+async def postgres_up() -> None:
+    pass
+
+
+@pytest.fixture
+def ollama():
+    return FakeOllama()
+
+
+@pytest.fixture
+async def client(tmp_path, monkeypatch, ollama):
+    """The app after its real startup, with the services behind Postgres, OpenSearch and Ollama swapped for fakes."""
+    monkeypatch.setenv("EMBEDDING_CACHE_DIR", str(tmp_path / "embeddings"))
+    get_settings.cache_clear()
+    async with LifespanManager(app):
+        index = InMemoryChunkIndex(embed=embed)
+        index_papers([make_paper("2401.00001"), make_paper("2401.00002")], index, embed=embed_documents)
+        app.state.searcher = index
+        app.state.model_scheduler = ModelScheduler(ollama, app.state.settings)
+        app.state.answer_cache = SemanticAnswerCache(embed)
+        app.state.health_checker = HealthChecker({"postgres": postgres_up, "ollama": ollama_check(ollama)})
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    get_settings.cache_clear()
+
+
+async def test_ask_stream_sends_sources_tokens_then_done(client):
+    response = await client.post("/ask/stream", json=QUESTION)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["sources", "token", "token", "done"]
+    assert events[0][1]["sources"][0]["arxiv_id"] == "2401.00001"
+    assert "".join(data["text"] for event, data in events if event == "token") == "Self-attention weighs tokens [2401.00001]."
+    done = events[-1][1]
+    assert (done["model"], done["cached"]) == ("llama3.2:1b", False)
+    assert done["sources_ms"] <= done["first_token_ms"] <= done["total_ms"]
+
+
+async def test_ask_stream_replays_a_cached_answer(client, ollama):
+    await client.post("/ask/stream", json=QUESTION)
+    events = parse_events((await client.post("/ask/stream", json=QUESTION)).text)
+    assert [event for event, _ in events] == ["sources", "token", "done"]
+    assert events[-1][1]["cached"]
+    assert len(ollama.prompts) == 1
+
+
+async def test_ask_stream_reports_a_failed_generation_as_an_event(client, ollama):
+    ollama.error = OllamaException("model not found")
+    events = parse_events((await client.post("/ask/stream", json=QUESTION)).text)
+    assert [event for event, _ in events] == ["sources", "error"]
+    assert events[-1][1]["detail"] == "model not found"
+
+
+async def test_health_reports_each_service(client, ollama):
+    response = await client.get("/health")
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["status"], body["environment"]) == ("ok", "test")
+    assert set(body["services"]) == {"postgres", "ollama"}
+
+    ollama.error = OllamaException("connection refused")
+    app.state.health_checker.ttl = 0
+    body = (await client.get("/health")).json()
+    assert body["status"] == "degraded"
+    assert (body["services"]["ollama"]["status"], body["services"]["ollama"]["detail"]) == ("error", "connection refused")
+    assert (await client.get("/ready")).status_code == 503
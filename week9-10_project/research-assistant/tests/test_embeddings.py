@@ -0,0 +1,90 @@
+import asyncio
+
+import numpy as np
+import pytest
+from src.exceptions import OllamaException
+from src.services.embeddings import EmbeddingCache, EmbeddingService
+
+from stubs import word_vector
+
+MODEL = "nomic-embed-text"
+
+
+class CountingEmbedder:
+    """Embedding model that records each batch it is called with."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.error = None
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [word_vector(text) for text in texts]
+
+
+async def test_concurrent_requests_share_one_model_call():
+    """Test texts queued within max_wait go out in one batch, and a repeated text is embedded once."""
+    model = CountingEmbedder()
+    service = EmbeddingService(model, max_wait=0.01)
+    first, second = await asyncio.gather(service.embed(["attention", "retrieval"]), service.embed(["retrieval", "graphs"]))
+    assert model.calls == [["attention", "retrieval", "graphs"]]
+    assert first == [word_vector("attention"), word_vector("retrieval")]
+    assert second == [word_vector("retrieval"), word_vector("graphs")]
+    assert (service.stats.requested, service.stats.coalesced, service.stats.model_calls) == (4, 1, 1)
+
+
+async def test_a_full_batch_is_sent_without_waiting():
+    model = CountingEmbedder()
+    service = EmbeddingService(model, max_batch_size=2, max_wait=60)
+    await asyncio.wait_for(service.embed(["a", "b", "c", "d"]), timeout=1)
+    assert model.calls == [["a", "b"], ["c", "d"]]
+
+
+async def test_cached_texts_skip_the_model(tmp_path):
+    model = CountingEmbedder()
+    service = EmbeddingService(model, cache=EmbeddingCache(str(tmp_path), MODEL), max_wait=0)
+    await service.embed(["attention", "retrieval"])
+    vectors = await service.embed(["attention", "retrieval", "graphs"])
+    assert model.calls == [["attention", "retrieval"], ["graphs"]]
+    assert service.stats.cache_hits == 2
+    assert vectors[0] == word_vector("attention")
+
+
+def test_cache_is_shared_through_its_files(tmp_path):
+    """Test rows appended by one cache are read by another, as in another worker process."""
+    writer, reader = EmbeddingCache(str(tmp_path), MODEL), EmbeddingCache(str(tmp_path), MODEL)
+    assert reader.get_many(["attention"]) == [None]
+    writer.put_many(["attention", "retrieval"], [word_vector("attention"), word_vector("retrieval")])
+    vector, missing = reader.get_many(["retrieval", "graphs"])
+    np.testing.assert_allclose(vector, word_vector("retrieval"), rtol=1e-3)
+    assert missing is None
+    assert len(EmbeddingCache(str(tmp_path), "other-model")) == 0
+
+
+async def test_a_failed_batch_fails_every_caller_and_is_retried():
+    model = CountingEmbedder()
+    model.error = OllamaException("Ollama is down")
+    service = EmbeddingService(model, max_wait=0.01)
+    results = await asyncio.gather(service.embed(["attention"]), service.embed(["attention"]), return_exceptions=True)
+    assert all(isinstance(result, OllamaException) for result in results)
+
+    model.error = None
+    assert await service.embed(["attention"]) == [word_vector("attention")]
+    assert len(model.calls) == 2
+
+
+async def test_a_cancelled_caller_does_not_cancel_the_shared_batch():
+    model = CountingEmbedder(delay=0.02)
+    service = EmbeddingService(model, max_wait=0)
+    cancelled = asyncio.create_task(service.embed(["attention"]))
+    waiting = asyncio.create_task(service.embed(["attention"]))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert await waiting == [word_vector("attention")]
+    assert len(model.calls) == 1
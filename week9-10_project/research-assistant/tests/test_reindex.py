@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from src.exceptions import IndexOutOfDateError
+from src.ingestion.reindex import load_state, sync_index
+from src.ingestion.repository import upsert_papers
+from src.models import Paper
+from src.services.search import InMemoryChunkIndex
+
+from stubs import make_paper
+
+IDS = ["2401.00001", "2401.00002", "2401.00003", "2401.00004"]
+ALIAS = "arxiv-paper-chunks"
+VERSION = "v1"
+
+
+class FailingIndex(InMemoryChunkIndex):
+    """Loses its connection on the bulk request after `fail_after` successful ones."""
+
+    def __init__(self, fail_after=None):
+        super().__init__()
+        self.fail_after = fail_after
+        self.requests = 0
+
+    def bulk_index(self, docs):
+        if self.requests == self.fail_after:
+            raise ConnectionError("OpenSearch went away")
+        self.requests += 1
+        return super().bulk_index(docs)
+
+
+def write(session_factory, papers, updated_at):
+    """Upsert papers and stamp them with the given updated_at, one per day from updated_at."""
+    with session_factory() as session, session.begin():
+        upsert_papers(session, papers)
+        for day, paper in enumerate(papers):
+            stmt = update(Paper).where(Paper.arxiv_id == paper.arxiv_id).values(updated_at=updated_at + timedelta(days=day))
+            session.execute(stmt)
+
+
+def sync(session_factory, index, version=VERSION):
+    return sync_index(session_factory, index, ALIAS, version, batch_size=2, lag=timedelta(0))
+
+
+@pytest.fixture
+def papers(session_factory):
+    papers = [make_paper(arxiv_id) for arxiv_id in IDS]
+    write(session_factory, papers, datetime(2024, 1, 1))
+    return papers
+
+
+def test_first_sync_indexes_every_paper_and_saves_the_watermark(session_factory, papers):
+    index = InMemoryChunkIndex()
+    stats = sync(session_factory, index)
+    assert (stats.mode, stats.papers) == ("incremental", 4)
+    assert list(index.paper_ids()) == IDS
+    state = load_state(session_factory, ALIAS)
+    assert (state.pipeline_version, state.watermark) == (VERSION, datetime(2024, 1, 4))
+
+
+def test_next_sync_reads_only_papers_past_the_watermark(session_factory, papers):
+    index = InMemoryChunkIndex()
+    sync(session_factory, index)
+    assert sync(session_factory, index).papers == 0
+
+    write(session_factory, [make_paper("2401.00002", body="Dense retrieval, revised.")], datetime(2024, 2, 1))
+    stats = sync(session_factory, index)
+    assert (stats.papers, stats.chunks_indexed) == (1, 1)
+    assert stats.stale_chunks_deleted == 0
+    assert load_state(session_factory, ALIAS).watermark == datetime(2024, 2, 1)
+    assert [doc["chunk_text"] for doc in index.chunks_for("2401.00002")] == ["Dense retrieval, revised."]
+
+
+def test_lag_rereads_the_window_before_the_watermark(session_factory, papers):
+    """Test rows committed late with an updated_at just before the watermark are still picked up."""
+    index = InMemoryChunkIndex()
+    sync(session_factory, index)
+    stats = sync_index(session_factory, index, ALIAS, VERSION, lag=timedelta(days=1, hours=12))
+    assert stats.papers == 2
+
+
+def test_interrupted_sync_resumes_after_the_last_saved_batch(session_factory, papers):
+    index = FailingIndex(fail_after=1)
+    with pytest.raises(ConnectionError):
+        sync(session_factory, index)
+    assert load_state(session_factory, ALIAS).watermark == datetime(2024, 1, 2)
+    assert list(index.paper_ids()) == IDS[:2]
+
+    index.fail_after = None
+    stats = sync(session_factory, index)
+    assert stats.papers == 2
+    assert list(index.paper_ids()) == IDS
+    assert load_state(session_factory, ALIAS).watermark == datetime(2024, 1, 4)
+
+
+def test_sync_with_other_pipeline_settings_needs_a_rebuild(session_factory, papers):
+    index = InMemoryChunkIndex()
+    sync(session_factory, index)
+    with pytest.raises(IndexOutOfDateError):
+        sync(session_factory, index, version="v2")
@@ -0,0 +1,60 @@
+from dataclasses import replace
+
+from sqlalchemy import func, select
+from src.ingestion.pipeline import run_ingestion
+from src.ingestion.repository import upsert_papers
+from src.models import Paper
+from src.services.search import InMemoryChunkIndex
+
+from stubs import make_paper
+
+IDS = ["2401.00001", "2401.00002", "2401.00003"]
+
+
+def upsert(session_factory, papers):
+    with session_factory() as session, session.begin():
+        return upsert_papers(session, papers)
+
+
+def test_rerun_writes_no_rows(session_factory):
+    """Test upserting the same papers again leaves every row untouched."""
+    papers = [make_paper(arxiv_id) for arxiv_id in IDS]
+    assert upsert(session_factory, papers) == set(IDS)
+    with session_factory() as session:
+        updated = dict(session.execute(select(Paper.arxiv_id, Paper.updated_at)).all())
+
+    assert upsert(session_factory, papers) == set()
+    with session_factory() as session:
+        assert session.scalar(select(func.count()).select_from(Paper)) == 3
+        assert dict(session.execute(select(Paper.arxiv_id, Paper.updated_at)).all()) == updated
+
+
+def test_only_changed_papers_are_rewritten(session_factory):
+    """Test a paper whose content hash changed is updated and reported for re-indexing."""
+    papers = [make_paper(arxiv_id) for arxiv_id in IDS]
+    upsert(session_factory, papers)
+    revised = replace(papers[1], abstract="A revised abstract.")
+    assert upsert(session_factory, [papers[0], revised, papers[2]]) == {"2401.00002"}
+    with session_factory() as session:
+        paper = session.scalar(select(Paper).where(Paper.arxiv_id == "2401.00002"))
+        assert (paper.abstract, paper.content_hash) == ("A revised abstract.", revised.content_hash)
+
+
+def test_duplicate_ids_in_a_batch_keep_the_last_copy(session_factory):
+    """Test one statement never touches a row twice when a source repeats a paper."""
+    first, last = make_paper("2401.00001"), make_paper("2401.00001", title="Attention, Revised")
+    assert upsert(session_factory, [first, last]) == {"2401.00001"}
+    with session_factory() as session:
+        assert session.scalars(select(Paper.title)).all() == ["Attention, Revised"]
+
+
+def test_rerun_of_an_ingestion_indexes_nothing(session_factory):
+    """Test a second ingestion of the same source writes no rows and indexes no chunks."""
+    papers = [make_paper(arxiv_id) for arxiv_id in IDS]
+    index = InMemoryChunkIndex()
+    first = run_ingestion(papers, session_factory, index, batch_size=2)
+    assert (first.papers_written, first.batches) == (3, 2)
+    assert first.chunks_indexed == len(index.docs) > 0
+
+    second = run_ingestion(papers, session_factory, index, batch_size=2)
+    assert (second.papers_written, second.papers_unchanged, second.chunks_indexed) == (0, 3, 0)
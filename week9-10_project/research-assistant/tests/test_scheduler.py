@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from src.config import Settings
+from src.exceptions import OllamaTimeoutError
+from src.services.ollama import BATCH, INTERACTIVE, ModelScheduler
+
+from stubs import FakeOllama
+
+MODEL = "llama3.2:1b"
+IDLE = {"limit": 1, "active": 0, "waiting": 0}
+
+
+@pytest.fixture
+def scheduler():
+    settings = Settings(ollama_model_concurrency={MODEL: 1}, ollama_queue_timeout=0.05)
+    return ModelScheduler(FakeOllama(), settings)
+
+
+async def test_a_request_still_queued_at_its_deadline_times_out(scheduler):
+    async with scheduler.slot(MODEL):
+        with pytest.raises(OllamaTimeoutError):
+            async with scheduler.slot(MODEL):
+                pass
+        assert scheduler.stats()[MODEL] == {"limit": 1, "active": 1, "waiting": 0}
+    assert scheduler.stats()[MODEL] == IDLE
+
+
+async def test_a_freed_slot_goes_to_the_next_waiter(scheduler):
+    order = []
+
+    async def use(name, priority=INTERACTIVE):
+        async with scheduler.slot(MODEL, priority, timeout=1):
+            order.append(name)
+
+    async with scheduler.slot(MODEL):
+        background = asyncio.create_task(use("batch", BATCH))
+        await asyncio.sleep(0)
+        user = asyncio.create_task(use("interactive"))
+        await asyncio.sleep(0)
+        assert scheduler.stats()[MODEL]["waiting"] == 2
+    await asyncio.gather(background, user)
+    assert order == ["interactive", "batch"]
+    assert scheduler.stats()[MODEL] == IDLE
+
+
+async def test_a_cancelled_waiter_gives_up_its_place(scheduler):
+    order = []
+
+    async def use(name):
+        async with scheduler.slot(MODEL, timeout=1):
+            order.append(name)
+
+    async with scheduler.slot(MODEL):
+        cancelled = asyncio.create_task(use("cancelled"))
+        waiting = asyncio.create_task(use("waiting"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert scheduler.stats()[MODEL]["waiting"] == 1
+    await waiting
+    assert order == ["waiting"]
+    assert scheduler.stats()[MODEL] == IDLE
+
+
+async def test_closing_a_stream_early_releases_its_slot(scheduler):
+    """Test a client that disconnects mid-answer frees the model for the next request."""
+    stream = scheduler.generate_stream("prompt", MODEL)
+    assert (await anext(stream))["response"] == "Self-attention "
+    assert scheduler.stats()[MODEL]["active"] == 1
+    await stream.aclose()
+    assert scheduler.stats()[MODEL] == IDLE
+    assert (await scheduler.generate("prompt", MODEL))["done"]
+
+
+def test_simple_questions_go_to_the_small_model(scheduler):
+    assert scheduler.choose_model("What is BERT?") == scheduler.small_model
+    assert scheduler.choose_model("Compare BERT and GPT pretraining objectives") == scheduler.large_model
+    assert scheduler.choose_model("What is BERT?", requested="gpt-oss:20b") == "gpt-oss:20b"
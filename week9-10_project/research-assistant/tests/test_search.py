@@ -0,0 +1,76 @@
+import pytest
+from src.ingestion.chunking import Chunker
+from src.ingestion.pipeline import index_papers
+from src.schemas.search import SearchFilters
+from src.services.search import Hit, InMemoryChunkIndex, reciprocal_rank_fusion
+
+from stubs import embed, embed_documents, make_paper
+
+
+def ids(results):
+    return [result.chunk_id for result in results]
+
+
+async def embed_along_x(texts):
+    return [[1.0, 0.0, 0.0] for _ in texts]
+
+
+@pytest.fixture
+def index():
+    index = InMemoryChunkIndex(embed=embed)
+    papers = [make_paper("2401.00001"), make_paper("2401.00002"), make_paper("2401.00003", categories=["q-bio.BM"])]
+    index_papers(papers, index, Chunker(chunk_size=40, overlap=0), embed_documents)
+    return index
+
+
+def test_rrf_sums_reciprocal_ranks():
+    """Test a chunk ranked by both retrievers beats chunks ranked by one."""
+    fused = reciprocal_rank_fusion([[Hit("a", {}, 9.0), Hit("b", {}, 8.0)], [Hit("b", {}, 0.9), Hit("c", {}, 0.8)]], k=60)
+    assert [hit.chunk_id for hit in fused] == ["b", "a", "c"]
+    assert [hit.score for hit in fused] == pytest.approx([1 / 61 + 1 / 62, 1 / 61, 1 / 62])
+
+
+def test_rrf_ignores_score_scales():
+    """Test only ranks count, so large BM25 scores do not outweigh cosine similarities."""
+    fused = reciprocal_rank_fusion([[Hit("a", {}, 25.0), Hit("b", {}, 3.0)], [Hit("b", {}, 0.9), Hit("a", {}, 0.1)]])
+    assert fused[0].score == pytest.approx(fused[1].score)
+
+
+async def test_hybrid_search_fuses_lexical_and_semantic_hits():
+    """Test a chunk found only by k-NN still reaches the fused ranking."""
+    index = InMemoryChunkIndex(embed=embed_along_x)
+    index.bulk_index([
+        {"chunk_id": "both", "arxiv_id": "1", "chunk_index": 0, "title": "", "chunk_text": "attention attention",
+         "embedding": [0.8, 0.6, 0.0]},
+        {"chunk_id": "lexical", "arxiv_id": "2", "chunk_index": 0, "title": "", "chunk_text": "attention heads",
+         "embedding": [0.0, 1.0, 0.0]},
+        {"chunk_id": "semantic", "arxiv_id": "3", "chunk_index": 0, "title": "", "chunk_text": "query key softmax",
+         "embedding": [1.0, 0.0, 0.0]},
+    ])
+    assert ids(await index.search("attention", mode="bm25")) == ["both", "lexical"]
+    assert ids(await index.search("attention", mode="vector")) == ["semantic", "both", "lexical"]
+    assert ids(await index.search("attention")) == ["both", "lexical", "semantic"]
+
+
+async def test_bm25_ranks_the_matching_paper_first(index):
+    results = await index.search("message passing between atoms", mode="bm25")
+    assert results[0].arxiv_id == "2401.00003"
+    # The returned text is the exact slice of the paper the offsets point to
+    body = make_paper("2401.00003").body
+    assert all(body[r.char_start:r.char_end] == r.text for r in results if r.arxiv_id == "2401.00003")
+
+
+async def test_filters_apply_to_both_retrievers(index):
+    filters = SearchFilters(categories=["cs.CL"])
+    for mode in ("bm25", "vector", "hybrid"):
+        results = await index.search("message passing between atoms", filters=filters, mode=mode)
+        assert "2401.00003" not in {result.arxiv_id for result in results}
+
+
+async def test_reindexing_a_shorter_paper_deletes_its_stale_chunks(index):
+    """Test the chunks past the new end of a paper leave both the documents and the postings."""
+    assert len(index.chunks_for("2401.00001")) > 1
+    indexed, stale = index_papers([make_paper("2401.00001", body="Attention in one sentence.")], index)
+    assert (indexed, len(index.chunks_for("2401.00001"))) == (1, 1)
+    assert stale > 0
+    assert not await index.search("recurrence", mode="bm25")